@@ -1,25 +1,92 @@
-from fastapi import Depends, HTTPException, status
+from typing import AsyncIterator, Optional
+from uuid import UUID
+
+from fastapi import Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
 from models.user import User
-from core.database import get_db  # Dependency for database session
+from core.database import (  # Dependencies for database sessions
+    ReplicaSession,
+    get_db,
+    get_replica_session_factory,
+    get_session_factory,
+    replica_healthy,
+)
+from core.config import settings
+from middlewares.read_your_writes import SAFE_METHODS, reads_need_primary
 from api.v1.utils.jwt import verify_token
+from api.v1.utils.revocation import revocation_filter
+from api.v1.utils.user_cache import cache_user, get_cached_user
+from api.v1.utils.call_logs import call_log_buffer
+from core.write_buffer import WriteBehindBuffer
 from fastapi.security import OAuth2PasswordBearer
 
 # OAuth2 scheme for token extraction
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 
+async def _reads_from_replica(
+    request: Request, primary_db: AsyncSession, replica_factory: Optional[sessionmaker]
+) -> bool:
+    """
+    Reads go to the replica unless there is none, it failed recently, the
+    request is a write or the user wrote recently (read-your-writes).
+    primary_db is only queried for clients that carry no answer to the
+    latter, see reads_need_primary.
+    """
+    if replica_factory is None or request.method not in SAFE_METHODS or not replica_healthy():
+        return False
+    if settings.READ_YOUR_WRITES_SECONDS <= 0:
+        return True
+    return not await reads_need_primary(request, primary_db)
+
+
+async def get_read_db(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    replica_factory: Optional[sessionmaker] = Depends(get_replica_session_factory),
+) -> AsyncIterator[AsyncSession]:
+    """
+    Dependency to get a session for read-only work: on the read replica when
+    one is configured and usable, otherwise the primary session of get_db.
+    The replica session only connects once it is used (see ReplicaSession).
+    """
+    if not await _reads_from_replica(request, db, replica_factory):
+        yield db
+        return
+
+    async with ReplicaSession(primary=db, **replica_factory.kw) as session:
+        yield session
+
+
+async def get_read_session_factory(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    session_factory: sessionmaker = Depends(get_session_factory),
+    replica_factory: Optional[sessionmaker] = Depends(get_replica_session_factory),
+) -> sessionmaker:
+    """
+    Dependency to get the session factory of read-only work outliving the
+    request handler (e.g. streaming exports), routed like get_read_db.
+    """
+    if await _reads_from_replica(request, db, replica_factory):
+        return replica_factory
+    return session_factory
+
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
+    primary_db: AsyncSession = Depends(get_db),
 ) -> User:
     """
     Dependency to get the currently authenticated user.
 
     Args:
         token (str): JWT token extracted from the request's Authorization header.
-        db (AsyncSession): Database session dependency.
+        db (AsyncSession): Read session dependency (replica on GET routes).
+        primary_db (AsyncSession): Primary session, for users not replicated yet.
 
     Returns:
         User: Authenticated user object.
@@ -48,13 +115,48 @@ async def get_current_user(
     if not user_email:
         raise invalid_token_exception
 
-    # Query database to check if the user exists
-    result = await db.execute(select(User).filter(User.email == user_email))
-    user = result.scalar_one_or_none()
-
-    # Handle cases where the user doesn't exist
-    if not user:
+    # Logged out tokens; the filter answers most checks without a query, which
+    # goes to the primary so a revocation is seen at once
+    if payload.get("jti") and await revocation_filter.is_revoked(primary_db, payload["jti"]):
         raise invalid_token_exception
 
+    # Tokens issued before user ids were embedded only carry the email
+    user_id = None
+    if payload.get("uid"):
+        try:
+            user_id = UUID(payload["uid"])
+        except ValueError:
+            raise invalid_token_exception
+
+    # Resolve the user from the in-process cache first
+    user = get_cached_user(user_id) if user_id else None
+
+    if not user or user.email != user_email:
+        # Query database to check if the user exists
+        if user_id:
+            query = select(User).filter(User.user_id == user_id)
+        else:
+            query = select(User).filter(User.email == user_email)
+        result = await db.execute(query)
+        user = result.scalar_one_or_none()
+
+        # A user registered moments ago may not have reached the replica yet
+        if user is None and db is not primary_db:
+            result = await primary_db.execute(query)
+            user = result.scalar_one_or_none()
+
+        # Handle cases where the user doesn't exist or the token is outdated
+        if not user or user.email != user_email:
+            raise invalid_token_exception
+
+        cache_user(user)
+
     # Return the user if authentication is successful
     return user
+
+
+def get_call_log_buffer() -> WriteBehindBuffer:
+    """
+    Dependency to get the write-behind buffer call logs are queued on.
+    """
+    return call_log_buffer
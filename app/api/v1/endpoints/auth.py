@@ -1,13 +1,16 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Response, status
 from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from core.database import get_db
 from models.user import User
+from api.v1.dependencies import get_current_user, oauth2_scheme
 from schemas.auth import UserCreate, UserLogin, Token, TokenRefresh, TokenAccess
 from api.v1.utils.jwt import generate_tokens, verify_token
-from api.v1.utils.password import verify_password, hash_password
+from api.v1.utils.password import verify_password_async, hash_password_async
+from api.v1.utils.revocation import revocation_filter, revoke_token
+from api.v1.utils.upsert import insert_ignoring_conflicts
 
 router = APIRouter()
 
@@ -31,35 +34,44 @@ async def register_user(
     # Raises:
     #   - HTTPException: If the email is already registered or invalid.
 
-    # Check if the email is already registered
-    result = await db.execute(select(User).filter(User.email == user_create.email))
-    db_user = result.scalar_one_or_none()
+    # Validate email format on model level
+    try:
+        User(email=user_create.email).validate_email()
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid email format!",
+        )
 
-    if db_user:
+    # Reject known emails with a cheap lookup before paying for a bcrypt hash,
+    # so duplicate signups cannot tie up the password pool logins share
+    existing_user_id = await db.scalar(
+        select(User.user_id).filter(User.email == user_create.email)
+    )
+    if existing_user_id is not None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered!",
         )
 
-    # Hash the user's password
-    hashed_password = hash_password(user_create.password)
+    # Hash the user's password on the password pool
+    hashed_password = await hash_password_async(user_create.password)
 
-    # Create a new user instance
-    user = User(email=user_create.email, password=hashed_password)
+    # Insert the user in a single statement; the unique email index decides
+    # duplicates atomically, so concurrent registrations cannot both succeed
+    user_id = await db.scalar(
+        insert_ignoring_conflicts(db, User, ["email"])
+        .values(email=user_create.email, password=hashed_password)
+        .returning(User.user_id)
+    )
 
-    # Validate email format on model level
-    try:
-        user.validate_email()
-    except ValueError:
+    if user_id is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid email format!",
+            detail="Email already registered!",
         )
 
-    # Add and commit the new user to the database
-    db.add(user)
     await db.commit()
-    await db.refresh(user)
 
     return JSONResponse(
         content={"message": "User registered successfully."},
@@ -90,14 +102,16 @@ async def create_token(
     db_user = result.scalar_one_or_none()
 
     # Verify user exists and password is correct
-    if not db_user or not verify_password(user_login.password, db_user.password):
+    if not db_user or not await verify_password_async(
+        user_login.password, db_user.password
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials.",
         )
 
     # Generate access and refresh tokens asynchronously
-    tokens = await generate_tokens({"sub": db_user.email})
+    tokens = await generate_tokens({"sub": db_user.email, "uid": str(db_user.user_id)})
 
     return tokens
 
@@ -131,7 +145,55 @@ async def refresh_access_token(
             detail="Invalid or expired refresh token.",
         )
 
+    # Refuse refresh tokens revoked by a logout
+    if payload.get("jti") and await revocation_filter.is_revoked(db, payload["jti"]):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token.",
+        )
+
     # Generate new access tokens based on the verified payload
-    new_token = await generate_tokens({"sub": payload["sub"]}, "access")
+    claims = {key: payload[key] for key in ("sub", "uid") if key in payload}
+    new_token = await generate_tokens(claims, "access")
 
     return new_token
+
+
+# Logout endpoint
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    token_data: TokenRefresh,
+    access_token: str = Depends(oauth2_scheme),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Revokes the caller's access token and the given refresh token.
+    """
+    # Args:
+    #     token_data (TokenRefresh): The refresh token to revoke.
+    #     access_token (str): The bearer access token of the request.
+    #     current_user (User): Authenticated user dependency.
+    #     db (AsyncSession): Database session dependency.
+
+    # Returns:
+    #     Response: Empty 204 response once both tokens are revoked.
+
+    # Raises:
+    #     HTTPException: If the refresh token is invalid, expired or not the user's.
+
+    refresh_payload = await verify_token(token_data.refresh_token, "refresh")
+    if refresh_payload.get("sub") != current_user.email:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token.",
+        )
+
+    # Already verified by get_current_user, served from the token cache
+    access_payload = await verify_token(access_token)
+
+    await revoke_token(db, access_payload, current_user.user_id)
+    await revoke_token(db, refresh_payload, current_user.user_id)
+    await db.commit()
+
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,320 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, status, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from core.config import settings
+from core.database import get_db
+from core.write_buffer import WriteBehindBuffer
+from schemas.call_log import CallLogIngestReport, CallLogRead, CallLogSummary, to_naive_utc
+from schemas.pagination import PaginatedResponse
+from models.call_log import CallLog, CallStatus, CallType
+from models.user import User
+from api.v1.dependencies import (
+    get_call_log_buffer,
+    get_current_user,
+    get_read_db,
+    get_read_session_factory,
+)
+from api.v1.utils.bulk import get_upload_format, iter_lines
+from api.v1.utils.call_logs import (
+    DIRECTION_ALL,
+    build_call_log_branches,
+    filter_call_log_query,
+    get_owned_phonenumber_ids,
+    ingest_call_records,
+    merge_call_log_branches,
+)
+from api.v1.utils.call_log_export import (
+    EXPORT_COLUMNS,
+    EXPORT_FORMATS,
+    ExportResponse,
+    export_slots,
+    stream_call_log_export,
+)
+from api.v1.utils.call_log_rollups import HOUR, hour_bucket, summarize_call_logs
+from api.v1.utils.pagination import paginate_query_by_cursor
+from api.v1.utils.responses import fast_page_response
+
+router = APIRouter()
+
+
+@router.post(
+    "/ingest",
+    response_model=CallLogIngestReport,
+    status_code=status.HTTP_202_ACCEPTED,
+    responses={status.HTTP_429_TOO_MANY_REQUESTS: {"description": "Ingestion buffer is full"}},
+)
+async def ingest_call_logs(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    buffer: WriteBehindBuffer = Depends(get_call_log_buffer),
+) -> CallLogIngestReport:
+    """
+    Ingest a stream of call records (CDRs).
+    """
+    # Args:
+    #     - request (Request): application/x-ndjson body, one record per line:
+    #         {"caller": "+977...", "receiver": "<phonenumber_id>",
+    #          "call_start_time": "2024-12-11T12:00:00Z", "call_end_time": ...,
+    #          "call_duration": 12.5, "call_type": "outgoing", "call_status": "completed"}
+    #     - current_user (User): The currently authenticated user (injected dependency).
+    #     - db (AsyncSession): Database session, used to resolve phone numbers.
+    #     - buffer (WriteBehindBuffer): Buffer records are queued on (injected dependency).
+
+    # Returns:
+    #     - CallLogIngestReport: Accepted/rejected counts. Records must have one
+    #       of the user's numbers as caller or receiver, and are only listed,
+    #       exported and summarized for the user's side: the owner of the
+    #       other number never sees calls it did not upload. Accepted records are
+    #       written in the background, within CALL_LOG_FLUSH_INTERVAL_SECONDS;
+    #       batches the database rejects are logged and counted as "failed"
+    #       in /stats and write_buffer_rows_failed_total.
+
+    # Raises:
+    #     - HTTPException: If the upload is not NDJSON.
+    #     - 429 response: If the buffer is full; records before "resume_from_row"
+    #       were processed, the client retries from that line after Retry-After.
+
+    if get_upload_format(request.headers.get("content-type", "")) != "ndjson":
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Call logs must be uploaded as application/x-ndjson.",
+        )
+
+    report = await ingest_call_records(
+        db,
+        current_user.user_id,
+        iter_lines(request.stream()),
+        buffer,
+        chunk_size=settings.CALL_LOG_INGEST_CHUNK_SIZE,
+        max_errors=settings.CALL_LOG_MAX_REPORTED_ERRORS,
+    )
+
+    # Push back on the producer instead of buffering without bound
+    if "resume_from_row" in report:
+        return JSONResponse(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            content={"detail": "Call log ingestion is busy, please retry.", **report},
+            headers={"Retry-After": str(max(1, round(settings.CALL_LOG_FLUSH_INTERVAL_SECONDS)))},
+        )
+
+    return report
+
+
+@router.get("/", response_model=PaginatedResponse[CallLogRead], status_code=status.HTTP_200_OK)
+async def get_call_logs(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    number: Optional[str] = Query(None),
+    direction: str = Query(DIRECTION_ALL, pattern="^(all|outgoing|incoming)$"),
+    call_type: Optional[CallType] = Query(None),
+    call_status: Optional[CallStatus] = Query(None),
+    start_time: Optional[datetime] = Query(None),
+    end_time: Optional[datetime] = Query(None),
+    limit: int = Query(50, le=100, ge=1),
+    cursor: Optional[str] = Query(None),
+):
+    """
+    Retrieve the call logs of the authenticated user's phone numbers, newest first.
+    """
+    # Args:
+    #     - current_user (User): The currently authenticated user (injected dependency).
+    #     - db (AsyncSession): Read session, replica when configured (injected dependency).
+    #     - number: Only calls of this owned number (phonenumber_id or number).
+    #     - direction: "all" (default), "outgoing" (owned number called) or
+    #       "incoming" (owned number was called).
+    #     - call_type, call_status: Only calls of this type / status.
+    #     - start_time, end_time: Only calls started in [start_time, end_time).
+    #     - limit, cursor: Keyset pagination on (call_start_time, call_log_id).
+
+    # Returns:
+    #     - PaginatedResponse[CallLogRead]: A page of call logs with next/prev cursors.
+
+    # Raises:
+    #     - HTTPException: If number is not owned, or no call logs are found.
+
+    phonenumber_ids = await get_owned_phonenumber_ids(db, current_user.user_id, number)
+    if not phonenumber_ids:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No call logs found for {current_user.email}.",
+        )
+
+    branches = [
+        filter_call_log_query(branch, call_type, call_status, start_time, end_time)
+        for branch in build_call_log_branches(current_user.user_id, phonenumber_ids, direction)
+    ]
+
+    # Keyset pagination per branch, each served by its (number, call_start_time,
+    # call_log_id) index: only a page per branch is read and merged (users with
+    # more than CALL_LOG_MAX_BRANCHES get one query, sorted by the database)
+    paginated_response = await paginate_query_by_cursor(
+        db,
+        branches,
+        order_by=(CallLog.call_start_time, CallLog.call_log_id),
+        limit=limit,
+        cursor=cursor,
+        descending=True,
+    )
+
+    # Raise exception if no call logs are found
+    if not paginated_response.data:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No call logs found for {current_user.email}.",
+        )
+
+    # Serialized once with orjson instead of re-validating through response_model
+    return fast_page_response(paginated_response, CallLogRead)
+
+
+@router.get(
+    "/export",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+    responses={
+        status.HTTP_200_OK: {"content": {media_type: {} for media_type in EXPORT_FORMATS.values()}},
+        status.HTTP_429_TOO_MANY_REQUESTS: {"description": "Too many exports in progress"},
+    },
+)
+async def export_call_logs(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    session_factory: sessionmaker = Depends(get_read_session_factory),
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    number: Optional[str] = Query(None),
+    direction: str = Query(DIRECTION_ALL, pattern="^(all|outgoing|incoming)$"),
+    call_type: Optional[CallType] = Query(None),
+    call_status: Optional[CallStatus] = Query(None),
+    start_time: Optional[datetime] = Query(None),
+    end_time: Optional[datetime] = Query(None),
+):
+    """
+    Download all call logs of the authenticated user's phone numbers, oldest first.
+    """
+    # Args:
+    #     - current_user (User): The currently authenticated user (injected dependency).
+    #     - db (AsyncSession): Database session, used to resolve phone numbers.
+    #     - session_factory (sessionmaker): Opens the session the export streams
+    #       from, on the read replica when configured.
+    #     - format: "csv" (default, with a header row) or "ndjson".
+    #     - number, direction, call_type, call_status, start_time, end_time:
+    #       Same filters as the call log listing.
+
+    # Returns:
+    #     - StreamingResponse: The export, sent with chunked transfer encoding
+    #       while it is read from a server-side cursor.
+
+    # Raises:
+    #     - HTTPException: If number is not owned.
+    #     - 429 response: If CALL_LOG_EXPORT_MAX_CONCURRENT exports are already
+    #       streaming on this worker.
+
+    phonenumber_ids = await get_owned_phonenumber_ids(db, current_user.user_id, number)
+
+    query, call_log = merge_call_log_branches(
+        [
+            filter_call_log_query(branch, call_type, call_status, start_time, end_time)
+            for branch in build_call_log_branches(current_user.user_id, phonenumber_ids, direction)
+        ]
+    )
+    # Ascending order walks the (number, call_start_time, call_log_id) indexes;
+    # branches are capped, so the query size does not grow with the numbers
+    query = query.with_only_columns(
+        *(getattr(call_log, column) for column in EXPORT_COLUMNS)
+    ).order_by(call_log.call_start_time, call_log.call_log_id)
+
+    if not export_slots.try_acquire():
+        return JSONResponse(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            content={"detail": "Too many call log exports in progress, please retry."},
+            headers={"Retry-After": "30"},
+        )
+
+    # The slot is released by the response, however the stream ends
+    return ExportResponse(
+        stream_call_log_export(
+            session_factory,
+            query,
+            format,
+            fetch_size=settings.CALL_LOG_EXPORT_FETCH_SIZE,
+        ),
+        on_close=export_slots.release,
+        media_type=EXPORT_FORMATS[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="call_logs.{format}"',
+            # Let nginx pass chunks through instead of spooling the export
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+@router.get("/summary", response_model=CallLogSummary, status_code=status.HTTP_200_OK)
+async def get_call_log_summary(
+    start_time: datetime,
+    end_time: datetime,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    number: Optional[str] = Query(None),
+    direction: str = Query(DIRECTION_ALL, pattern="^(all|outgoing|incoming)$"),
+    granularity: str = Query(HOUR, pattern="^(hour|day)$"),
+    per_number: bool = Query(False),
+):
+    """
+    Summarize the calls of the authenticated user's phone numbers per hour or day.
+    """
+    # Args:
+    #     - start_time, end_time: Range to summarize, widened to whole hours.
+    #     - current_user (User): The currently authenticated user (injected dependency).
+    #     - db (AsyncSession): Read session, replica when configured (injected dependency).
+    #     - number: Only calls of this owned number (phonenumber_id or number).
+    #     - direction: "all" (default), "outgoing" or "incoming".
+    #     - granularity: "hour" (default) or "day" (UTC).
+    #     - per_number: Break the totals down by phone number.
+
+    # Returns:
+    #     - CallLogSummary: Call counts and durations per bucket, call type and
+    #       call status, served from the hourly rollups (never from call_logs).
+
+    # Raises:
+    #     - HTTPException: If the range is invalid or too long, or number is not owned.
+
+    start_time = hour_bucket(to_naive_utc(start_time))
+    end_time = to_naive_utc(end_time)
+    if end_time != hour_bucket(end_time):
+        end_time = hour_bucket(end_time) + timedelta(hours=1)
+
+    if end_time <= start_time or end_time - start_time > timedelta(
+        days=settings.CALL_LOG_SUMMARY_MAX_DAYS
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Summary range must be positive and at most "
+            f"{settings.CALL_LOG_SUMMARY_MAX_DAYS} days.",
+        )
+
+    phonenumber_ids = await get_owned_phonenumber_ids(db, current_user.user_id, number)
+
+    rows = []
+    if phonenumber_ids:
+        rows = await summarize_call_logs(
+            db,
+            phonenumber_ids,
+            start_time,
+            end_time,
+            granularity=granularity,
+            direction=direction,
+            per_number=per_number,
+        )
+
+    return {
+        "granularity": granularity,
+        "start_time": start_time,
+        "end_time": end_time,
+        "rows": rows,
+    }
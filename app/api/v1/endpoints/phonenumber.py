@@ -1,14 +1,25 @@
-from fastapi import APIRouter, Depends, status, HTTPException, Query
+from typing import Optional
+
+from fastapi import APIRouter, Depends, status, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
+from core.config import settings
 from core.database import get_db
-from schemas.phonenumber import PhoneNumberCreate, PhoneNumberRead
+from schemas.phonenumber import BulkPhoneNumberReport, PhoneNumberCreate, PhoneNumberRead
 from schemas.pagination import PaginatedResponse
 from models.user import User
 from models.phonenumber import PhoneNumber
-from api.v1.dependencies import get_current_user
-from api.v1.utils.pagination import paginate_query
+from api.v1.dependencies import get_current_user, get_read_db
+from api.v1.utils.pagination import paginate_query, paginate_query_by_cursor
+from api.v1.utils.counters import (
+    get_phonenumber_count_and_version,
+    increment_phonenumber_count,
+)
+from api.v1.utils.etag import build_etag, etag_matches
+from api.v1.utils.responses import fast_page_response
+from api.v1.utils.upsert import insert_ignoring_conflicts
+from api.v1.utils.bulk import get_upload_format, iter_upload_numbers, provision_phonenumbers
 
 router = APIRouter()
 
@@ -33,46 +44,99 @@ async def create_phonenumber(
     # Raises:
     #     - HTTPException: If the phone number is already registered.
 
-    # Check if the phone number already exists in the database
+    # Insert and read back the row in a single statement; the unique number
+    # index decides duplicates atomically, so concurrent creates cannot race
     result = await db.execute(
-        select(PhoneNumber).filter(PhoneNumber.number == phonenumber.number)
+        insert_ignoring_conflicts(db, PhoneNumber, ["number"])
+        .values(user_id=current_user.user_id, number=phonenumber.number)
+        .returning(PhoneNumber.phonenumber_id, PhoneNumber.number, PhoneNumber.created_at)
     )
-    db_phonenumber = result.scalar_one_or_none()
+    new_phonenumber = result.one_or_none()
 
-    if db_phonenumber:
+    if new_phonenumber is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Number already registered!",
         )
 
-    # Create a new phone number associated with the authenticated user
-    new_phonenumber = PhoneNumber(
-        user_id=current_user.user_id,
-        number=phonenumber.number,
-    )
-    db.add(new_phonenumber)
+    # Keep the owner's counter in step within the same transaction
+    await increment_phonenumber_count(db, current_user.user_id)
     await db.commit()
-    await db.refresh(new_phonenumber)
 
     return new_phonenumber
 
 
+@router.post("/bulk", response_model=BulkPhoneNumberReport, status_code=status.HTTP_200_OK)
+async def bulk_create_phonenumbers(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    report: str = Query("full", pattern="^(full|errors)$"),
+) -> BulkPhoneNumberReport:
+    """
+    Create many phone numbers for the authenticated user in one request.
+    """
+    # Args:
+    #     - request (Request): Upload body, one of
+    #         application/json: ["+977...", {"number": "+977..."}, ...]
+    #         text/csv: one number per line, optional header with a "number" column
+    #         application/x-ndjson: one JSON string or {"number": ...} per line
+    #     - current_user (User): The currently authenticated user (injected dependency).
+    #     - db (AsyncSession): Database session (injected dependency).
+    #     - report: "full" (default) lists every row, "errors" only failed rows.
+
+    # Returns:
+    #     - BulkPhoneNumberReport: Created/duplicate/invalid counts and per-row results.
+
+    # Raises:
+    #     - HTTPException: On an unsupported or malformed upload, or too many rows.
+
+    upload_format = get_upload_format(request.headers.get("content-type", ""))
+
+    # CSV and NDJSON bodies are consumed as they stream in; every chunk of rows
+    # becomes a single multi-row insert
+    result = await provision_phonenumbers(
+        db,
+        current_user.user_id,
+        iter_upload_numbers(request, upload_format),
+        chunk_size=settings.BULK_CHUNK_SIZE,
+        max_rows=settings.BULK_MAX_ROWS,
+        include_created=report == "full",
+    )
+
+    # The whole upload is committed at once, an oversized or malformed upload
+    # leaves nothing behind
+    await db.commit()
+
+    return result
+
+
 @router.get("/", response_model=PaginatedResponse[PhoneNumberRead], status_code=status.HTTP_200_OK)
 async def get_phonenumbers(
+    request: Request,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     offset: int = Query(0, alias="offset", ge=0),
     limit: int = Query(10, le=50, ge=1),
+    mode: str = Query("offset", pattern="^(offset|cursor)$"),
+    cursor: Optional[str] = Query(None),
+    include_total: bool = Query(False),
 ):
     """
     Retrieve all phone numbers associated with the authenticated user.
     """
     # Args:
+    #     - request (Request): If-None-Match carries the ETag of a cached listing.
     #     - current_user (User): The currently authenticated user (injected dependency).
-    #     - db (AsyncSession): Database session (injected dependency).
+    #     - db (AsyncSession): Read session, replica when configured (injected dependency).
+    #     - offset, limit: Offset pagination parameters (default mode).
+    #     - mode: "offset" (default) or "cursor" for keyset pagination.
+    #     - cursor: Opaque cursor from a previous page, implies cursor mode.
+    #     - include_total: Also count all numbers in cursor mode.
 
     # Returns:
     #     - list[PhoneNumberRead]: A list of phone numbers for the authenticated user.
+    #     - 304 response: If the ETag in If-None-Match is still current.
 
     # Query to fetch phone numbers for the authenticated user
     query = select(PhoneNumber).filter(PhoneNumber.user_id == current_user.user_id)
@@ -89,13 +153,49 @@ async def get_phonenumbers(
 
     # return phonenumbers
 
-    # Call the shared pagination logic
-    paginated_response = await paginate_query(
-        db,
-        query,
-        limit=limit,
-        offset=offset,
+    use_cursor = mode == "cursor" or cursor is not None
+
+    # The plain per-user listing is counted by the maintained counter (O(1))
+    # instead of a count(*) over all of the user's numbers; the same lookup
+    # returns the version every number write bumps
+    count, version = await get_phonenumber_count_and_version(db, current_user.user_id)
+
+    # The listing only changes with the version, so a client holding the
+    # current ETag is answered without running the listing query
+    etag = build_etag(
+        current_user.user_id, version, sorted(request.query_params.multi_items())
     )
+    cache_headers = {
+        "ETag": etag,
+        # Per-user data: never stored by shared caches, revalidated by clients
+        "Cache-Control": "private, no-cache",
+        "Vary": "Authorization",
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
+
+    total = count if not use_cursor or include_total else None
+
+    # Call the shared pagination logic
+    if use_cursor:
+        # Keyset pagination, served by the (user_id, created_at, phonenumber_id) index
+        paginated_response = await paginate_query_by_cursor(
+            db,
+            query,
+            order_by=(PhoneNumber.created_at, PhoneNumber.phonenumber_id),
+            limit=limit,
+            cursor=cursor,
+            include_total=include_total,
+            total=total,
+        )
+    else:
+        paginated_response = await paginate_query(
+            db,
+            query,
+            limit=limit,
+            offset=offset,
+            total=total,
+        )
 
     # raise Exception(paginated_response)
 
@@ -106,4 +206,5 @@ async def get_phonenumbers(
             detail=f"No phone numbers found for {current_user.email}.",
         )
 
-    return paginated_response
+    # Serialized once with orjson instead of re-validating through response_model
+    return fast_page_response(paginated_response, PhoneNumberRead, headers=cache_headers)
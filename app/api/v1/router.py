@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from api.v1.endpoints import auth, phonenumber
+from api.v1.endpoints import auth, call_log, phonenumber
 
 
 api_router = APIRouter(prefix="/api/v1")
@@ -8,3 +8,5 @@ api_router = APIRouter(prefix="/api/v1")
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 
 api_router.include_router(phonenumber.router, prefix="/phonenumbers", tags=["phonenumbers"])
+
+api_router.include_router(call_log.router, prefix="/calllogs", tags=["calllogs"])
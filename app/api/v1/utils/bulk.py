@@ -0,0 +1,230 @@
+import codecs
+import csv
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+from uuid import UUID, uuid4
+
+from fastapi import HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.phonenumber import PhoneNumber
+from api.v1.utils.counters import increment_phonenumber_count
+from core.phone_validation import normalize_phone_numbers_async
+from api.v1.utils.upsert import insert_ignoring_conflicts
+
+# Upload formats, keyed by content type
+UPLOAD_FORMATS = {
+    "application/json": "json",
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+# Per row outcomes
+CREATED = "created"
+DUPLICATE = "duplicate"
+INVALID = "invalid"
+
+
+def get_upload_format(content_type: str) -> str:
+    """
+    Map the request content type to an upload format.
+
+    Raises:
+        HTTPException: If the content type is not supported.
+    """
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    try:
+        return UPLOAD_FORMATS[media_type]
+    except KeyError:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Upload must be application/json, text/csv or application/x-ndjson.",
+        )
+
+
+async def iter_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Split a streamed UTF-8 body into lines without buffering the whole body.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    try:
+        async for chunk in stream:
+            pending += decoder.decode(chunk)
+            lines = pending.split("\n")
+            pending = lines.pop()
+            for line in lines:
+                yield line.rstrip("\r")
+        pending += decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Upload must be UTF-8 encoded.",
+        )
+    if pending:
+        yield pending.rstrip("\r")
+
+
+def _number_from_record(record: Any) -> Optional[str]:
+    """
+    Extract the number of a JSON record, either "+977..." or {"number": "+977..."}.
+    """
+    if isinstance(record, dict):
+        record = record.get("number")
+    return record if isinstance(record, str) else None
+
+
+async def iter_upload_numbers(request: Request, upload_format: str) -> AsyncIterator[Optional[str]]:
+    """
+    Yield the raw number of every uploaded row, None for malformed rows.
+    CSV and NDJSON uploads are read incrementally as the body streams in.
+    Args:
+        request: Incoming request carrying the upload.
+        upload_format: "json", "csv" or "ndjson".
+    """
+    if upload_format == "json":
+        try:
+            records = json.loads(await request.body())
+        except ValueError:
+            records = None
+        if not isinstance(records, list):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="JSON upload must be an array of numbers.",
+            )
+        for record in records:
+            yield _number_from_record(record)
+        return
+
+    column = None
+    async for line in iter_lines(request.stream()):
+        if not line.strip():
+            continue
+
+        if upload_format == "ndjson":
+            try:
+                yield _number_from_record(json.loads(line))
+            except ValueError:
+                yield None
+            continue
+
+        cells = next(csv.reader([line]))
+        if column is None:
+            # An optional header row names the number column
+            header = [cell.strip().lower() for cell in cells]
+            if "number" in header:
+                column = header.index("number")
+                continue
+            column = 0
+        yield cells[column].strip() if len(cells) > column else None
+
+
+async def _provision_chunk(
+    db_session: AsyncSession,
+    user_id: UUID,
+    chunk: List[Tuple[int, Optional[str]]],
+    seen: Set[str],
+    report: Dict[str, Any],
+    include_created: bool,
+) -> None:
+    """
+    Validate a chunk of rows and insert the valid ones with a single statement.
+    """
+    # Large chunks are validated on the process pool
+    normalized = await normalize_phone_numbers_async([raw or "" for _, raw in chunk])
+
+    outcomes = []
+    values = []
+    for (row, raw), number in zip(chunk, normalized):
+        if number is None:
+            outcomes.append((row, raw, INVALID, "Invalid phone number."))
+        elif number in seen:
+            outcomes.append((row, number, DUPLICATE, "Number repeated in upload."))
+        else:
+            seen.add(number)
+            outcomes.append((row, number, None, None))
+            values.append({"phonenumber_id": uuid4(), "number": number, "user_id": user_id})
+
+    created = {}
+    if values:
+        # Numbers registered by anyone are skipped by the unique index
+        # rather than failing the statement
+        statement = (
+            insert_ignoring_conflicts(db_session, PhoneNumber, ["number"])
+            .values(values)
+            .returning(PhoneNumber.number, PhoneNumber.phonenumber_id)
+        )
+        created = dict((await db_session.execute(statement)).all())
+        await increment_phonenumber_count(db_session, user_id, len(created))
+
+    for row, number, outcome, detail in outcomes:
+        phonenumber_id = None
+        if outcome is None:
+            phonenumber_id = created.get(number)
+            if phonenumber_id is None:
+                outcome, detail = DUPLICATE, "Number already registered!"
+            else:
+                outcome = CREATED
+
+        report[outcome] += 1
+        if outcome != CREATED or include_created:
+            report["results"].append(
+                {
+                    "row": row,
+                    "number": number,
+                    "status": outcome,
+                    "phonenumber_id": phonenumber_id,
+                    "detail": detail,
+                }
+            )
+
+
+async def provision_phonenumbers(
+    db_session: AsyncSession,
+    user_id: UUID,
+    numbers: AsyncIterator[Optional[str]],
+    chunk_size: int,
+    max_rows: int,
+    include_created: bool = True,
+) -> Dict[str, Any]:
+    """
+    Create phone numbers for a user from a stream of raw numbers.
+    Rows are validated and inserted chunk by chunk with multi-row
+    `INSERT ... ON CONFLICT DO NOTHING RETURNING` statements; the caller commits.
+    Args:
+        db_session: The AsyncSession to interact with the database.
+        user_id: Owner of the new phone numbers.
+        numbers: Raw numbers in upload order (None for malformed rows).
+        chunk_size: Rows validated and inserted per statement.
+        max_rows: Maximum number of rows accepted per upload.
+        include_created: Report created rows too, not only failures.
+
+    Returns:
+        Dict with created/duplicate/invalid counts and per-row results.
+
+    Raises:
+        HTTPException: If the upload has more than max_rows rows.
+    """
+    report = {CREATED: 0, DUPLICATE: 0, INVALID: 0, "results": []}
+    seen: Set[str] = set()
+    chunk = []
+    row = 0
+
+    async for raw in numbers:
+        row += 1
+        if row > max_rows:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Bulk uploads are limited to {max_rows} rows.",
+            )
+        chunk.append((row, raw))
+        if len(chunk) >= chunk_size:
+            await _provision_chunk(db_session, user_id, chunk, seen, report, include_created)
+            chunk = []
+
+    if chunk:
+        await _provision_chunk(db_session, user_id, chunk, seen, report, include_created)
+
+    return report
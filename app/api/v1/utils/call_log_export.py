@@ -0,0 +1,142 @@
+import csv
+import enum
+import io
+import json
+import logging
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, List, Sequence
+from uuid import UUID
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.sql.selectable import Select
+from starlette.types import Receive, Scope, Send
+
+from core.config import settings
+from core.limits import ConcurrencyLimit
+
+logger = logging.getLogger(__name__)
+
+# Export format -> media type
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+# Exported call_logs columns, in output order
+EXPORT_COLUMNS = (
+    "call_log_id",
+    "caller_phonenumber",
+    "receiver_phonenumber",
+    "call_start_time",
+    "call_end_time",
+    "call_duration",
+    "call_type",
+    "call_status",
+)
+
+# Exports streamed at once by this worker
+export_slots = ConcurrencyLimit(
+    "call-log-export", settings.CALL_LOG_EXPORT_MAX_CONCURRENT
+)
+
+
+def _export_value(value: Any) -> Any:
+    """
+    Plain representation of a column value: ISO timestamps, UUID strings and
+    enum values. None is kept (empty in CSV, null in NDJSON).
+    """
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+def encode_csv(rows: List[Sequence[Any]], header: bool = False) -> bytes:
+    """
+    Encode a partition of rows as CSV lines, optionally preceded by the header.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_COLUMNS)
+    writer.writerows([_export_value(value) for value in row] for row in rows)
+    return buffer.getvalue().encode()
+
+
+def encode_ndjson(rows: List[Sequence[Any]], header: bool = False) -> bytes:
+    """
+    Encode a partition of rows as NDJSON lines (NDJSON has no header).
+    """
+    return "".join(
+        json.dumps(dict(zip(EXPORT_COLUMNS, map(_export_value, row)))) + "\n"
+        for row in rows
+    ).encode()
+
+
+_ENCODERS: Dict[str, Callable[..., bytes]] = {
+    "csv": encode_csv,
+    "ndjson": encode_ndjson,
+}
+
+
+class ExportResponse(StreamingResponse):
+    """
+    StreamingResponse calling on_close once it was sent or abandoned, also
+    when the client disconnects before the body iterator is ever started
+    (the iterator's own finally would not run then).
+    """
+
+    def __init__(self, *args, on_close: Callable[[], None], **kwargs):
+        super().__init__(*args, **kwargs)
+        self.on_close = on_close
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.on_close()
+
+
+async def stream_call_log_export(
+    session_factory: sessionmaker,
+    query: Select,
+    fmt: str,
+    fetch_size: int,
+) -> AsyncIterator[bytes]:
+    """
+    Stream the rows of query, encoded in fmt, from a server-side cursor.
+    Only fetch_size rows are held in memory at a time, and every fetched
+    partition is sent as one chunk. The export runs in its own session
+    since the request's session is closed before the response body is sent.
+    Args:
+        session_factory: Factory creating the AsyncSession of the export.
+        query: Query selecting EXPORT_COLUMNS, in output order.
+        fmt: Key of EXPORT_FORMATS.
+        fetch_size: Rows fetched per round trip.
+
+    Yields:
+        Encoded chunks of the export.
+    """
+    encode = _ENCODERS[fmt]
+    exported = 0
+    try:
+        async with session_factory() as session:
+            result = await session.stream(query.execution_options(yield_per=fetch_size))
+            header = True
+            async for rows in result.partitions():
+                yield encode(rows, header=header)
+                header = False
+                exported += len(rows)
+
+            # Empty exports still get the CSV header
+            if header and fmt == "csv":
+                yield encode([], header=True)
+    except Exception:
+        # Headers are already sent: abort the response so the client sees a
+        # truncated transfer instead of a silently incomplete file
+        logger.exception("Call log export failed after %d rows", exported)
+        raise
@@ -0,0 +1,236 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Tuple
+from uuid import UUID
+
+from sqlalchemy import Integer, bindparam, func, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.call_log_rollup import CallLogHourlyRollup
+from api.v1.utils.upsert import insert_incrementing_on_conflict
+
+# Which side of the call a phone number is on
+DIRECTION_ALL = "all"
+DIRECTION_OUTGOING = "outgoing"  # the number is the caller
+DIRECTION_INCOMING = "incoming"  # the number is the receiver
+
+# Summary granularities
+HOUR = "hour"
+DAY = "day"
+
+ROLLUP_KEY = ("phonenumber_id", "bucket_start", "direction", "call_type", "call_status")
+ROLLUP_COUNTERS = ("call_count", "total_duration")
+
+# Rollup rows per upsert statement (7 bind parameters each)
+ROLLUP_BATCH_SIZE = 1000
+
+RollupTotals = Dict[Tuple, List]
+
+# PostgreSQL advisory locks held (until commit) by transactions writing the
+# rollups of a phone number, keyed (ROLLUP_LOCK_KEY, number key): shared by
+# incremental writers, exclusive while the number's rollups are rebuilt
+ROLLUP_LOCK_KEY = 0x726F6C6C
+
+
+def hour_bucket(value: datetime) -> datetime:
+    """
+    Truncate a timestamp to the start of its hour.
+    """
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def _label(value: Any) -> str:
+    """
+    Store enum members by value and missing values as "".
+    """
+    if value is None:
+        return ""
+    return getattr(value, "value", value)
+
+
+# call_logs column holding the number of each direction
+DIRECTION_COLUMNS = {
+    DIRECTION_OUTGOING: "caller_phonenumber",
+    DIRECTION_INCOMING: "receiver_phonenumber",
+}
+
+# call_logs column telling whether the owner of that number recorded the call
+RECORDED_COLUMNS = {
+    DIRECTION_OUTGOING: "recorded_by_caller",
+    DIRECTION_INCOMING: "recorded_by_receiver",
+}
+
+
+def accumulate_call_logs(
+    totals: RollupTotals,
+    call_logs: Iterable[Dict[str, Any]],
+    directions: Iterable[str] = (DIRECTION_OUTGOING, DIRECTION_INCOMING),
+) -> None:
+    """
+    Add call logs (mappings of call_logs columns) to per-key rollup totals.
+    Every call counts once for the caller (outgoing) and once for the receiver
+    (incoming), if the owner of that number recorded it; directions limits
+    which sides are counted.
+    """
+    sides = [
+        (DIRECTION_COLUMNS[direction], RECORDED_COLUMNS[direction], direction)
+        for direction in directions
+    ]
+    for call_log in call_logs:
+        bucket_start = hour_bucket(call_log["call_start_time"])
+        call_type = _label(call_log["call_type"])
+        call_status = _label(call_log["call_status"])
+        duration = call_log["call_duration"] or 0.0
+
+        for column, recorded, direction in sides:
+            if not call_log[recorded]:
+                continue
+            key = (call_log[column], bucket_start, direction, call_type, call_status)
+            counters = totals.setdefault(key, [0, 0.0])
+            counters[0] += 1
+            counters[1] += duration
+
+
+def rollup_lock_keys(phonenumber_ids: Iterable[UUID]) -> List[int]:
+    """
+    Sorted advisory lock keys of phone numbers (a 32-bit slice of the id;
+    numbers sharing a key only wait for each other needlessly).
+    """
+    return sorted(
+        {
+            int.from_bytes(phonenumber_id.bytes[:4], "big", signed=True)
+            for phonenumber_id in phonenumber_ids
+        }
+    )
+
+
+async def lock_rollups(
+    db_session: AsyncSession, phonenumber_ids: Iterable[UUID], exclusive: bool = False
+) -> None:
+    """
+    Take the rollup locks of the phone numbers for the rest of the transaction
+    (PostgreSQL only), so a rebuild of a number never runs between the call
+    logs a writer inserted and the rollups it increments for them. Writers of
+    other numbers are not held up. Keys are locked in order, in one statement,
+    so writers and rebuilds cannot deadlock.
+    """
+    if db_session.bind.dialect.name != "postgresql":
+        return
+    keys = rollup_lock_keys(phonenumber_ids)
+    if not keys:
+        return
+    lock = func.pg_advisory_xact_lock if exclusive else func.pg_advisory_xact_lock_shared
+    key = func.unnest(bindparam("keys", keys, type_=ARRAY(Integer))).table_valued("key")
+    await db_session.execute(select(lock(ROLLUP_LOCK_KEY, key.c.key)))
+
+
+async def write_rollups(db_session: AsyncSession, totals: RollupTotals) -> int:
+    """
+    Add rollup totals to the rollup table with batched upserts.
+    Rows are written in key order so concurrent writers lock them in the same
+    order and cannot deadlock.
+
+    Returns:
+        Number of rollup rows written.
+    """
+    rollups = [
+        dict(zip(ROLLUP_KEY, key), call_count=call_count, total_duration=total_duration)
+        for key, (call_count, total_duration) in sorted(totals.items())
+    ]
+    for start in range(0, len(rollups), ROLLUP_BATCH_SIZE):
+        await db_session.execute(
+            insert_incrementing_on_conflict(
+                db_session,
+                CallLogHourlyRollup,
+                ROLLUP_KEY,
+                ROLLUP_COUNTERS,
+                rollups[start : start + ROLLUP_BATCH_SIZE],
+            )
+        )
+    return len(rollups)
+
+
+async def increment_call_log_rollups(
+    db_session: AsyncSession, call_logs: Iterable[Dict[str, Any]]
+) -> None:
+    """
+    Account newly inserted call logs in the hourly rollups.
+    Must run in the transaction inserting the call logs, so rollups and raw
+    rows never disagree.
+    """
+    totals: RollupTotals = {}
+    accumulate_call_logs(totals, call_logs)
+    await lock_rollups(db_session, {key[0] for key in totals})
+    await write_rollups(db_session, totals)
+
+
+async def summarize_call_logs(
+    db_session: AsyncSession,
+    phonenumber_ids: List[UUID],
+    start_time: datetime,
+    end_time: datetime,
+    granularity: str = HOUR,
+    direction: str = DIRECTION_ALL,
+    per_number: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Call counts and durations per time bucket, call type and call status,
+    read from the hourly rollups only.
+    Args:
+        db_session: The AsyncSession to interact with the database.
+        phonenumber_ids: Numbers to summarize.
+        start_time, end_time: Hour aligned range [start_time, end_time).
+        granularity: HOUR or DAY (UTC days).
+        direction: DIRECTION_ALL, DIRECTION_OUTGOING or DIRECTION_INCOMING.
+        per_number: Break the summary down by phone number too.
+
+    Returns:
+        Summary rows ordered by bucket.
+    """
+    dimensions = [
+        CallLogHourlyRollup.bucket_start,
+        CallLogHourlyRollup.direction,
+        CallLogHourlyRollup.call_type,
+        CallLogHourlyRollup.call_status,
+    ]
+    if per_number:
+        dimensions.append(CallLogHourlyRollup.phonenumber_id)
+
+    query = (
+        select(
+            *dimensions,
+            func.sum(CallLogHourlyRollup.call_count),
+            func.sum(CallLogHourlyRollup.total_duration),
+        )
+        .where(CallLogHourlyRollup.phonenumber_id.in_(phonenumber_ids))
+        .where(CallLogHourlyRollup.bucket_start >= start_time)
+        .where(CallLogHourlyRollup.bucket_start < end_time)
+        .group_by(*dimensions)
+    )
+    if direction != DIRECTION_ALL:
+        query = query.where(CallLogHourlyRollup.direction == direction)
+
+    # Days are summed up from the (already aggregated) hours
+    totals: Dict[Tuple, List] = {}
+    for *key, call_count, total_duration in (await db_session.execute(query)).all():
+        if granularity == DAY:
+            key[0] = key[0].replace(hour=0)
+        counters = totals.setdefault(tuple(key), [0, 0.0])
+        counters[0] += call_count
+        counters[1] += total_duration
+
+    summary = []
+    for key, (call_count, total_duration) in sorted(totals.items()):
+        bucket_start, row_direction, call_type, call_status, *number = key
+        row = {
+            "bucket_start": bucket_start,
+            "direction": row_direction,
+            "call_type": call_type,
+            "call_status": call_status or None,
+            "call_count": call_count,
+            "total_duration": total_duration,
+        }
+        if per_number:
+            row["phonenumber_id"] = number[0]
+        summary.append(row)
+    return summary
@@ -0,0 +1,389 @@
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID, uuid4
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import and_, false, insert, or_, select, union_all
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql.selectable import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from core.database import async_session
+from core.write_buffer import WriteBehindBuffer
+from models.call_log import CallLog, CallStatus, CallType
+from models.phonenumber import PhoneNumber
+from schemas.call_log import CallLogIngest, to_naive_utc
+from api.v1.utils.cache import TTLCache
+from api.v1.utils.call_log_rollups import (
+    DIRECTION_ALL,
+    DIRECTION_INCOMING,
+    DIRECTION_OUTGOING,
+    increment_call_log_rollups,
+)
+from core.phone_validation import normalize_phone_number
+
+# phonenumber_id by reference (E.164 number or phonenumber_id string). Only
+# hits are cached, so numbers registered after a miss resolve right away.
+phonenumber_id_cache = TTLCache(
+    maxsize=settings.PHONENUMBER_ID_CACHE_SIZE, ttl=settings.PHONENUMBER_ID_CACHE_TTL_SECONDS
+)
+
+
+def build_call_log_buffer(session_factory) -> WriteBehindBuffer:
+    """
+    Build a write-behind buffer inserting call logs through session_factory.
+    """
+
+    async def write_call_logs(rows: List[Dict[str, Any]]) -> None:
+        # Executemany insert, batched into multi-row VALUES statements, and the
+        # matching rollup increments in the same transaction
+        async with session_factory() as session:
+            await session.execute(insert(CallLog), rows)
+            await increment_call_log_rollups(session, rows)
+            await session.commit()
+
+    return WriteBehindBuffer(
+        name="call-logs",
+        flush_fn=write_call_logs,
+        max_rows=settings.CALL_LOG_BUFFER_MAX_ROWS,
+        flush_rows=settings.CALL_LOG_FLUSH_ROWS,
+        flush_interval=settings.CALL_LOG_FLUSH_INTERVAL_SECONDS,
+    )
+
+
+call_log_buffer = build_call_log_buffer(async_session)
+
+
+def _reference_key(reference: str) -> Optional[str]:
+    """
+    Canonical form of a phone number reference: the phonenumber_id string or
+    the E.164 number, None if it is neither.
+    """
+    try:
+        return str(UUID(reference))
+    except ValueError:
+        return normalize_phone_number(reference)
+
+
+async def resolve_phonenumber_ids(
+    db_session: AsyncSession, references: Iterable[str]
+) -> Dict[str, UUID]:
+    """
+    Resolve canonical references to phonenumber ids with at most one query.
+    Args:
+        db_session: The AsyncSession to interact with the database.
+        references: Canonical references (see _reference_key).
+
+    Returns:
+        Dict of reference -> phonenumber_id, unknown references are left out.
+    """
+    resolved = {}
+    missing = set()
+    for reference in references:
+        phonenumber_id = phonenumber_id_cache.get(reference)
+        if phonenumber_id is None:
+            missing.add(reference)
+        else:
+            resolved[reference] = phonenumber_id
+
+    if not missing:
+        return resolved
+
+    numbers = [reference for reference in missing if reference.startswith("+")]
+    ids = [UUID(reference) for reference in missing if not reference.startswith("+")]
+    conditions = []
+    if numbers:
+        conditions.append(PhoneNumber.number.in_(numbers))
+    if ids:
+        conditions.append(PhoneNumber.phonenumber_id.in_(ids))
+
+    result = await db_session.execute(
+        select(PhoneNumber.phonenumber_id, PhoneNumber.number).where(or_(*conditions))
+    )
+    for phonenumber_id, number in result.all():
+        for reference in (str(phonenumber_id), number):
+            if reference in missing:
+                resolved[reference] = phonenumber_id
+                phonenumber_id_cache.set(reference, phonenumber_id)
+
+    return resolved
+
+
+def _describe_validation_error(error: ValidationError) -> str:
+    """
+    Short description of the first problem of a record.
+    """
+    first = error.errors()[0]
+    location = ".".join(str(part) for part in first["loc"])
+    return f"{location}: {first['msg']}" if location else first["msg"]
+
+
+async def parse_call_records(
+    db_session: AsyncSession, lines: List[Tuple[int, str]], owned_ids: Set[UUID]
+) -> Tuple[List[Dict[str, Any]], List[Tuple[int, str]]]:
+    """
+    Validate NDJSON call records and resolve their phone numbers.
+    Args:
+        db_session: The AsyncSession used to resolve phone numbers.
+        lines: (line number, JSON text) pairs.
+        owned_ids: Numbers of the uploading user; records must involve one,
+            and only count as recorded on the sides of these numbers.
+
+    Returns:
+        Insertable call_logs rows and (line number, reason) of rejected records.
+    """
+    records = []
+    errors = []
+    for row, line in lines:
+        try:
+            record = CallLogIngest.model_validate_json(line)
+        except ValidationError as error:
+            errors.append((row, _describe_validation_error(error)))
+            continue
+
+        caller = _reference_key(record.caller)
+        receiver = _reference_key(record.receiver)
+        if caller is None or receiver is None:
+            errors.append((row, "Invalid caller or receiver phone number."))
+            continue
+        records.append((row, record, caller, receiver))
+
+    phonenumber_ids = await resolve_phonenumber_ids(
+        db_session, {reference for record in records for reference in record[2:]}
+    )
+
+    rows = []
+    for row, record, caller, receiver in records:
+        if caller not in phonenumber_ids or receiver not in phonenumber_ids:
+            errors.append((row, "Unknown caller or receiver phone number."))
+            continue
+        if (
+            phonenumber_ids[caller] not in owned_ids
+            and phonenumber_ids[receiver] not in owned_ids
+        ):
+            errors.append((row, "Neither the caller nor the receiver is your phone number."))
+            continue
+
+        call_duration = record.call_duration
+        if call_duration is None and record.call_end_time is not None:
+            call_duration = (record.call_end_time - record.call_start_time).total_seconds()
+
+        rows.append(
+            {
+                "call_log_id": uuid4(),
+                "caller_phonenumber": phonenumber_ids[caller],
+                "receiver_phonenumber": phonenumber_ids[receiver],
+                "call_start_time": record.call_start_time,
+                "call_end_time": record.call_end_time,
+                "call_duration": call_duration,
+                "call_type": record.call_type,
+                "call_status": record.call_status,
+                # The other party's number never sees a call it did not upload
+                "recorded_by_caller": phonenumber_ids[caller] in owned_ids,
+                "recorded_by_receiver": phonenumber_ids[receiver] in owned_ids,
+            }
+        )
+
+    errors.sort()
+    return rows, errors
+
+
+async def ingest_call_records(
+    db_session: AsyncSession,
+    user_id: UUID,
+    lines: AsyncIterator[str],
+    buffer: WriteBehindBuffer,
+    chunk_size: int,
+    max_errors: int,
+) -> Dict[str, Any]:
+    """
+    Validate an NDJSON stream of call records chunk by chunk and queue the
+    valid ones on the write-behind buffer. Only calls made or received by
+    one of the user's numbers are accepted, and they are only listed,
+    exported and summarized for the user's side of the call.
+    Args:
+        db_session: The AsyncSession used to resolve phone numbers.
+        user_id: The uploading user.
+        lines: Lines of the stream.
+        buffer: Buffer the rows are queued on.
+        chunk_size: Records validated and queued at once.
+        max_errors: Maximum number of rejected records described in the report.
+
+    Returns:
+        Dict with accepted/rejected counts and errors. If the buffer ran full,
+        "resume_from_row" is the first line that was not processed.
+    """
+    report = {"accepted": 0, "rejected": 0, "errors": []}
+    owned_ids = set(await get_owned_phonenumber_ids(db_session, user_id))
+
+    async def process(chunk: List[Tuple[int, str]]) -> bool:
+        rows, errors = await parse_call_records(db_session, chunk, owned_ids)
+        if rows and not buffer.offer(rows):
+            return False
+
+        report["accepted"] += len(rows)
+        report["rejected"] += len(errors)
+        for row, detail in errors[: max_errors - len(report["errors"])]:
+            report["errors"].append({"row": row, "detail": detail})
+        return True
+
+    chunk = []
+    row = 0
+    async for line in lines:
+        row += 1
+        if not line.strip():
+            continue
+        chunk.append((row, line))
+        if len(chunk) >= chunk_size:
+            if not await process(chunk):
+                report["resume_from_row"] = chunk[0][0]
+                return report
+            chunk = []
+
+    if chunk and not await process(chunk):
+        report["resume_from_row"] = chunk[0][0]
+
+    return report
+
+
+async def get_owned_phonenumber_ids(
+    db_session: AsyncSession, user_id: UUID, number: Optional[str] = None
+) -> List[UUID]:
+    """
+    Ids of the user's phone numbers, or of the single number referenced by
+    number (phonenumber_id or phone number).
+
+    Raises:
+        HTTPException: If number does not reference a phone number of the user.
+    """
+    query = select(PhoneNumber.phonenumber_id).where(PhoneNumber.user_id == user_id)
+    if number is not None:
+        reference = _reference_key(number)
+        phonenumber_id = None
+        if reference is not None:
+            if reference.startswith("+"):
+                query = query.where(PhoneNumber.number == reference)
+            else:
+                query = query.where(PhoneNumber.phonenumber_id == UUID(reference))
+            phonenumber_id = await db_session.scalar(query)
+
+        if phonenumber_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Phone number not found.",
+            )
+        return [phonenumber_id]
+
+    return list((await db_session.scalars(query)).all())
+
+
+def _is_listed(column, user_id: UUID, phonenumber_ids: List[UUID]):
+    """
+    Condition matching column against the listed numbers: an equality for a
+    single number, otherwise a subquery on the user's numbers, so the
+    statement stays the same size however many numbers the user has.
+    """
+    if len(phonenumber_ids) == 1:
+        return column == phonenumber_ids[0]
+    return column.in_(select(PhoneNumber.phonenumber_id).where(PhoneNumber.user_id == user_id))
+
+
+def build_call_log_branches(
+    user_id: UUID, phonenumber_ids: List[UUID], direction: str
+) -> List[Select]:
+    """
+    Select the call logs the given numbers took part in, as one query per
+    (number, side): an equality on its (number, call_start_time, call_log_id)
+    index, whose rows come out in start time order. Calls between two of the
+    numbers only come from the caller branch. A side only matches calls the
+    number's owner recorded, so calls uploaded by the other party stay out.
+    Users with more than CALL_LOG_MAX_BRANCHES (number, side) pairs get a
+    single query matching either side instead, which the database sorts as a
+    whole but which does not grow with the number of phone numbers.
+    Args:
+        user_id: Owner of the numbers.
+        phonenumber_ids: One number of the user, or all of them.
+        direction: DIRECTION_ALL, DIRECTION_OUTGOING or DIRECTION_INCOMING.
+
+    Returns:
+        The branch queries, none if there are no numbers.
+    """
+    if not phonenumber_ids:
+        return []
+
+    caller_listed = and_(
+        _is_listed(CallLog.caller_phonenumber, user_id, phonenumber_ids),
+        CallLog.recorded_by_caller,
+    )
+    receiver_listed = and_(
+        _is_listed(CallLog.receiver_phonenumber, user_id, phonenumber_ids),
+        CallLog.recorded_by_receiver,
+    )
+    sides = 2 if direction == DIRECTION_ALL else 1
+    if len(phonenumber_ids) * sides > settings.CALL_LOG_MAX_BRANCHES:
+        if direction == DIRECTION_OUTGOING:
+            return [select(CallLog).where(caller_listed)]
+        if direction == DIRECTION_INCOMING:
+            return [select(CallLog).where(receiver_listed)]
+        return [select(CallLog).where(or_(caller_listed, receiver_listed))]
+
+    branches = []
+    if direction != DIRECTION_INCOMING:
+        branches += [
+            select(CallLog)
+            .where(CallLog.caller_phonenumber == phonenumber_id)
+            .where(CallLog.recorded_by_caller)
+            for phonenumber_id in phonenumber_ids
+        ]
+    if direction != DIRECTION_OUTGOING:
+        for phonenumber_id in phonenumber_ids:
+            branch = (
+                select(CallLog)
+                .where(CallLog.receiver_phonenumber == phonenumber_id)
+                .where(CallLog.recorded_by_receiver)
+            )
+            if direction == DIRECTION_ALL:
+                branch = branch.where(~caller_listed)
+            branches.append(branch)
+    return branches
+
+
+def merge_call_log_branches(branches: List[Select]) -> Tuple[Select, Any]:
+    """
+    Combine branches built by build_call_log_branches into one query.
+
+    Returns:
+        The query and the CallLog alias its ordering must use.
+    """
+    if not branches:
+        return select(CallLog).where(false()), CallLog
+    if len(branches) == 1:
+        return branches[0], CallLog
+
+    calls = union_all(*branches).subquery("calls")
+    call_log = aliased(CallLog, calls)
+    return select(call_log), call_log
+
+
+def filter_call_log_query(
+    query: Select,
+    call_type: Optional[CallType] = None,
+    call_status: Optional[CallStatus] = None,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+) -> Select:
+    """
+    Narrow a branch built by build_call_log_branches to a call type, call
+    status and start time range [start_time, end_time).
+    """
+    if call_type is not None:
+        query = query.filter(CallLog.call_type == call_type)
+    if call_status is not None:
+        query = query.filter(CallLog.call_status == call_status)
+    if start_time is not None:
+        query = query.filter(CallLog.call_start_time >= to_naive_utc(start_time))
+    if end_time is not None:
+        query = query.filter(CallLog.call_start_time < to_naive_utc(end_time))
+    return query
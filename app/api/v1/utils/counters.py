@@ -0,0 +1,57 @@
+from typing import Tuple
+from uuid import UUID
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.user import User
+from middlewares.read_your_writes import primary_window_end
+
+
+async def increment_phonenumber_count(
+    db_session: AsyncSession, user_id: UUID, delta: int = 1
+) -> None:
+    """
+    Adjust the user's phone number counter and bump the listing version, and
+    keep the user's reads on the primary until the replica has the write.
+    Must run inside the same transaction as the phone number write so the
+    counter and the phonenumbers table never disagree.
+    Args:
+        db_session: The AsyncSession performing the write.
+        user_id: Owner of the phone numbers.
+        delta: Number of phone numbers created (negative when deleted).
+    """
+    if not delta:
+        return
+
+    # Atomic in-database increment, safe under concurrent writers
+    await db_session.execute(
+        update(User)
+        .where(User.user_id == user_id)
+        .values(
+            phonenumber_count=User.phonenumber_count + delta,
+            phonenumbers_version=User.phonenumbers_version + 1,
+            primary_until=primary_window_end(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def get_phonenumber_count_and_version(
+    db_session: AsyncSession, user_id: UUID
+) -> Tuple[int, int]:
+    """
+    Read the user's phone number counter and listing version with a single
+    primary key lookup.
+
+    Returns:
+        Number of phone numbers owned by the user and their version.
+    """
+    row = (
+        await db_session.execute(
+            select(User.phonenumber_count, User.phonenumbers_version).where(
+                User.user_id == user_id
+            )
+        )
+    ).one_or_none()
+    return tuple(row) if row is not None else (0, 0)
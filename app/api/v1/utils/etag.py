@@ -0,0 +1,26 @@
+import hashlib
+from typing import Any, Optional
+
+
+def build_etag(*parts: Any) -> str:
+    """
+    Strong entity tag derived from everything the representation depends on
+    (e.g. owner, data version and query parameters).
+    """
+    digest = hashlib.sha256("\x1f".join(map(str, parts)).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Evaluate an If-None-Match header against the current ETag, using the weak
+    comparison RFC 9110 prescribes for it.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
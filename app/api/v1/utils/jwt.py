@@ -1,9 +1,13 @@
+import hashlib
+import time
+import uuid
 from fastapi import HTTPException, status
 from datetime import datetime, timedelta, timezone
 from jose import JWTError, jwt
-from typing import Dict
+from typing import Dict, Optional
 
 from core.config import settings
+from api.v1.utils.cache import TTLCache
 
 
 # General expiration times
@@ -16,6 +20,36 @@ TOKEN_EXPIRE_TIMES = {
 SECRET_KEY = settings.JWT_SECRET
 ALGORITHM = settings.ALGORITHM
 
+# Verified payloads keyed by the SHA-256 digest of the token (tokens themselves
+# are not kept in memory). Only tokens with a valid signature are cached.
+token_cache = TTLCache(
+    maxsize=settings.TOKEN_CACHE_MAX_SIZE, ttl=settings.TOKEN_CACHE_MAX_TTL_SECONDS
+)
+
+
+def _decode_token(token: str) -> dict:
+    """
+    Return the verified payload of token, from the cache when possible.
+
+    Raises:
+        JWTError: If the signature is invalid or the token expired.
+    """
+    key = hashlib.sha256(token.encode()).digest()
+    payload: Optional[dict] = token_cache.get(key)
+
+    # The cache TTL ends at exp already, the check guards against clock drift
+    if payload is None or payload["exp"] <= time.time():
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        if isinstance(payload.get("exp"), (int, float)):
+            token_cache.set(
+                key,
+                payload,
+                ttl=min(payload["exp"] - time.time(), settings.TOKEN_CACHE_MAX_TTL_SECONDS),
+            )
+
+    # Callers get their own copy, so the cached payload cannot be modified
+    return dict(payload)
+
 
 # Create JWT tokens with proper type embedded
 async def create_token(data: dict, token_type: str) -> str:
@@ -33,8 +67,9 @@ async def create_token(data: dict, token_type: str) -> str:
     # Calculate expiration time for the token
     expire = datetime.now(timezone.utc) + expire_delta
 
-    # Embed expiration time and token type into the token payload
-    data.update({"exp": expire, "type": token_type})
+    # Embed expiration time, token type and a unique id (used for revocation)
+    # into the token payload
+    data.update({"exp": expire, "type": token_type, "jti": uuid.uuid4().hex})
 
     # Encode the token using the provided secret key and algorithm
     token = jwt.encode(data, SECRET_KEY, algorithm=ALGORITHM)
@@ -59,10 +94,10 @@ async def verify_token(token: str, token_type: str = "access") -> dict:
         HTTPException: If token verification fails or token type mismatches.
     """
     try:
-        # Decode the token using the secret key and algorithm
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        # Decode the token using the secret key and algorithm (cached by token)
+        payload = _decode_token(token)
 
-        # Ensure the token type matches the expected type
+        # Ensure the token type matches the expected type, on cache hits too
         if payload.get("type") != token_type:
             raise JWTError("Invalid token type!")
 
@@ -1,14 +1,31 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, tuple_, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 from sqlalchemy.sql.selectable import Select
 from sqlalchemy.sql import func
-from typing import TypeVar
+from typing import Any, List, Optional, Sequence, TypeVar, Union
 from schemas.pagination import PaginationBase, PaginatedResponse
 
 T = TypeVar("T")
 
+# Direction markers embedded in cursors
+CURSOR_NEXT = "next"
+CURSOR_PREV = "prev"
+
 
 async def paginate_query(
-    db_session: AsyncSession, query: Select, offset: int, limit: int
+    db_session: AsyncSession,
+    query: Select,
+    offset: int,
+    limit: int,
+    total: Optional[int] = None,
 ) -> PaginatedResponse[T]:
     """
     Centralized pagination utility for async SQLAlchemy queries.
@@ -17,13 +34,16 @@ async def paginate_query(
         query: The SQLAlchemy query object.
         offset: The starting index for items.
         limit: The number of items to fetch.
+        total: Known number of matching rows (e.g. a maintained counter),
+            skips the count query when provided.
 
     Returns:
         A PaginatedResponse object.
     """
     # Fetch total count
-    count_query = query.with_only_columns(func.count())
-    total = await db_session.scalar(count_query)
+    if total is None:
+        count_query = query.with_only_columns(func.count())
+        total = await db_session.scalar(count_query)
 
     # Fetch items with pagination
     paginated_query = query.offset(offset).limit(limit)
@@ -43,3 +63,202 @@ async def paginate_query(
             prev_offset=prev_offset,
         ),
     )
+
+
+def _encode_value(value: Any) -> Any:
+    """
+    Convert a column value into a JSON friendly representation.
+    """
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def _decode_value(column, value: Any) -> Any:
+    """
+    Convert a JSON value from a cursor back to the python type of the column.
+    """
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is UUID:
+        return UUID(value)
+    return python_type(value)
+
+
+def encode_cursor(item: Any, columns: Sequence, direction: str) -> str:
+    """
+    Build an opaque cursor from the ordering column values of an item.
+    Args:
+        item: ORM object the cursor points at.
+        columns: Ordering columns of the query.
+        direction: CURSOR_NEXT or CURSOR_PREV.
+
+    Returns:
+        URL safe cursor string.
+    """
+    payload = {
+        "d": direction,
+        "v": [_encode_value(getattr(item, column.key)) for column in columns],
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> tuple[str, List[Any]]:
+    """
+    Decode a cursor produced by encode_cursor.
+    Args:
+        cursor: Cursor string sent by the client.
+        columns: Ordering columns of the query.
+
+    Returns:
+        Tuple of direction and ordering values.
+
+    Raises:
+        HTTPException: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        direction = payload["d"]
+        values = payload["v"]
+        if direction not in (CURSOR_NEXT, CURSOR_PREV) or len(values) != len(columns):
+            raise ValueError("Cursor does not match the query ordering.")
+        return direction, [
+            _decode_value(column, value) for column, value in zip(columns, values)
+        ]
+    except (ValueError, KeyError, TypeError, binascii.Error, UnicodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor!",
+        )
+
+
+def _keyset_filter(columns: Sequence, values: List[Any], descending: bool):
+    """
+    Build the row comparison `(col1, col2, ...) > (v1, v2, ...)` (or `<`).
+    """
+    if len(columns) == 1:
+        return columns[0] < values[0] if descending else columns[0] > values[0]
+
+    # Row value comparison lets the database walk the composite index directly
+    if descending:
+        return tuple_(*columns) < tuple_(*values)
+    return tuple_(*columns) > tuple_(*values)
+
+
+def _order(columns: Sequence, descending: bool) -> List[Any]:
+    return [column.desc() if descending else column.asc() for column in columns]
+
+
+def _merge_branches(branches: Sequence[Select], order_by: Sequence, descending: bool) -> Select:
+    """
+    UNION ALL of branches of the same entity, each already ordered and
+    limited, ordered again as a whole. Every branch is wrapped in a subquery
+    since SQLite rejects ORDER BY / LIMIT in compound members.
+    """
+    merged = union_all(*(select(*branch.subquery().c) for branch in branches)).subquery()
+    entity = aliased(branches[0].column_descriptions[0]["entity"], merged)
+    return select(entity).order_by(
+        *_order([getattr(entity, column.key) for column in order_by], descending)
+    )
+
+
+async def paginate_query_by_cursor(
+    db_session: AsyncSession,
+    query: Union[Select, Sequence[Select]],
+    order_by: Sequence,
+    limit: int,
+    cursor: Optional[str] = None,
+    descending: bool = False,
+    include_total: bool = False,
+    total: Optional[int] = None,
+) -> PaginatedResponse[T]:
+    """
+    Keyset (cursor) pagination for async SQLAlchemy queries.
+    Page latency stays flat regardless of depth since the database seeks
+    straight to the cursor position instead of skipping `offset` rows.
+
+    query may also be a list of branches selecting the same entity (e.g. one
+    per indexed key). Each branch then gets the keyset filter, ordering and
+    limit on its own, so it reads at most one page from its index, and only
+    those rows are merged: a single query whose condition spans several
+    index keys (an IN list) would return rows grouped by key and make the
+    database sort every match.
+    Args:
+        db_session: The AsyncSession to interact with the database.
+        query: The SQLAlchemy query object (without ordering), or a list of them.
+        order_by: Unique ordering columns, e.g. (created_at, primary key).
+        limit: The number of items to fetch.
+        cursor: Cursor returned by a previous page, None for the first page.
+        descending: Walk the ordering from the newest values.
+        include_total: Also run the count query (costs one extra round trip).
+        total: Known number of matching rows, reported as is when provided.
+
+    Returns:
+        A PaginatedResponse object with next/prev cursors.
+    """
+    branches = [query] if isinstance(query, Select) else list(query)
+
+    direction = CURSOR_NEXT
+    keyset = None
+    query_descending = descending
+    if cursor:
+        direction, values = decode_cursor(cursor, order_by)
+        # Walking backwards flips the comparison and the ordering
+        backwards = direction == CURSOR_PREV
+        query_descending = descending != backwards
+        keyset = _keyset_filter(order_by, values, query_descending)
+
+    # Fetch one extra row to know whether there are more items
+    pages = [
+        (branch if keyset is None else branch.filter(keyset))
+        .order_by(*_order(order_by, query_descending))
+        .limit(limit + 1)
+        for branch in branches
+    ]
+    page_query = (
+        pages[0]
+        if len(pages) == 1
+        else _merge_branches(pages, order_by, query_descending).limit(limit + 1)
+    )
+    result = await db_session.execute(page_query)
+    items = list(result.scalars().all())
+    has_more = len(items) > limit
+    items = items[:limit]
+
+    if direction == CURSOR_PREV:
+        items.reverse()
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, cursor is not None
+
+    next_cursor = (
+        encode_cursor(items[-1], order_by, CURSOR_NEXT) if items and has_next else None
+    )
+    prev_cursor = (
+        encode_cursor(items[0], order_by, CURSOR_PREV) if items and has_prev else None
+    )
+
+    if total is None and include_total:
+        total = sum(
+            [
+                await db_session.scalar(branch.with_only_columns(func.count()))
+                for branch in branches
+            ]
+        )
+
+    return PaginatedResponse(
+        data=items,
+        pagination=PaginationBase(
+            total=total,
+            limit=limit,
+            next_cursor=next_cursor,
+            prev_cursor=prev_cursor,
+        ),
+    )
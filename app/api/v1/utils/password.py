@@ -1,11 +1,55 @@
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 
+from core.config import settings
+from core.executors import BoundedExecutor, ExecutorSaturatedError
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Dedicated pool so bcrypt (~200ms per call) never blocks the event loop
+password_executor = BoundedExecutor(
+    name="password",
+    kind=settings.PASSWORD_HASH_EXECUTOR,
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
 
+# Module level functions, so process pools can pickle them for _run_in_pool
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
+
+
+async def _run_in_pool(fn, *args):
+    """
+    Run a password function on the pool, shedding load when it is saturated.
+
+    Raises:
+        HTTPException: 503 if too many hashing jobs are already queued.
+    """
+    try:
+        return await password_executor.run(fn, *args)
+    except ExecutorSaturatedError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please try again.",
+            headers={"Retry-After": "1"},
+        )
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Hash a password off the event loop.
+    """
+    return await _run_in_pool(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password against its hash off the event loop.
+    """
+    return await _run_in_pool(verify_password, plain_password, hashed_password)
@@ -0,0 +1,37 @@
+from typing import Dict, Optional, Type
+
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+from schemas.pagination import PaginatedResponse
+
+
+def fast_page_response(
+    page: PaginatedResponse,
+    item_model: Type[BaseModel],
+    headers: Optional[Dict[str, str]] = None,
+) -> ORJSONResponse:
+    """
+    Serialize a page of ORM objects exactly once, straight to JSON bytes.
+    Returning a Response skips FastAPI's response_model validation and
+    serialization: ORM column values are already typed by the database, so
+    each item only contributes the item_model fields (nothing else leaks) and
+    orjson encodes UUIDs, datetimes and enums natively. The output matches
+    the response_model path byte for byte; keep response_model on the route
+    for the OpenAPI schema.
+    Args:
+        page: Page built by the pagination utilities, data holds ORM objects.
+        item_model: Schema of an item; its fields must be plain attributes.
+        headers: Extra response headers.
+
+    Returns:
+        ORJSONResponse with the rendered page.
+    """
+    fields = tuple(item_model.model_fields)
+    return ORJSONResponse(
+        {
+            "data": [{field: getattr(item, field) for field in fields} for item in page.data],
+            "pagination": page.pagination.model_dump(),
+        },
+        headers=headers,
+    )
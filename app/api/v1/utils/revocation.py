@@ -0,0 +1,195 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Set
+from uuid import UUID
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from core.config import settings
+from models.revoked_token import RevokedToken
+from api.v1.utils.bloom import BloomFilter
+from api.v1.utils.upsert import insert_ignoring_conflicts
+
+logger = logging.getLogger(__name__)
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class RevocationFilter:
+    """
+    In-memory front of the revoked_tokens table: a Bloom filter of the jtis of
+    revoked, unexpired tokens. A filter miss proves a token was not revoked
+    (as of the last rebuild) without any I/O; only probable hits are looked up.
+    The filter is rebuilt from the database in the background (see
+    refresh_revocation_filter), never by a request: a filter older than
+    refresh_seconds is not trusted and every check is looked up until the
+    next rebuild, so revocations made by other workers take effect within
+    that interval.
+    """
+
+    def __init__(self, capacity: int, error_rate: float, refresh_seconds: float):
+        """
+        Args:
+            capacity: Minimum number of jtis the filter is sized for.
+            error_rate: Target false positive rate at capacity.
+            refresh_seconds: Maximum age of the filter before it is rebuilt.
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.refresh_seconds = refresh_seconds
+        self.filter: Optional[BloomFilter] = None
+        self.built_at = 0.0
+        self._rebuilding = False
+        # jtis revoked by this worker while a rebuild is loading
+        self._revoked_during_rebuild: Set[str] = set()
+
+        self.checks = 0
+        self.filter_negatives = 0
+        self.db_lookups = 0
+        self.confirmed = 0
+        self.rebuilds = 0
+        self.purged = 0
+
+    def stale(self) -> bool:
+        return self.filter is None or time.monotonic() - self.built_at >= self.refresh_seconds
+
+    async def rebuild(self, db_session: AsyncSession) -> None:
+        """
+        Delete the revocations of expired tokens, then replace the filter with
+        one loaded from the remaining ones, sized for twice their number (at
+        least capacity).
+        """
+        self._rebuilding = True
+        self._revoked_during_rebuild = set()
+        try:
+            started = time.monotonic()
+            # Expired tokens are rejected anyway, their rows would only grow the table
+            result = await db_session.execute(
+                delete(RevokedToken).where(RevokedToken.expires_at <= _utcnow())
+            )
+            await db_session.commit()
+            self.purged += result.rowcount
+
+            jtis = (
+                await db_session.scalars(
+                    select(RevokedToken.jti).where(RevokedToken.expires_at > _utcnow())
+                )
+            ).all()
+
+            bloom = BloomFilter(max(self.capacity, 2 * len(jtis)), self.error_rate)
+            for jti in jtis:
+                bloom.add(jti)
+            # Revocations committed after the query started may be missing from it
+            for jti in self._revoked_during_rebuild:
+                bloom.add(jti)
+
+            self.filter = bloom
+            self.built_at = started
+            self.rebuilds += 1
+        finally:
+            self._rebuilding = False
+            self._revoked_during_rebuild = set()
+
+    def add(self, jti: str) -> None:
+        """
+        Record a revocation made by this worker, effective immediately.
+        """
+        if self.filter is not None:
+            self.filter.add(jti)
+        if self._rebuilding:
+            self._revoked_during_rebuild.add(jti)
+
+    async def is_revoked(self, db_session: AsyncSession, jti: str) -> bool:
+        """
+        Check whether the token with the given jti was revoked.
+        Args:
+            db_session: Session for lookups (use the primary).
+            jti: The token's jti claim.
+
+        Returns:
+            True if the token is revoked.
+        """
+        self.checks += 1
+        if not self.stale() and jti not in self.filter:
+            self.filter_negatives += 1
+            return False
+
+        self.db_lookups += 1
+        revoked = await db_session.scalar(
+            select(RevokedToken.jti).where(RevokedToken.jti == jti)
+        )
+        if revoked is not None:
+            self.confirmed += 1
+        return revoked is not None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "checks": self.checks,
+            "filter_negatives": self.filter_negatives,
+            "db_lookups": self.db_lookups,
+            "confirmed": self.confirmed,
+            "rebuilds": self.rebuilds,
+            "purged": self.purged,
+            "filter_size": self.filter.count if self.filter is not None else 0,
+            "filter_age_seconds": (
+                time.monotonic() - self.built_at if self.filter is not None else None
+            ),
+        }
+
+
+# Per worker process, shared by all requests
+revocation_filter = RevocationFilter(
+    settings.REVOCATION_FILTER_CAPACITY,
+    settings.REVOCATION_FILTER_ERROR_RATE,
+    settings.REVOCATION_FILTER_REFRESH_SECONDS,
+)
+
+
+async def refresh_revocation_filter(session_factory: sessionmaker) -> None:
+    """
+    Rebuild this worker's filter twice per REVOCATION_FILTER_REFRESH_SECONDS,
+    until cancelled, so it never goes stale while the database is reachable.
+    """
+    while True:
+        try:
+            async with session_factory() as session:
+                await revocation_filter.rebuild(session)
+        except Exception:
+            logger.exception("Failed to rebuild the token revocation filter")
+        await asyncio.sleep(revocation_filter.refresh_seconds / 2)
+
+
+async def revoke_token(
+    db_session: AsyncSession, payload: dict, user_id: Optional[UUID] = None
+) -> bool:
+    """
+    Store the revocation of a verified token in the session's transaction
+    (the caller commits) and add it to this worker's filter.
+    Args:
+        db_session: The AsyncSession to interact with the database.
+        payload: Verified payload of the token.
+        user_id: Owner of the token.
+
+    Returns:
+        False if the token has no jti (issued before jtis) and cannot be revoked.
+    """
+    jti = payload.get("jti")
+    if not jti:
+        return False
+
+    expires_at = datetime.fromtimestamp(payload["exp"], timezone.utc).replace(tzinfo=None)
+    await db_session.execute(
+        insert_ignoring_conflicts(db_session, RevokedToken, ["jti"]).values(
+            jti=jti,
+            user_id=user_id,
+            token_type=payload.get("type", ""),
+            expires_at=expires_at,
+        )
+    )
+    revocation_filter.add(jti)
+    return True
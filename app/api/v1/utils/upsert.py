@@ -0,0 +1,71 @@
+from typing import Any, Dict, List, Sequence
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Dialects providing INSERT ... ON CONFLICT
+_INSERT_CONSTRUCTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def _dialect_insert(db_session: AsyncSession):
+    """
+    Return the insert construct of the session's dialect.
+    """
+    dialect = db_session.get_bind().dialect.name
+    try:
+        return _INSERT_CONSTRUCTS[dialect]
+    except KeyError:
+        raise NotImplementedError(f"ON CONFLICT inserts are not supported on {dialect}")
+
+
+def insert_ignoring_conflicts(
+    db_session: AsyncSession, model, index_elements: Sequence[str]
+):
+    """
+    Build an `INSERT ... ON CONFLICT (...) DO NOTHING` statement for the dialect
+    of the session, so a unique violation skips the row instead of failing
+    the whole statement (and transaction).
+    Args:
+        db_session: The AsyncSession the statement will run on.
+        model: Mapped class (or table) to insert into.
+        index_elements: Columns of the unique constraint to ignore conflicts on.
+
+    Returns:
+        Insert statement, chain `.values()` / `.returning()` as needed.
+    """
+    insert = _dialect_insert(db_session)
+    return insert(model).on_conflict_do_nothing(index_elements=index_elements)
+
+
+def insert_incrementing_on_conflict(
+    db_session: AsyncSession,
+    model,
+    index_elements: Sequence[str],
+    counters: Sequence[str],
+    rows: List[Dict[str, Any]],
+):
+    """
+    Build a multi-row `INSERT ... ON CONFLICT (...) DO UPDATE` adding the
+    counters of rows to the existing ones, i.e. `count = count + excluded.count`.
+    Rows must be unique on index_elements (one statement cannot touch the same
+    row twice); sort them to keep the lock order stable across writers.
+    Args:
+        db_session: The AsyncSession the statement will run on.
+        model: Mapped class to insert into.
+        index_elements: Columns of the unique constraint (e.g. the primary key).
+        counters: Columns to increment on conflict.
+        rows: Values to insert.
+
+    Returns:
+        Insert statement.
+    """
+    insert = _dialect_insert(db_session)
+    statement = insert(model).values(rows)
+    table = model.__table__
+    return statement.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={column: table.c[column] + statement.excluded[column] for column in counters},
+    )
@@ -0,0 +1,63 @@
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from core.config import settings
+from models.user import User
+from api.v1.utils.cache import TTLCache
+
+# Authenticated users keyed by user_id. Entries are invalidated by the hooks below
+# when this process changes a user; other workers pick changes up after the TTL.
+user_cache = TTLCache(
+    maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS
+)
+
+# Column attributes copied into the cache. The password hash is left out, the
+# auth path never reads it and login loads the user from the database.
+USER_COLUMNS = [
+    attr.key for attr in inspect(User).column_attrs if attr.key != "password"
+]
+
+
+def get_cached_user(user_id: UUID) -> Optional[User]:
+    """
+    Resolve a user from the cache without touching the database.
+    Args:
+        user_id: Primary key of the user.
+
+    Returns:
+        A detached User instance, or None on a cache miss.
+    """
+    snapshot = user_cache.get(user_id)
+    if snapshot is None:
+        return None
+
+    # Hand out a fresh detached copy so requests never share mutable ORM state
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    return user
+
+
+def cache_user(user: User) -> None:
+    """
+    Store a snapshot of the user's columns in the cache.
+    Note: denormalized counters on the snapshot may be stale, read them from the
+    database (see api.v1.utils.counters).
+    """
+    user_cache.set(user.user_id, {key: getattr(user, key) for key in USER_COLUMNS})
+
+
+def invalidate_user(user_id: UUID) -> None:
+    """
+    Drop a user from the cache, call after changing or deleting a user.
+    """
+    user_cache.pop(user_id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def invalidate_user_on_change(mapper, connection, target: User) -> None:
+    # ORM flushes that change or delete a user invalidate its cached copy
+    invalidate_user(target.user_id)
@@ -0,0 +1,86 @@
+"""
+Benchmark: phone number validation, single (uncached vs memoized) and batch
+(inline vs process pool).
+
+Usage (from the app directory):
+    python -m benchmarks.bench_phone_validation
+"""
+import asyncio
+import random
+import time
+import timeit
+
+from core.phone_validation import (
+    normalize_phone_number,
+    normalize_phone_numbers,
+    normalize_phone_numbers_async,
+    validation_executor,
+)
+
+# Valid numbers from a few regions (prefix, random digits), plus some junk.
+# The space is large enough that batches rarely repeat a number.
+PREFIXES = [("+12025", 6), ("+44207", 7), ("+97798", 8), ("+91974", 7), ("+61412", 6)]
+
+
+def random_numbers(count: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    numbers = []
+    for _ in range(count):
+        prefix, digits = rng.choice(PREFIXES)
+        if rng.random() < 0.05:
+            numbers.append("junk")
+        else:
+            numbers.append(f"{prefix}{rng.randrange(10 ** digits):0{digits}d}")
+    return numbers
+
+
+def bench_single(number: int = 20000) -> None:
+    values = random_numbers(number)
+    uncached = normalize_phone_number.__wrapped__
+
+    start = time.perf_counter()
+    for value in values:
+        uncached(value)
+    uncached_us = (time.perf_counter() - start) / number * 1e6
+
+    normalize_phone_number.cache_clear()
+    normalize_phone_number(values[0])
+    cached_us = timeit.timeit(lambda: normalize_phone_number(values[0]), number=number)
+    cached_us = cached_us / number * 1e6
+
+    print(f"{'single':<28}{'uncached us':>14}{'cached us':>12}")
+    print(f"{'':<28}{uncached_us:>14.2f}{cached_us:>12.2f}")
+
+
+def bench_batch(size: int) -> None:
+    values = random_numbers(size, seed=size)
+
+    normalize_phone_number.cache_clear()
+    start = time.perf_counter()
+    normalize_phone_numbers(values)
+    inline = time.perf_counter() - start
+
+    async def pooled():
+        # Warm up the worker processes so spawn time is not measured
+        await normalize_phone_numbers_async(random_numbers(size, seed=size + 1))
+        start = time.perf_counter()
+        await normalize_phone_numbers_async(values)
+        return time.perf_counter() - start
+
+    pool = asyncio.run(pooled())
+    print(
+        f"batch {size:<22}{size / inline:>14,.0f}{size / pool:>12,.0f}"
+        f"   numbers/s (inline, pool x{validation_executor.max_workers})"
+    )
+
+
+def main():
+    bench_single()
+    print()
+    for size in (1000, 10000, 100000):
+        bench_batch(size)
+    validation_executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
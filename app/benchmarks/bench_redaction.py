@@ -0,0 +1,70 @@
+"""
+Micro-benchmark: log redaction cost per request, legacy vs compiled Redactor.
+
+Usage (from the app directory):
+    python -m benchmarks.bench_redaction
+"""
+import json
+import re
+import timeit
+
+from core.config import settings
+from middlewares.redaction import Redactor
+
+
+def legacy_redact_sensitive_info(data: str) -> str:
+    """
+    The previous implementation, kept verbatim for comparison.
+    """
+    patterns = [
+        r'"password":\s*".+?"',
+        r'"access_token":\s*".+?"',
+    ]
+    for pattern in patterns:
+        data = re.sub(pattern, '"password":"[REDACTED]"', data)
+        data = re.sub(pattern, '"access_token":"[REDACTED]"', data)
+    return data
+
+
+SAMPLES = {
+    "login request": json.dumps({"email": "johndoe@example.com", "password": "hello_world"}),
+    "token response": json.dumps(
+        {"access_token": "a" * 180, "refresh_token": "r" * 180, "auth_type": "bearer"}
+    ),
+    "listing page (50 items)": json.dumps(
+        {
+            "data": [
+                {
+                    "phonenumber_id": "0b6f3c52-2f3e-4c1d-9d51-4a2f0f0e1a%02d" % i,
+                    "number": "+9779841234%03d" % i,
+                    "created_at": "2024-12-11T12:13:48.085935",
+                }
+                for i in range(50)
+            ],
+            "pagination": {"total": 2000, "limit": 50, "offset": 0},
+        }
+    ),
+}
+
+
+def main(number: int = 20000):
+    redactor = Redactor(
+        keys=["password", "access_token", "refresh_token", "token", "secret"],
+        headers=["authorization"],
+        max_scan_bytes=settings.LOG_REDACT_MAX_SCAN_BYTES,
+    )
+
+    print(f"{'payload':<26}{'bytes':>8}{'legacy us':>12}{'redactor us':>13}{'speedup':>9}")
+    for name, body in SAMPLES.items():
+        legacy = timeit.timeit(lambda: legacy_redact_sensitive_info(body), number=number)
+        new = timeit.timeit(
+            lambda: redactor.redact_body(body, "application/json"), number=number
+        )
+        print(
+            f"{name:<26}{len(body):>8}{legacy / number * 1e6:>12.2f}"
+            f"{new / number * 1e6:>13.2f}{legacy / new:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
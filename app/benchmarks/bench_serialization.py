@@ -0,0 +1,73 @@
+"""
+Micro-benchmark: rendering a 50-item phone number page, through FastAPI's
+response_model (validate, serialize, json.dumps) vs fast_page_response
+(attributes straight to orjson).
+
+Usage (from the app directory):
+    python -m benchmarks.bench_serialization
+"""
+import asyncio
+import timeit
+from datetime import datetime
+from uuid import uuid4
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+import models.call_log  # noqa: F401 (registers the mappers PhoneNumber relates to)
+import models.user  # noqa: F401
+from models.phonenumber import PhoneNumber
+from schemas.pagination import PaginatedResponse, PaginationBase
+from schemas.phonenumber import PhoneNumberRead
+from api.v1.utils.responses import fast_page_response
+
+
+def build_page(size: int = 50) -> PaginatedResponse:
+    items = [
+        PhoneNumber(
+            phonenumber_id=uuid4(),
+            user_id=uuid4(),
+            number=f"+9779841234{i:03d}",
+            created_at=datetime(2024, 12, 11, 12, 13, 48, 85935 + i),
+        )
+        for i in range(size)
+    ]
+    return PaginatedResponse(
+        data=items,
+        pagination=PaginationBase(total=2000, limit=size, offset=0, next_offset=size),
+    )
+
+
+def main(number: int = 5000):
+    page = build_page()
+    field = create_model_field(
+        name="Response_get_phonenumbers",
+        type_=PaginatedResponse[PhoneNumberRead],
+        mode="serialization",
+    )
+    loop = asyncio.new_event_loop()
+
+    def response_model_path() -> bytes:
+        # What FastAPI does with the PaginatedResponse an endpoint returns
+        content = loop.run_until_complete(
+            serialize_response(field=field, response_content=page, is_coroutine=True)
+        )
+        return JSONResponse(content).body
+
+    def fast_path() -> bytes:
+        return fast_page_response(page, PhoneNumberRead).body
+
+    assert response_model_path() == fast_path(), "outputs differ"
+
+    before = timeit.timeit(response_model_path, number=number) / number * 1e6
+    after = timeit.timeit(fast_path, number=number) / number * 1e6
+    print(f"{'path':<22}{'us/page':>10}")
+    print(f"{'response_model':<22}{before:>10.1f}")
+    print(f"{'fast_page_response':<22}{after:>10.1f}")
+    print(f"speedup: {before / after:.1f}x ({len(fast_path())} bytes per page)")
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
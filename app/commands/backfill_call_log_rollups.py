@@ -0,0 +1,158 @@
+"""
+Rebuild call_log_hourly_rollups from the call_logs table.
+
+Phone numbers are processed in primary key order, a batch per transaction:
+the batch's rollups in the range are deleted and recomputed from its calls,
+so the command is idempotent and can be re-run for any range. Each side of
+the calls is read through its (number, call_start_time) index, skipping sides
+the number's owner did not record, and call logs are streamed, so memory only
+grows with the number of rollup rows of a batch.
+
+It can run while call logs are ingested: on PostgreSQL every batch holds the
+rollup locks of its phone numbers exclusively, so write-behind flushes (which
+take the locks of their numbers shared before incrementing rollups) either
+commit before the batch reads call_logs or increment its rows after it
+committed. None is counted twice, and flushes for numbers outside the batch
+carry on while it runs.
+
+Usage:
+    python -m commands.backfill_call_log_rollups [--start 2024-01-01] [--end 2025-01-01]
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import sessionmaker
+
+from core.database import async_session
+from models.call_log import CallLog
+from models.call_log_rollup import CallLogHourlyRollup
+from models.phonenumber import PhoneNumber
+from api.v1.utils.call_log_rollups import (
+    DIRECTION_COLUMNS,
+    RECORDED_COLUMNS,
+    accumulate_call_logs,
+    hour_bucket,
+    lock_rollups,
+    write_rollups,
+)
+
+
+async def backfill_call_log_rollups(
+    session_factory: sessionmaker,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    batch_size: int = 100,
+    fetch_size: int = 5000,
+    pause: float = 0.0,
+) -> dict:
+    """
+    Recompute the hourly rollups of [start, end) for all phone numbers.
+    Args:
+        session_factory: Factory creating AsyncSession instances.
+        start: First hour to rebuild (rounded down to the hour), defaults to all history.
+        end: End of the range (exclusive), defaults to the end of the current hour.
+        batch_size: Phone numbers rebuilt per transaction.
+        fetch_size: Call logs fetched per round trip.
+        pause: Seconds to sleep between batches to limit load.
+
+    Returns:
+        dict: Number of phone numbers and call log sides scanned, rollup rows written.
+    """
+    start = hour_bucket(start) if start is not None else datetime.min
+    if end is None:
+        end = hour_bucket(datetime.now(timezone.utc).replace(tzinfo=None)) + timedelta(hours=1)
+
+    last_phonenumber_id = None
+    numbers = 0
+    scanned = 0
+    written = 0
+
+    while True:
+        async with session_factory() as session:
+            # Keyset walk over phone numbers so every batch is an index range scan
+            batch_query = (
+                select(PhoneNumber.phonenumber_id)
+                .order_by(PhoneNumber.phonenumber_id)
+                .limit(batch_size)
+            )
+            if last_phonenumber_id is not None:
+                batch_query = batch_query.filter(PhoneNumber.phonenumber_id > last_phonenumber_id)
+            phonenumber_ids = (await session.scalars(batch_query)).all()
+
+            if not phonenumber_ids:
+                break
+
+            # Wait for in-flight flushes of these numbers, hold new ones until
+            # the batch commits
+            await lock_rollups(session, phonenumber_ids, exclusive=True)
+            await session.execute(
+                delete(CallLogHourlyRollup)
+                .where(CallLogHourlyRollup.phonenumber_id.in_(phonenumber_ids))
+                .where(CallLogHourlyRollup.bucket_start >= start)
+                .where(CallLogHourlyRollup.bucket_start < end)
+            )
+
+            totals = {}
+            for direction, column in DIRECTION_COLUMNS.items():
+                number_column = getattr(CallLog, column)
+                result = await session.stream(
+                    select(CallLog)
+                    .with_only_columns(
+                        CallLog.caller_phonenumber,
+                        CallLog.receiver_phonenumber,
+                        CallLog.call_start_time,
+                        CallLog.call_duration,
+                        CallLog.call_type,
+                        CallLog.call_status,
+                        CallLog.recorded_by_caller,
+                        CallLog.recorded_by_receiver,
+                    )
+                    .where(number_column.in_(phonenumber_ids))
+                    .where(getattr(CallLog, RECORDED_COLUMNS[direction]))
+                    .where(CallLog.call_start_time >= start)
+                    .where(CallLog.call_start_time < end)
+                    .execution_options(yield_per=fetch_size)
+                )
+                async for call_logs in result.mappings().partitions(fetch_size):
+                    accumulate_call_logs(totals, call_logs, directions=[direction])
+                    scanned += len(call_logs)
+
+            written += await write_rollups(session, totals)
+            await session.commit()
+
+        numbers += len(phonenumber_ids)
+        last_phonenumber_id = phonenumber_ids[-1]
+        print(f"{numbers} phone numbers, {scanned} call log sides scanned, {written} rollups written")
+
+        if pause:
+            await asyncio.sleep(pause)
+
+    return {"numbers": numbers, "scanned": scanned, "written": written}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--start", type=datetime.fromisoformat, default=None)
+    parser.add_argument("--end", type=datetime.fromisoformat, default=None)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument(
+        "--pause", type=float, default=0.0, help="seconds to sleep between batches"
+    )
+    args = parser.parse_args()
+
+    asyncio.run(
+        backfill_call_log_rollups(
+            async_session,
+            start=args.start,
+            end=args.end,
+            batch_size=args.batch_size,
+            pause=args.pause,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
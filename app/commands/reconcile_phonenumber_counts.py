@@ -0,0 +1,122 @@
+"""
+Recompute users.phonenumber_count from the phonenumbers table.
+
+Users are processed in primary key order, one short transaction per batch,
+so the command can repair counter drift on a live database without locking
+the whole users table.
+
+Each batch first locks its user rows (in primary key order, like any other
+writer would wait on them), then counts their phone numbers in a separate
+statement. Phone number writes increment the counter in their own
+transaction, so one either commits before the batch is locked, and is
+counted, or blocks on the lock and increments the repaired counter after
+the batch committed. Counting in the UPDATE itself would not do: under READ
+COMMITTED a row re-checked after a concurrent increment keeps the
+statement's old snapshot for the count, which misses the new phone number.
+
+Usage:
+    python -m commands.reconcile_phonenumber_counts --batch-size 1000
+"""
+import argparse
+import asyncio
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.orm import sessionmaker
+
+from core.database import async_session
+from models.phonenumber import PhoneNumber
+from models.user import User
+
+
+async def reconcile_phonenumber_counts(
+    session_factory: sessionmaker, batch_size: int = 1000, pause: float = 0.0
+) -> dict:
+    """
+    Recompute the phone number counters in batches.
+    Args:
+        session_factory: Factory creating AsyncSession instances.
+        batch_size: Number of users per transaction.
+        pause: Seconds to sleep between batches to limit load.
+
+    Returns:
+        dict: Number of users scanned and counters repaired.
+    """
+    last_user_id = None
+    scanned = 0
+    repaired = 0
+
+    while True:
+        async with session_factory() as session:
+            # Keyset walk over users so every batch is an index range scan,
+            # locked until the batch commits
+            batch_query = (
+                select(User.user_id, User.phonenumber_count)
+                .order_by(User.user_id)
+                .limit(batch_size)
+                .with_for_update()
+            )
+            if last_user_id is not None:
+                batch_query = batch_query.filter(User.user_id > last_user_id)
+            stored_counts = dict((await session.execute(batch_query)).all())
+
+            if not stored_counts:
+                break
+            user_ids = list(stored_counts)
+
+            actual_counts = dict(
+                (
+                    await session.execute(
+                        select(PhoneNumber.user_id, func.count(PhoneNumber.phonenumber_id))
+                        .where(PhoneNumber.user_id.in_(user_ids))
+                        .group_by(PhoneNumber.user_id)
+                    )
+                ).all()
+            )
+
+            # Only rewrite rows that actually drifted
+            drifted = {
+                user_id: actual_counts.get(user_id, 0)
+                for user_id, count in stored_counts.items()
+                if count != actual_counts.get(user_id, 0)
+            }
+            if drifted:
+                await session.execute(
+                    update(User)
+                    .where(User.user_id.in_(drifted))
+                    .values(
+                        phonenumber_count=case(drifted, value=User.user_id),
+                        # Listings cached against the old version are stale too
+                        phonenumbers_version=User.phonenumbers_version + 1,
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+            await session.commit()
+
+        scanned += len(user_ids)
+        repaired += len(drifted)
+        last_user_id = user_ids[-1]
+        print(f"{scanned} users scanned, {repaired} counters repaired")
+
+        if pause:
+            await asyncio.sleep(pause)
+
+    return {"scanned": scanned, "repaired": repaired}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument(
+        "--pause", type=float, default=0.0, help="seconds to sleep between batches"
+    )
+    args = parser.parse_args()
+
+    asyncio.run(
+        reconcile_phonenumber_counts(
+            async_session, batch_size=args.batch_size, pause=args.pause
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,449 @@
+"""
+Seed the database with generated users, phone numbers and call logs at scale.
+
+Rows are written straight to the database, bypassing the API: chunks of rows
+are generated on a process pool and loaded with COPY (PostgreSQL) or
+multi-row inserts, several chunks at a time. Generation is deterministic:
+the same --seed and --end produce the same rows, whatever the parallelism
+and --chunk-size (random draws come from fixed blocks of SEED_BLOCK_SIZE
+rows, not from chunks).
+
+- Phone numbers are valid E.164 numbers (UK, India, Australia, France).
+- Numbers per user and calls per number are skewed (a few hot users and
+  numbers get most of them), receivers are skewed independently of callers.
+- Call start times are spread over --days before --end, busiest in the
+  daytime; durations are log-normal for completed calls.
+
+Afterwards the phone number counters and the call log rollups are rebuilt
+with the reconcile / backfill commands. Seed an empty database (or use
+another --seed): existing rows with the same ids or numbers fail the load.
+All seeded users log in with the password "seed-password".
+
+Usage:
+    python -m commands.seed_db --users 10000 --numbers 300000 --call-logs 20000000 --seed 42
+"""
+import argparse
+import asyncio
+import hashlib
+import math
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+from core.database import async_session
+from core.executors import BoundedExecutor
+from models.call_log import CallLog
+from models.phonenumber import PhoneNumber
+from models.user import User
+from api.v1.utils.password import hash_password
+from commands.backfill_call_log_rollups import backfill_call_log_rollups
+from commands.reconcile_phonenumber_counts import reconcile_phonenumber_counts
+
+SEED_PASSWORD = "seed-password"
+
+# Number ranges in which every suffix is a valid number: (prefix, suffix digits)
+NUMBER_RANGES = (
+    ("+44207", 7),  # London landlines
+    ("+9198", 8),  # Indian mobiles
+    ("+6141", 7),  # Australian mobiles
+    ("+3361", 7),  # French mobiles
+)
+
+# Relative call volume per hour of the day
+HOURLY_WEIGHTS = (
+    1, 1, 1, 1, 1, 2, 4, 8, 12, 14, 15, 15, 13, 14, 15, 15, 14, 12, 10, 8, 6, 4, 2, 1,
+)
+
+# (call_type, call_status, weight)
+CALL_OUTCOMES = (
+    ("outgoing", "completed", 40),
+    ("incoming", "completed", 35),
+    ("missed", "no_answer", 12),
+    ("rejected", "busy", 6),
+    ("outgoing", "failed", 4),
+    ("outgoing", "no_answer", 3),
+)
+
+# Rows drawing from one random stream, independent of the chunk size
+SEED_BLOCK_SIZE = 1000
+
+USER_COLUMNS = ("user_id", "email", "password", "created_at")
+PHONENUMBER_COLUMNS = ("phonenumber_id", "number", "user_id", "created_at")
+CALL_LOG_COLUMNS = (
+    "call_log_id",
+    "caller_phonenumber",
+    "receiver_phonenumber",
+    "call_start_time",
+    "call_end_time",
+    "call_duration",
+    "call_type",
+    "call_status",
+    "created_at",
+)
+
+
+def seeded_uuid(seed: int, kind: str, index: int) -> uuid.UUID:
+    """
+    The id of the index-th row of kind, so rows can reference each other
+    without reading them back.
+    """
+    digest = hashlib.blake2b(f"{seed}:{kind}:{index}".encode(), digest_size=16).digest()
+    return uuid.UUID(bytes=digest, version=4)
+
+
+def seeded_rows(
+    seed: int, kind: str, start: int, stop: int
+) -> Iterator[Tuple[int, random.Random]]:
+    """
+    Yield (index, rng) for the rows of kind from the start of the block that
+    holds start up to stop, one random stream per SEED_BLOCK_SIZE rows.
+    Generators draw for every yielded row and keep those from start on, so
+    a row's values do not depend on where its chunk begins.
+    """
+    first_block = start // SEED_BLOCK_SIZE
+    for block in range(first_block, math.ceil(stop / SEED_BLOCK_SIZE)):
+        rng = random.Random(f"{seed}:{kind}:{block}")
+        block_start = block * SEED_BLOCK_SIZE
+        for index in range(block_start, min(block_start + SEED_BLOCK_SIZE, stop)):
+            yield index, rng
+
+
+def skewed_index(rng: random.Random, count: int, skew: float) -> int:
+    """
+    Index in [0, count), concentrated on low indexes for skew > 1 (uniform at 1).
+    """
+    return min(int(count * rng.random() ** skew), count - 1)
+
+
+def seeded_number(seed: int, index: int) -> str:
+    """
+    The index-th phone number: distinct for distinct indexes, spread over the
+    ranges and scrambled within them (multiplying by a number coprime with 10
+    is a bijection modulo a power of 10).
+    """
+    prefix, digits = NUMBER_RANGES[index % len(NUMBER_RANGES)]
+    size = 10**digits
+    local = index // len(NUMBER_RANGES)
+    if local >= size:
+        raise ValueError(f"Phone number index {index} is out of range")
+    suffix = (local * 7919 + seed * 104729) % size
+    return f"{prefix}{suffix:0{digits}d}"
+
+
+def generate_users(
+    seed: int, start: int, stop: int, password: str, created_before: datetime
+) -> List[Tuple]:
+    rows = []
+    for index, rng in seeded_rows(seed, "user", start, stop):
+        # Within the year before the first phone numbers
+        created_at = created_before - timedelta(days=365, seconds=rng.randrange(86400 * 365))
+        if index < start:
+            continue
+        rows.append(
+            (
+                seeded_uuid(seed, "user", index),
+                f"seed-user-{index}@example.com",
+                password,
+                created_at,
+            )
+        )
+    return rows
+
+
+def generate_phonenumbers(
+    seed: int,
+    start: int,
+    stop: int,
+    users: int,
+    skew: float,
+    created_before: datetime,
+) -> List[Tuple]:
+    rows = []
+    for index, rng in seeded_rows(seed, "phonenumber", start, stop):
+        owner = skewed_index(rng, users, skew)
+        # Within the year before the first call
+        created_at = created_before - timedelta(seconds=rng.randrange(86400 * 365))
+        if index < start:
+            continue
+        rows.append(
+            (
+                seeded_uuid(seed, "phonenumber", index),
+                seeded_number(seed, index),
+                seeded_uuid(seed, "user", owner),
+                created_at,
+            )
+        )
+    return rows
+
+
+def generate_call_logs(
+    seed: int,
+    start: int,
+    stop: int,
+    phonenumbers: int,
+    skew: float,
+    end: datetime,
+    days: int,
+) -> List[Tuple]:
+    hours = range(24)
+    outcomes = [outcome[:2] for outcome in CALL_OUTCOMES]
+    outcome_weights = [outcome[2] for outcome in CALL_OUTCOMES]
+    first_day = end - timedelta(days=days)
+
+    rows = []
+    for index, rng in seeded_rows(seed, "call_log", start, stop):
+        caller = skewed_index(rng, phonenumbers, skew)
+        # Hot receivers are other numbers than the hot callers
+        receiver = (skewed_index(rng, phonenumbers, skew) + phonenumbers // 2) % phonenumbers
+        if receiver == caller:
+            receiver = (receiver + 1) % phonenumbers
+
+        call_start_time = first_day + timedelta(
+            days=rng.randrange(days),
+            hours=rng.choices(hours, HOURLY_WEIGHTS)[0],
+            seconds=rng.randrange(3600),
+        )
+        call_type, call_status = rng.choices(outcomes, outcome_weights)[0]
+        if call_status == "completed":
+            # Median about a minute, with a long tail
+            call_duration = round(min(rng.lognormvariate(math.log(60), 1.0), 4 * 3600), 1)
+        else:
+            call_duration = 0.0
+        if index < start:
+            continue
+
+        rows.append(
+            (
+                seeded_uuid(seed, "call_log", index),
+                seeded_uuid(seed, "phonenumber", caller),
+                seeded_uuid(seed, "phonenumber", receiver),
+                call_start_time,
+                call_start_time + timedelta(seconds=call_duration),
+                call_duration,
+                call_type,
+                call_status,
+                call_start_time + timedelta(seconds=call_duration),
+            )
+        )
+    return rows
+
+
+async def load_rows(
+    session_factory: sessionmaker,
+    model,
+    columns: Sequence[str],
+    rows: List[Tuple],
+    use_copy: bool,
+) -> None:
+    """
+    Write one chunk of rows in its own transaction.
+    """
+    async with session_factory() as session:
+        if use_copy:
+            connection = await session.connection()
+            raw_connection = await connection.get_raw_connection()
+            await raw_connection.driver_connection.copy_records_to_table(
+                model.__tablename__, records=rows, columns=list(columns)
+            )
+        else:
+            # executemany() is sent as multi-row INSERT ... VALUES batches
+            await session.execute(
+                insert(model), [dict(zip(columns, row)) for row in rows]
+            )
+        await session.commit()
+
+
+async def seed_table(
+    session_factory: sessionmaker,
+    executor: Optional[BoundedExecutor],
+    model,
+    columns: Sequence[str],
+    generate,
+    generate_args: Tuple[Any, ...],
+    seed: int,
+    total: int,
+    chunk_size: int,
+    workers: int,
+    use_copy: bool,
+) -> int:
+    """
+    Generate and load total rows of model in chunks, workers chunks at a time.
+
+    Returns:
+        Number of rows loaded.
+    """
+    slots = asyncio.Semaphore(workers)
+    started = time.perf_counter()
+    loaded = 0
+
+    async def seed_chunk(chunk: int) -> None:
+        nonlocal loaded
+        start = chunk * chunk_size
+        args = (seed, start, min(start + chunk_size, total), *generate_args)
+        async with slots:
+            if executor is not None:
+                rows = await executor.run(generate, *args)
+            else:
+                rows = generate(*args)
+            await load_rows(session_factory, model, columns, rows, use_copy)
+
+        loaded += len(rows)
+        elapsed = time.perf_counter() - started
+        print(
+            f"{model.__tablename__}: {loaded}/{total} rows "
+            f"({loaded / elapsed:.0f} rows/s)"
+        )
+
+    await asyncio.gather(*(seed_chunk(chunk) for chunk in range(math.ceil(total / chunk_size))))
+    return loaded
+
+
+async def seed_db(
+    session_factory: sessionmaker,
+    users: int,
+    phonenumbers: int,
+    call_logs: int,
+    seed: int = 0,
+    days: int = 90,
+    end: Optional[datetime] = None,
+    number_skew: float = 2.0,
+    call_skew: float = 3.0,
+    chunk_size: int = 10000,
+    workers: int = 4,
+    processes: Optional[int] = None,
+    use_copy: Optional[bool] = None,
+    rebuild: bool = True,
+) -> dict:
+    """
+    Generate and load users, then phone numbers, then call logs.
+    Args:
+        session_factory: Factory creating AsyncSession instances.
+        users, phonenumbers, call_logs: Rows to create.
+        seed: Seed of the generated data.
+        days: Days before end over which calls are spread.
+        end: End of the call period, defaults to today (UTC midnight).
+        number_skew: Skew of phone numbers per user (1 is uniform).
+        call_skew: Skew of calls per phone number (1 is uniform).
+        chunk_size: Rows per generated chunk and transaction.
+        workers: Chunks loaded at once.
+        processes: Generator processes, defaults to the number of CPUs
+            (0 generates in this process).
+        use_copy: Load with COPY, defaults to True on PostgreSQL.
+        rebuild: Rebuild the phone number counters and call log rollups.
+
+    Returns:
+        dict: Number of rows created per table.
+    """
+    if call_logs and phonenumbers < 2:
+        raise ValueError("Call logs need at least 2 phone numbers")
+    if phonenumbers and not users:
+        raise ValueError("Phone numbers need at least 1 user")
+
+    if end is None:
+        end = datetime.now(timezone.utc).replace(
+            tzinfo=None, hour=0, minute=0, second=0, microsecond=0
+        )
+    if use_copy is None:
+        async with session_factory() as session:
+            use_copy = session.get_bind().dialect.driver == "asyncpg"
+
+    executor = None
+    if processes != 0:
+        executor = BoundedExecutor(
+            "seed", kind="process", max_workers=processes, max_pending=workers
+        )
+
+    # One hash for everyone, bcrypt per user would dominate the run
+    password = hash_password(SEED_PASSWORD)
+
+    options = dict(seed=seed, chunk_size=chunk_size, workers=workers, use_copy=use_copy)
+    first_day = end - timedelta(days=days)
+    try:
+        created = {
+            "users": await seed_table(
+                session_factory,
+                executor,
+                User,
+                USER_COLUMNS,
+                generate_users,
+                (password, first_day),
+                total=users,
+                **options,
+            ),
+            "phonenumbers": await seed_table(
+                session_factory,
+                executor,
+                PhoneNumber,
+                PHONENUMBER_COLUMNS,
+                generate_phonenumbers,
+                (users, number_skew, first_day),
+                total=phonenumbers,
+                **options,
+            ),
+            "call_logs": await seed_table(
+                session_factory,
+                executor,
+                CallLog,
+                CALL_LOG_COLUMNS,
+                generate_call_logs,
+                (phonenumbers, call_skew, end, days),
+                total=call_logs,
+                **options,
+            ),
+        }
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    if rebuild:
+        await reconcile_phonenumber_counts(session_factory, batch_size=chunk_size)
+        await backfill_call_log_rollups(session_factory, start=first_day, end=end)
+    return created
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--numbers", type=int, default=10000)
+    parser.add_argument("--call-logs", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--days", type=int, default=90, help="days of calls before --end")
+    parser.add_argument("--end", type=datetime.fromisoformat, default=None)
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=4, help="chunks loaded at once")
+    parser.add_argument(
+        "--processes", type=int, default=None, help="generator processes (default: CPUs)"
+    )
+    parser.add_argument(
+        "--no-copy", action="store_true", help="load with multi-row inserts instead of COPY"
+    )
+    parser.add_argument(
+        "--skip-rebuild", action="store_true", help="skip rebuilding counters and rollups"
+    )
+    args = parser.parse_args()
+
+    asyncio.run(
+        seed_db(
+            async_session,
+            users=args.users,
+            phonenumbers=args.numbers,
+            call_logs=args.call_logs,
+            seed=args.seed,
+            days=args.days,
+            end=args.end,
+            chunk_size=args.chunk_size,
+            workers=args.workers,
+            processes=args.processes,
+            use_copy=False if args.no_copy else None,
+            rebuild=not args.skip_rebuild,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import json
 import os
 from pydantic_settings import BaseSettings
 from pathlib import Path
@@ -27,12 +28,145 @@ class Settings(BaseSettings):
         f"postgresql+asyncpg://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
     )
 
+    # Optional streaming read replica for GET routes (empty host: primary only)
+    POSTGRES_REPLICA_HOST: str = os.getenv("POSTGRES_REPLICA_HOST", "")
+    POSTGRES_REPLICA_PORT: int = int(os.getenv("POSTGRES_REPLICA_PORT", POSTGRES_PORT))
+    ASYNC_POSTGRES_REPLICA_URL: str = (
+        f"postgresql+asyncpg://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_REPLICA_HOST}:{POSTGRES_REPLICA_PORT}/{POSTGRES_DB}"
+        if POSTGRES_REPLICA_HOST
+        else ""
+    )
+    # Reads of a client stay on the primary this long after its writes, and an
+    # unreachable replica is skipped this long before it is tried again
+    READ_YOUR_WRITES_SECONDS: float = float(os.getenv("READ_YOUR_WRITES_SECONDS", 5))
+    REPLICA_RETRY_SECONDS: float = float(os.getenv("REPLICA_RETRY_SECONDS", 30))
+    # Users each worker remembers as recent writers, sparing their reads the
+    # primary lookup of users.primary_until
+    READ_YOUR_WRITES_CACHE_SIZE: int = int(os.getenv("READ_YOUR_WRITES_CACHE_SIZE", 100000))
+
+    # Connection pool, per worker process: keep workers * (DB_POOL_SIZE +
+    # DB_MAX_OVERFLOW) below the server's max_connections
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 10))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 5))
+    DB_POOL_TIMEOUT_SECONDS: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", 10))
+    DB_POOL_RECYCLE_SECONDS: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", 1800))
+    DB_POOL_PRE_PING: bool = str_to_bool(os.getenv("DB_POOL_PRE_PING", "True"))
+    # asyncpg: connect / statement timeouts and prepared statement cache per
+    # connection (set the cache to 0 behind pgbouncer in transaction mode)
+    DB_CONNECT_TIMEOUT_SECONDS: float = float(os.getenv("DB_CONNECT_TIMEOUT_SECONDS", 5))
+    DB_COMMAND_TIMEOUT_SECONDS: float = float(os.getenv("DB_COMMAND_TIMEOUT_SECONDS", 60))
+    DB_STATEMENT_CACHE_SIZE: int = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 256))
+
+    # Load shedding: per worker limit of concurrent requests, adapted (AIMD)
+    # to the time requests wait for a database connection; requests over the
+    # limit get a 503 right away. A max limit of 0 disables it
+    LOAD_SHED_MIN_LIMIT: int = int(os.getenv("LOAD_SHED_MIN_LIMIT", 10))
+    LOAD_SHED_INITIAL_LIMIT: int = int(os.getenv("LOAD_SHED_INITIAL_LIMIT", 100))
+    LOAD_SHED_MAX_LIMIT: int = int(os.getenv("LOAD_SHED_MAX_LIMIT", 500))
+    LOAD_SHED_TARGET_QUEUE_DELAY_MS: float = float(os.getenv("LOAD_SHED_TARGET_QUEUE_DELAY_MS", 50))
+    LOAD_SHED_ADJUST_INTERVAL_SECONDS: float = float(
+        os.getenv("LOAD_SHED_ADJUST_INTERVAL_SECONDS", 1.0)
+    )
+    LOAD_SHED_RETRY_AFTER_SECONDS: int = int(os.getenv("LOAD_SHED_RETRY_AFTER_SECONDS", 1))
+
+    # Prometheus /metrics: directory the worker processes share their metric
+    # snapshots in, written this often (empty: report the serving worker only)
+    METRICS_DIR: str = os.getenv("METRICS_DIR", "")
+    METRICS_SNAPSHOT_SECONDS: float = float(os.getenv("METRICS_SNAPSHOT_SECONDS", 5))
+    EVENT_LOOP_LAG_INTERVAL_SECONDS: float = float(
+        os.getenv("EVENT_LOOP_LAG_INTERVAL_SECONDS", 0.5)
+    )
+
+    # SQL instrumentation: per request query count / time in a Server-Timing
+    # header, statements slower than SLOW_QUERY_MS logged (0 disables) and
+    # statements run N_PLUS_ONE_THRESHOLD times in one request flagged
+    SERVER_TIMING_ENABLED: bool = str_to_bool(os.getenv("SERVER_TIMING_ENABLED", "True"))
+    SLOW_QUERY_MS: float = float(os.getenv("SLOW_QUERY_MS", 200))
+    N_PLUS_ONE_THRESHOLD: int = int(os.getenv("N_PLUS_ONE_THRESHOLD", 10))
+
     # JWT authentication settings
     JWT_SECRET: str = os.getenv("JWT_SECRET", "default_secret_key")
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 5))
     REFRESH_TOKEN_EXPIRE_DAYS:int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 7))
 
+    # Verified JWT payloads (per worker process), kept until the token expires
+    # but at most TOKEN_CACHE_MAX_TTL_SECONDS; a max size of 0 disables it
+    TOKEN_CACHE_MAX_SIZE: int = int(os.getenv("TOKEN_CACHE_MAX_SIZE", 10000))
+    TOKEN_CACHE_MAX_TTL_SECONDS: int = int(os.getenv("TOKEN_CACHE_MAX_TTL_SECONDS", 900))
+
+    # Token revocation: Bloom filter of revoked jtis (per worker process),
+    # rebuilt from the database in the background and trusted this long;
+    # revocations made on other workers take effect within that interval
+    REVOCATION_FILTER_CAPACITY: int = int(os.getenv("REVOCATION_FILTER_CAPACITY", 100000))
+    REVOCATION_FILTER_ERROR_RATE: float = float(os.getenv("REVOCATION_FILTER_ERROR_RATE", 0.001))
+    REVOCATION_FILTER_REFRESH_SECONDS: float = float(
+        os.getenv("REVOCATION_FILTER_REFRESH_SECONDS", 30)
+    )
+
+    # Authenticated user cache (per worker process), 0 disables it
+    USER_CACHE_MAX_SIZE: int = int(os.getenv("USER_CACHE_MAX_SIZE", 10000))
+    USER_CACHE_TTL_SECONDS: int = int(os.getenv("USER_CACHE_TTL_SECONDS", 60))
+
+    # Password hashing pool: "thread" (bcrypt releases the GIL) or "process"
+    PASSWORD_HASH_EXECUTOR: str = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
+    PASSWORD_HASH_MAX_PENDING: int = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 64))
+
+    # API log writer: records are queued and written by a background thread
+    LOG_MAX_BYTES: int = int(os.getenv("LOG_MAX_BYTES", 5 * 1024 * 1024))
+    LOG_BACKUP_COUNT: int = int(os.getenv("LOG_BACKUP_COUNT", 3))
+    LOG_COMPRESS_ROTATED: bool = str_to_bool(os.getenv("LOG_COMPRESS_ROTATED", "False"))
+    LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+    LOG_BATCH_SIZE: int = int(os.getenv("LOG_BATCH_SIZE", 256))
+    # drop or block; block never waits on the event loop thread (only in scripts)
+    LOG_QUEUE_FULL_POLICY: str = os.getenv("LOG_QUEUE_FULL_POLICY", "drop")
+
+    # API log content: body cap per message, sampling and errors-only mode
+    LOG_MAX_BODY_BYTES: int = int(os.getenv("LOG_MAX_BODY_BYTES", 4096))
+    LOG_SAMPLE_RATE: float = float(os.getenv("LOG_SAMPLE_RATE", 1.0))
+    # JSON object of path prefix -> sample rate, e.g. {"/health": 0}
+    LOG_ROUTE_SAMPLE_RATES: dict = json.loads(os.getenv("LOG_ROUTE_SAMPLE_RATES", "{}"))
+    LOG_ERRORS_ONLY: bool = str_to_bool(os.getenv("LOG_ERRORS_ONLY", "False"))
+
+    # Redaction of logged bodies, query strings and headers (comma separated names)
+    LOG_REDACT_KEYS: str = os.getenv(
+        "LOG_REDACT_KEYS", "password,access_token,refresh_token,token,secret"
+    )
+    LOG_REDACT_HEADERS: str = os.getenv(
+        "LOG_REDACT_HEADERS", "authorization,cookie,set-cookie,proxy-authorization,x-api-key"
+    )
+    LOG_REDACT_MAX_SCAN_BYTES: int = int(os.getenv("LOG_REDACT_MAX_SCAN_BYTES", 4096))
+
+    # Phone number validation: LRU cache of normalized numbers and a process pool
+    # for large batches (workers 0 validates everything inline). The pool is per
+    # uvicorn worker, keep workers * PHONENUMBER_POOL_WORKERS within the CPUs.
+    PHONENUMBER_CACHE_SIZE: int = int(os.getenv("PHONENUMBER_CACHE_SIZE", 65536))
+    PHONENUMBER_POOL_WORKERS: int = int(os.getenv("PHONENUMBER_POOL_WORKERS", 2))
+    PHONENUMBER_POOL_MIN_BATCH: int = int(os.getenv("PHONENUMBER_POOL_MIN_BATCH", 512))
+    PHONENUMBER_POOL_MAX_PENDING: int = int(os.getenv("PHONENUMBER_POOL_MAX_PENDING", 32))
+
+    # Bulk phone number provisioning
+    BULK_MAX_ROWS: int = int(os.getenv("BULK_MAX_ROWS", 100000))
+    BULK_CHUNK_SIZE: int = int(os.getenv("BULK_CHUNK_SIZE", 1000))
+
+    # Call log ingestion: write-behind buffer flushed by row count or interval
+    CALL_LOG_BUFFER_MAX_ROWS: int = int(os.getenv("CALL_LOG_BUFFER_MAX_ROWS", 50000))
+    CALL_LOG_FLUSH_ROWS: int = int(os.getenv("CALL_LOG_FLUSH_ROWS", 1000))
+    CALL_LOG_FLUSH_INTERVAL_SECONDS: float = float(os.getenv("CALL_LOG_FLUSH_INTERVAL_SECONDS", 1.0))
+    CALL_LOG_INGEST_CHUNK_SIZE: int = int(os.getenv("CALL_LOG_INGEST_CHUNK_SIZE", 500))
+    CALL_LOG_MAX_REPORTED_ERRORS: int = int(os.getenv("CALL_LOG_MAX_REPORTED_ERRORS", 100))
+    CALL_LOG_SUMMARY_MAX_DAYS: int = int(os.getenv("CALL_LOG_SUMMARY_MAX_DAYS", 366))
+    # Listings and exports query each (number, side) on its own index up to
+    # this many pairs, users with more numbers get a single query
+    CALL_LOG_MAX_BRANCHES: int = int(os.getenv("CALL_LOG_MAX_BRANCHES", 32))
+    # Call log export: rows fetched per server-side cursor round trip, and
+    # exports streamed at once per worker
+    CALL_LOG_EXPORT_FETCH_SIZE: int = int(os.getenv("CALL_LOG_EXPORT_FETCH_SIZE", 1000))
+    CALL_LOG_EXPORT_MAX_CONCURRENT: int = int(os.getenv("CALL_LOG_EXPORT_MAX_CONCURRENT", 4))
+    PHONENUMBER_ID_CACHE_SIZE: int = int(os.getenv("PHONENUMBER_ID_CACHE_SIZE", 100000))
+    PHONENUMBER_ID_CACHE_TTL_SECONDS: int = int(os.getenv("PHONENUMBER_ID_CACHE_TTL_SECONDS", 300))
+
     # Optional settings
     DEBUG: bool = str_to_bool(os.getenv("DEBUG", "False"))
     TESTING: bool = str_to_bool(os.getenv("TESTING", "False"))
@@ -1,19 +1,317 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import logging
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import SQLAlchemyError, TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.sql.functions import now
 
 from core.config import settings
+from core.metrics import Histogram
 
 DATABASE_URL = settings.ASYNC_POSTGRES_URL
 
-engine = create_async_engine(DATABASE_URL)
+REPLICA_URL = settings.ASYNC_POSTGRES_REPLICA_URL
+
+logger = logging.getLogger(__name__)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool recording how long checkouts wait, to spot pool saturation:
+    wait_seconds holds the time spent getting a connection (including opening
+    new ones), timeouts the checkouts that gave up after pool_timeout.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_seconds = Histogram()
+        self.timeouts = 0
+
+    def recreate(self):
+        # Keep the metrics when the engine replaces its pool (e.g. dispose())
+        pool = super().recreate()
+        pool.wait_seconds = self.wait_seconds
+        pool.timeouts = self.timeouts
+        return pool
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self.wait_seconds.observe(time.perf_counter() - start)
+
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """
+    create_async_engine() arguments for url from the DB_* settings.
+    SQLite (local/test stand-in) keeps SQLAlchemy's default pool.
+    """
+    if url.startswith("sqlite"):
+        return {}
+
+    options = {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if "+asyncpg" in url:
+        options["connect_args"] = {
+            "timeout": settings.DB_CONNECT_TIMEOUT_SECONDS,
+            "command_timeout": settings.DB_COMMAND_TIMEOUT_SECONDS,
+            # SQLAlchemy's cache of asyncpg prepared statements
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        }
+        if not settings.DB_STATEMENT_CACHE_SIZE:
+            # asyncpg's own statement cache has to go too for pgbouncer
+            options["connect_args"]["statement_cache_size"] = 0
+    return options
+
+
+class QueryStats:
+    """
+    Statements run on behalf of one request: count, total time and how often
+    each distinct statement ran.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Dict[str, int] = {}
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.statements[statement] = self.statements.get(statement, 0) + 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """
+        Return the statements run at least threshold times (N+1 patterns).
+        """
+        return [
+            (statement, count)
+            for statement, count in self.statements.items()
+            if count >= threshold
+        ]
+
+
+# Stats of the request being handled, set by middlewares.server_timing.
+# SQLAlchemy runs the event hooks in greenlets sharing the caller's context.
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "current_query_stats", default=None
+)
+
+# Statements logged as slow by this worker
+slow_query_count = 0
+
+
+def _redact_parameters(parameters: Any) -> Any:
+    """
+    Replace bound values (emails, password hashes, ...) with their type names.
+    """
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            # executemany(): show the first row only
+            return [_redact_parameters(parameters[0]), f"... {len(parameters)} rows"]
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def _before_cursor_execute(
+    conn: Connection, cursor, statement, parameters, context, executemany
+) -> None:
+    conn.info["query_started_at"] = time.perf_counter()
+
+
+def _after_cursor_execute(
+    conn: Connection, cursor, statement, parameters, context, executemany
+) -> None:
+    global slow_query_count
+    elapsed = time.perf_counter() - conn.info.pop("query_started_at", time.perf_counter())
+
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+    if settings.SLOW_QUERY_MS and elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        slow_query_count += 1
+        logger.warning(
+            "Slow query (%.1f ms): %s | parameters: %s",
+            elapsed * 1000,
+            statement,
+            _redact_parameters(parameters),
+        )
+
+
+def instrument_engine(async_engine: AsyncEngine) -> None:
+    """
+    Time every statement of async_engine, for current_query_stats and the
+    slow query log.
+    """
+    event.listen(async_engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(async_engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+engine = create_async_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+instrument_engine(engine)
 
 # Async database session setup
 async_session = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
 
+# Read replica, if configured (see api.v1.dependencies.get_read_db)
+replica_engine = (
+    create_async_engine(REPLICA_URL, **engine_options(REPLICA_URL)) if REPLICA_URL else None
+)
+if replica_engine is not None:
+    instrument_engine(replica_engine)
+async_read_session = (
+    sessionmaker(bind=replica_engine, class_=AsyncSession, expire_on_commit=False)
+    if replica_engine is not None
+    else None
+)
+
+# monotonic() time before which the replica is considered unreachable
+_replica_retry_at = 0.0
+
 Base = declarative_base()
 
 
+# SQLite (used as a local/test stand-in) renders now() as CURRENT_TIMESTAMP, which has
+# no fractional seconds and does not compare equal to the DateTime values SQLAlchemy
+# binds. Match SQLAlchemy's storage format so keyset comparisons behave like Postgres.
+@compiles(now, "sqlite")
+def sqlite_now(element, compiler, **kw):
+    return "strftime('%Y-%m-%d %H:%M:%f000', 'now')"
+
+
 # Dependency to get the database session
 async def get_db() -> AsyncSession:
     async with async_session() as session:
         yield session
+
+
+# Dependency to get the session factory, for work that outlives the request
+# handler (e.g. streaming responses) and must open its own session
+def get_session_factory() -> sessionmaker:
+    return async_session
+
+
+# Dependency to get the read replica session factory, None without a replica
+def get_replica_session_factory() -> Optional[sessionmaker]:
+    return async_read_session
+
+
+def replica_healthy() -> bool:
+    """
+    False while a replica that failed recently is being skipped.
+    """
+    return time.monotonic() >= _replica_retry_at
+
+
+def mark_replica_down() -> None:
+    """
+    Send reads to the primary for REPLICA_RETRY_SECONDS.
+    """
+    global _replica_retry_at
+    _replica_retry_at = time.monotonic() + settings.REPLICA_RETRY_SECONDS
+
+
+class ReplicaSession(AsyncSession):
+    """
+    Session on the read replica that connects on its first statement, not
+    when it is opened, so requests that never query (e.g. cached users) cost
+    the replica nothing. If that first connection fails, the replica is taken
+    out of rotation and the session carries on against the primary.
+    """
+
+    def __init__(self, *args, primary: AsyncSession, **kwargs):
+        """
+        Args:
+            primary: Session whose bind is used if the replica is unreachable.
+        """
+        super().__init__(*args, **kwargs)
+        self.primary = primary
+        self.connected = False
+
+    async def _connect(self) -> None:
+        if self.connected:
+            return
+        self.connected = True
+        try:
+            await super().connection()
+        except (SQLAlchemyError, OSError):
+            logger.warning("Read replica unavailable, reading from the primary", exc_info=True)
+            await self.close()
+            mark_replica_down()
+            self.bind = self.primary.bind
+            self.sync_session.bind = self.primary.sync_session.bind
+
+    async def connection(self, *args, **kwargs):
+        await self._connect()
+        return await super().connection(*args, **kwargs)
+
+    async def execute(self, *args, **kwargs):
+        await self._connect()
+        return await super().execute(*args, **kwargs)
+
+    async def scalar(self, *args, **kwargs):
+        await self._connect()
+        return await super().scalar(*args, **kwargs)
+
+    async def get(self, *args, **kwargs):
+        await self._connect()
+        return await super().get(*args, **kwargs)
+
+    async def stream(self, *args, **kwargs):
+        await self._connect()
+        return await super().stream(*args, **kwargs)
+
+
+def pool_stats(async_engine: AsyncEngine = engine) -> Dict[str, Any]:
+    """
+    Return the live connection pool counters of async_engine.
+    """
+    pool = async_engine.pool
+    stats = {"pool": pool.__class__.__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+        )
+    if isinstance(pool, InstrumentedQueuePool):
+        stats.update(timeouts=pool.timeouts, wait_seconds=pool.wait_seconds.stats())
+    return stats
+
+
+def pool_wait_totals() -> Tuple[int, float]:
+    """
+    Return the number of connection checkouts and the total seconds they
+    waited, summed over the primary and replica pools (uninstrumented pools,
+    e.g. SQLite's, count as no waiting).
+    """
+    checkouts = 0
+    waited = 0.0
+    for async_engine in (engine, replica_engine):
+        pool = async_engine.pool if async_engine is not None else None
+        if isinstance(pool, InstrumentedQueuePool):
+            checkouts += pool.wait_seconds.count
+            waited += pool.wait_seconds.sum
+    return checkouts, waited
@@ -0,0 +1,114 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class ExecutorSaturatedError(RuntimeError):
+    """
+    Raised when a BoundedExecutor already has max_pending jobs queued or running.
+    """
+
+
+class BoundedExecutor:
+    """
+    Runs blocking or CPU-heavy callables on a thread or process pool from async code.
+    The number of queued + running jobs is capped so bursts fail fast instead of
+    building an unbounded backlog behind the pool.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        kind: str = "thread",
+        max_workers: Optional[int] = None,
+        max_pending: int = 64,
+    ):
+        """
+        Args:
+            name: Name used for worker threads and stats.
+            kind: "thread" or "process".
+            max_workers: Pool size, defaults to the number of CPUs.
+            max_pending: Maximum number of jobs queued or running at once.
+        """
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind: {kind}")
+
+        self.name = name
+        self.kind = kind
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+        self._executor: Optional[Executor] = None
+        # pending is released from pool threads, by the jobs' done callbacks
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> Executor:
+        """
+        Create the pool lazily, inside the worker process that uses it.
+        """
+        if self._executor is None:
+            if self.kind == "process":
+                # spawn avoids forking a process that already runs threads
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=self.name
+                )
+        return self._executor
+
+    async def run(self, fn: Callable, *args: Any) -> Any:
+        """
+        Run fn(*args) on the pool and await its result.
+        Process pools require fn and args to be picklable (module level functions).
+
+        Raises:
+            ExecutorSaturatedError: If max_pending jobs are already in flight.
+        """
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise ExecutorSaturatedError(f"{self.name} executor is saturated")
+            self.pending += 1
+
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+
+        # Released when the job itself ends, not when its caller stops waiting:
+        # a cancelled caller (e.g. a client disconnect) leaves a started job
+        # running on the pool, and it keeps counting toward max_pending
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, future: Any = None) -> None:
+        with self._lock:
+            self.pending -= 1
+
+    def shutdown(self) -> None:
+        """
+        Stop the pool, pending jobs are cancelled.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the executor counters.
+        """
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "rejected": self.rejected,
+        }
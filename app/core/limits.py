@@ -0,0 +1,151 @@
+import math
+import time
+from typing import Any, Dict
+
+
+class ConcurrencyLimit:
+    """
+    Caps how many long-running operations of one kind a worker process runs
+    at once. Acquiring never waits: callers over the limit are rejected right
+    away so they can retry later instead of piling up on the worker.
+    """
+
+    def __init__(self, name: str, max_active: int):
+        """
+        Args:
+            name: Name used in stats.
+            max_active: Maximum number of operations running at once.
+        """
+        self.name = name
+        self.max_active = max_active
+        self.active = 0
+        self.rejected = 0
+
+    def try_acquire(self) -> bool:
+        """
+        Take a slot, False if all slots are in use.
+        """
+        if self.active >= self.max_active:
+            self.rejected += 1
+            return False
+        self.active += 1
+        return True
+
+    def release(self) -> None:
+        """
+        Give back a slot taken with try_acquire.
+        """
+        self.active -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the limit counters.
+        """
+        return {
+            "max_active": self.max_active,
+            "active": self.active,
+            "rejected": self.rejected,
+        }
+
+
+class AdaptiveConcurrencyLimit:
+    """
+    Concurrency limit adapted with AIMD to a queueing delay signal: every
+    interval, a delay above target cuts the limit multiplicatively, while a
+    delay below target lets a limit that was actually reached grow by about
+    its square root. Acquiring never waits, like ConcurrencyLimit.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial: int,
+        min_limit: int,
+        max_limit: int,
+        target_delay: float,
+        interval: float = 1.0,
+        backoff: float = 0.9,
+    ):
+        """
+        Args:
+            name: Name used in stats.
+            initial: Starting limit.
+            min_limit, max_limit: Bounds of the limit.
+            target_delay: Queueing delay (seconds) above which the limit shrinks.
+            interval: Minimum seconds between two adjustments.
+            backoff: Factor applied to the limit on a decrease.
+        """
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(min(max(initial, min_limit), max_limit))
+        self.target_delay = target_delay
+        self.interval = interval
+        self.backoff = backoff
+
+        self.active = 0
+        self.peak_active = 0  # Since the last adjustment
+        self.queue_delay = 0.0
+        self.adjusted_at = time.monotonic()
+        self.increases = 0
+        self.decreases = 0
+        self.rejected = 0
+
+    def try_acquire(self, share: float = 1.0) -> bool:
+        """
+        Take a slot if fewer than share * limit are in use (at least one).
+        Lower priorities pass a smaller share so they are rejected first.
+        """
+        if self.active >= max(1, int(self.limit * share)):
+            self.rejected += 1
+            return False
+        self.acquire()
+        return True
+
+    def acquire(self) -> None:
+        """
+        Take a slot regardless of the limit (requests that must not be shed).
+        """
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+
+    def release(self) -> None:
+        """
+        Give back a slot taken with try_acquire or acquire.
+        """
+        self.active -= 1
+
+    def due(self) -> bool:
+        """
+        True once interval elapsed since the last adjustment.
+        """
+        return time.monotonic() - self.adjusted_at >= self.interval
+
+    def adjust(self, queue_delay: float) -> None:
+        """
+        Adapt the limit to the queueing delay measured over the last interval.
+        """
+        if queue_delay > self.target_delay:
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+            self.decreases += 1
+        elif self.peak_active >= int(self.limit):
+            # Only grow a limit that is actually in use
+            self.limit = min(self.max_limit, self.limit + math.sqrt(self.limit))
+            self.increases += 1
+
+        self.queue_delay = queue_delay
+        self.peak_active = self.active
+        self.adjusted_at = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the limit counters.
+        """
+        return {
+            "limit": int(self.limit),
+            "active": self.active,
+            "queue_delay": self.queue_delay,
+            "increases": self.increases,
+            "decreases": self.decreases,
+            "rejected": self.rejected,
+        }
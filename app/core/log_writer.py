@@ -0,0 +1,283 @@
+import asyncio
+import atexit
+import gzip
+import logging
+import os
+import queue
+import shutil
+import threading
+from logging.handlers import QueueHandler, RotatingFileHandler
+from typing import Dict, List
+
+from core.config import settings
+
+# Queue full policies
+DROP = "drop"
+BLOCK = "block"
+
+_STOP = object()
+
+
+def gzip_namer(name: str) -> str:
+    """
+    Name rotated files with a .gz suffix.
+    """
+    return name + ".gz"
+
+
+def gzip_rotator(source: str, dest: str) -> None:
+    """
+    Compress the rotated file into dest and remove the original.
+    """
+    with open(source, "rb") as f_in, gzip.open(dest, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+
+class BatchingRotatingFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler that writes a batch of records with a single flush.
+    Optionally gzips rotated files. Only ever called from the writer thread,
+    so rotation and compression never run on the request path.
+    """
+
+    def __init__(self, filename: str, max_bytes: int, backup_count: int, compress: bool):
+        super().__init__(
+            filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        )
+        if compress:
+            self.namer = gzip_namer
+            self.rotator = gzip_rotator
+
+    def emit_batch(self, records: List[logging.LogRecord], keep_open: bool = True) -> None:
+        """
+        Write all records, rolling over as needed, then flush once.
+        Args:
+            records: Records to write.
+            keep_open: Keep the file open for the next batch; False closes it
+                again after the flush (writes after the handler was closed).
+        """
+        self.acquire()
+        try:
+            for record in records:
+                try:
+                    if self.shouldRollover(record):
+                        self.doRollover()
+                    if self.stream is None:
+                        self.stream = self._open()
+                    self.stream.write(self.format(record) + self.terminator)
+                except Exception:
+                    self.handleError(record)
+            if self.stream is not None:
+                self.stream.flush()
+                if not keep_open:
+                    self.stream.close()
+                    self.stream = None
+        finally:
+            self.release()
+
+
+def _in_event_loop() -> bool:
+    """
+    True if the calling thread is running an asyncio event loop.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class LogWriter:
+    """
+    Background thread draining a bounded queue of log records into a handler.
+    Records queued while a batch is written are picked up together, so under load
+    many records share one write + flush.
+    """
+
+    def __init__(
+        self,
+        handler: BatchingRotatingFileHandler,
+        queue_size: int,
+        batch_size: int,
+        policy: str = DROP,
+        block_timeout: float = 0.1,
+    ):
+        """
+        Args:
+            handler: Handler performing the actual writes.
+            queue_size: Maximum number of records waiting to be written.
+            batch_size: Maximum number of records written per flush.
+            policy: DROP to discard records when the queue is full, BLOCK to wait
+                up to block_timeout seconds for space (then drop). BLOCK is for
+                scripts and worker threads: records logged from a thread running
+                an event loop are dropped instead, since waiting would stall
+                every coroutine of the process.
+            block_timeout: Seconds to wait for queue space with the BLOCK policy.
+        """
+        if policy not in (DROP, BLOCK):
+            raise ValueError(f"Unknown log queue policy: {policy}")
+
+        self.handler = handler
+        self.queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self.batch_size = batch_size
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.dropped = 0
+        self.written = 0
+        self.batches = 0
+        self.stopped = False
+        self._thread = None
+        # Held to check stopped and queue a record, and to set stopped, so no
+        # record is queued behind the stop marker
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """
+        Start the writer thread.
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="log-writer", daemon=True
+            )
+            self._thread.start()
+
+    def put(self, record: logging.LogRecord) -> None:
+        """
+        Queue a record without blocking the caller (unless the BLOCK policy
+        applies). Once the writer is stopped, records are written synchronously,
+        opening and closing the file for each, as the handler is closed.
+        """
+        with self._lock:
+            if not self.stopped:
+                if not self._enqueue(record):
+                    self.dropped += 1
+                return
+
+        self.handler.emit_batch([record], keep_open=False)
+        self.written += 1
+
+    def _enqueue(self, record: logging.LogRecord) -> bool:
+        try:
+            self.queue.put_nowait(record)
+            return True
+        except queue.Full:
+            pass
+
+        if self.policy == BLOCK and not _in_event_loop():
+            try:
+                self.queue.put(record, timeout=self.block_timeout)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _run(self) -> None:
+        while True:
+            record = self.queue.get()
+            if record is _STOP:
+                return
+
+            batch = [record]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    record = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if record is _STOP:
+                    stop = True
+                    break
+                batch.append(record)
+
+            self.handler.emit_batch(batch)
+            self.written += len(batch)
+            self.batches += 1
+
+            if stop:
+                return
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Write out everything queued so far and stop the writer thread. Records
+        logged afterwards (e.g. by handlers still attached during shutdown)
+        are written synchronously instead of being queued for nobody.
+        """
+        with self._lock:
+            self.stopped = True
+        if self._thread is not None:
+            self.queue.put(_STOP)
+            self._thread.join(timeout)
+            self._thread = None
+        self.handler.close()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return the writer counters.
+        """
+        return {
+            "queued": self.queue.qsize(),
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+        }
+
+
+class LogWriterQueueHandler(QueueHandler):
+    """
+    QueueHandler feeding a LogWriter, applying its queue full policy.
+    """
+
+    def __init__(self, writer: LogWriter):
+        super().__init__(writer.queue)
+        self.writer = writer
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        self.writer.put(record)
+
+
+# Writers started in this process, keyed by log file name
+log_writers: Dict[str, LogWriter] = {}
+
+
+def create_queue_handler(log_file_path: str) -> LogWriterQueueHandler:
+    """
+    Build a non-blocking handler writing to log_file_path from a background thread.
+    Args:
+        log_file_path: Path to the log file.
+
+    Returns:
+        Handler to attach to a logger.
+    """
+    file_handler = BatchingRotatingFileHandler(
+        log_file_path,
+        max_bytes=settings.LOG_MAX_BYTES,
+        backup_count=settings.LOG_BACKUP_COUNT,
+        compress=settings.LOG_COMPRESS_ROTATED,
+    )
+    file_handler.setFormatter(
+        logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+    )
+
+    writer = LogWriter(
+        file_handler,
+        queue_size=settings.LOG_QUEUE_SIZE,
+        batch_size=settings.LOG_BATCH_SIZE,
+        policy=settings.LOG_QUEUE_FULL_POLICY,
+    )
+    writer.start()
+    log_writers[os.path.basename(log_file_path)] = writer
+
+    return LogWriterQueueHandler(writer)
+
+
+def shutdown_log_writers() -> None:
+    """
+    Flush and stop all log writers, safe to call more than once.
+    """
+    while log_writers:
+        _, writer = log_writers.popitem()
+        writer.stop()
+
+
+atexit.register(shutdown_log_writers)
@@ -0,0 +1,95 @@
+import asyncio
+import bisect
+import time
+from typing import Any, Dict, Optional, Sequence
+
+# Default latency buckets in seconds (upper bounds)
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """
+    Counts observations into fixed buckets, like a Prometheus histogram.
+    Observing is a bisect and two additions, cheap enough for hot paths.
+    """
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        """
+        Args:
+            buckets: Sorted bucket upper bounds, +Inf is added implicitly.
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """
+        Record one observation.
+        """
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the cumulative bucket counts (keyed by upper bound), count and sum.
+        """
+        cumulative = {}
+        total = 0
+        for bound, count in zip([*map(str, self.buckets), "+Inf"], self.counts):
+            total += count
+            cumulative[bound] = total
+        return {"buckets": cumulative, "count": self.count, "sum": self.sum}
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Return the raw (per bucket) counts and sum, for merging across processes.
+        """
+        return {"buckets": list(self.buckets), "counts": list(self.counts), "sum": self.sum}
+
+
+class EventLoopLagMonitor:
+    """
+    Measures how late the event loop wakes up a task sleeping for interval
+    seconds: time the loop spent on other (blocking or queued) work, which
+    every request handled by the worker waits for too.
+    """
+
+    def __init__(self, interval: float = 0.5):
+        """
+        Args:
+            interval: Seconds between two measurements.
+        """
+        self.interval = interval
+        self.lag_seconds = Histogram()
+        self.last_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """
+        Start measuring on the running loop.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(
+                self._run(), name="event-loop-lag-monitor"
+            )
+
+    async def stop(self) -> None:
+        """
+        Stop measuring.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, RuntimeError):
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.last_lag = max(time.perf_counter() - start - self.interval, 0.0)
+            self.lag_seconds.observe(self.last_lag)
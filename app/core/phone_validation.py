@@ -0,0 +1,91 @@
+import asyncio
+import math
+from functools import lru_cache
+from typing import List, Optional, Sequence
+
+import phonenumbers
+
+from core.config import settings
+from core.executors import BoundedExecutor, ExecutorSaturatedError
+
+# phonenumbers is pure Python and holds the GIL, so large batches are spread
+# over worker processes rather than threads. Every uvicorn worker gets its own
+# pool, so it is kept small instead of one process per CPU.
+validation_executor = BoundedExecutor(
+    name="phonenumber-validation",
+    kind="process",
+    max_workers=settings.PHONENUMBER_POOL_WORKERS or 1,
+    max_pending=settings.PHONENUMBER_POOL_MAX_PENDING,
+)
+
+
+@lru_cache(maxsize=settings.PHONENUMBER_CACHE_SIZE)
+def normalize_phone_number(value: str) -> Optional[str]:
+    """
+    Parse and validate a phone number, memoized by raw input.
+    Args:
+        value: Number as entered, country code required (e.g. +9779841234567).
+
+    Returns:
+        The number in E.164 format, or None if it is not a valid number.
+    """
+    try:
+        parsed_number = phonenumbers.parse(value, None)
+    except phonenumbers.NumberParseException:
+        return None
+    if not phonenumbers.is_valid_number(parsed_number):
+        return None
+    return phonenumbers.format_number(parsed_number, phonenumbers.PhoneNumberFormat.E164)
+
+
+def normalize_phone_numbers(values: Sequence[str]) -> List[Optional[str]]:
+    """
+    Normalize a batch of numbers in the calling thread (module level so
+    process pools can pickle it).
+    """
+    return [normalize_phone_number(value) for value in values]
+
+
+async def normalize_phone_numbers_async(values: Sequence[str]) -> List[Optional[str]]:
+    """
+    Normalize a batch of numbers without blocking the event loop for long.
+    Batches of at least PHONENUMBER_POOL_MIN_BATCH numbers are split across
+    the validation pool; smaller batches (and slices the saturated pool
+    refuses) are normalized inline, where the LRU cache applies.
+    Args:
+        values: Raw numbers.
+
+    Returns:
+        E.164 numbers (None for invalid ones), in the order of values.
+    """
+    if not settings.PHONENUMBER_POOL_WORKERS or len(values) < settings.PHONENUMBER_POOL_MIN_BATCH:
+        return normalize_phone_numbers(values)
+
+    slice_size = math.ceil(len(values) / validation_executor.max_workers)
+    slices = [list(values[i : i + slice_size]) for i in range(0, len(values), slice_size)]
+    results = await asyncio.gather(
+        *(validation_executor.run(normalize_phone_numbers, part) for part in slices),
+        return_exceptions=True,
+    )
+
+    normalized = []
+    for part, result in zip(slices, results):
+        if isinstance(result, ExecutorSaturatedError):
+            result = normalize_phone_numbers(part)
+        elif isinstance(result, BaseException):
+            raise result
+        normalized.extend(result)
+    return normalized
+
+
+def cache_stats() -> dict:
+    """
+    Return the normalization cache counters.
+    """
+    info = normalize_phone_number.cache_info()
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "maxsize": info.maxsize,
+    }
@@ -0,0 +1,248 @@
+"""
+Prometheus text exposition of the app's metrics, aggregated over the uvicorn
+worker processes through a shared directory: every worker periodically
+writes a JSON snapshot of its own metrics there, and /metrics (served by any
+worker) merges all snapshots. Counters and histograms are summed, gauges are
+reported per worker (pid label) from fresh snapshots only.
+"""
+import fcntl
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from core.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+COUNTER = "counter"
+GAUGE = "gauge"
+HISTOGRAM = "histogram"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# A metric family: {"name", "type", "help", "samples": [...]}, where a sample
+# is {"labels": {...}, "value": v} or, for histograms, {"labels": {...}} plus
+# Histogram.snapshot()
+MetricFamily = Dict[str, Any]
+
+
+def family(name: str, metric_type: str, help_text: str) -> MetricFamily:
+    """
+    Create an empty metric family.
+    """
+    return {"name": name, "type": metric_type, "help": help_text, "samples": []}
+
+
+def add_sample(metric: MetricFamily, labels: Dict[str, str], value: Any) -> None:
+    """
+    Add a value (or a Histogram) to a metric family.
+    """
+    if isinstance(value, Histogram):
+        metric["samples"].append({"labels": labels, **value.snapshot()})
+    else:
+        metric["samples"].append({"labels": labels, "value": value})
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class MultiprocessStore:
+    """
+    Directory of per worker snapshots, named after the worker's pid.
+    Snapshots of exited workers are folded into a single archive snapshot when
+    the store is read: their counters and histograms are kept, so totals never
+    go down, their gauges are dropped, and the directory only holds one
+    snapshot per live worker (clear it when all workers restart).
+    """
+
+    ARCHIVE = "archived.json"
+
+    def __init__(self, directory: str, stale_after: float):
+        """
+        Args:
+            directory: Directory shared by the workers.
+            stale_after: Age after which a snapshot's gauges are ignored.
+        """
+        self.directory = directory
+        self.stale_after = stale_after
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, metrics: List[MetricFamily]) -> None:
+        """
+        Atomically replace this worker's snapshot.
+        """
+        pid = os.getpid()
+        path = os.path.join(self.directory, f"{pid}.json")
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "w") as snapshot_file:
+            json.dump({"pid": pid, "written_at": time.time(), "metrics": metrics}, snapshot_file)
+        os.replace(temporary_path, path)
+
+    def _load(self, filename: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(os.path.join(self.directory, filename)) as snapshot_file:
+                return json.load(snapshot_file)
+        except (OSError, ValueError):
+            logger.warning("Skipping unreadable metrics snapshot %s", filename)
+            return None
+
+    def _dead_workers(self) -> List[str]:
+        dead = []
+        for filename in os.listdir(self.directory):
+            pid = filename[: -len(".json")]
+            if filename.endswith(".json") and pid.isdigit() and not _pid_alive(int(pid)):
+                dead.append(filename)
+        return dead
+
+    def archive_dead_workers(self) -> None:
+        """
+        Fold the snapshots of exited workers into the archive snapshot.
+        """
+        if not self._dead_workers():
+            return
+
+        with open(os.path.join(self.directory, "archive.lock"), "w") as lock_file:
+            # Workers serving /metrics at once must not archive a snapshot twice
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            dead = self._dead_workers()
+            if not dead:
+                return
+            path = os.path.join(self.directory, self.ARCHIVE)
+            filenames = [self.ARCHIVE, *dead] if os.path.exists(path) else dead
+            snapshots = [
+                {**snapshot, "metrics": [m for m in snapshot["metrics"] if m["type"] != GAUGE]}
+                for snapshot in map(self._load, filenames)
+                if snapshot is not None
+            ]
+
+            temporary_path = f"{path}.tmp"
+            with open(temporary_path, "w") as archive_file:
+                json.dump(
+                    {
+                        "pid": "archived",
+                        "written_at": time.time(),
+                        "metrics": merge_snapshots(snapshots),
+                    },
+                    archive_file,
+                )
+            os.replace(temporary_path, path)
+            for filename in dead:
+                os.remove(os.path.join(self.directory, filename))
+
+    def read(self) -> List[Dict[str, Any]]:
+        """
+        Return the snapshots of all workers, skipping unreadable ones.
+        """
+        self.archive_dead_workers()
+        snapshots = []
+        for filename in os.listdir(self.directory):
+            if filename.endswith(".json"):
+                snapshot = self._load(filename)
+                if snapshot is not None:
+                    snapshots.append(snapshot)
+        return snapshots
+
+    def merged(self) -> List[MetricFamily]:
+        """
+        Return the metrics of all workers, merged.
+        """
+        return merge_snapshots(self.read(), self.stale_after)
+
+
+def merge_snapshots(
+    snapshots: Iterable[Dict[str, Any]], stale_after: Optional[float] = None
+) -> List[MetricFamily]:
+    """
+    Merge worker snapshots into one set of metric families.
+    Args:
+        snapshots: Snapshots as written by MultiprocessStore.
+        stale_after: Drop the gauges of snapshots older than this (seconds).
+
+    Returns:
+        Metric families in order of first appearance.
+    """
+    now = time.time()
+    families: Dict[str, MetricFamily] = {}
+    samples: Dict[str, Dict[Tuple, Dict[str, Any]]] = {}
+
+    for snapshot in snapshots:
+        fresh = stale_after is None or now - snapshot["written_at"] <= stale_after
+        for metric in snapshot["metrics"]:
+            name = metric["name"]
+            if name not in families:
+                families[name] = {**metric, "samples": []}
+                samples[name] = {}
+            merged = samples[name]
+
+            for sample in metric["samples"]:
+                labels = sample["labels"]
+                if metric["type"] == GAUGE:
+                    if not fresh:
+                        continue
+                    labels = {**labels, "pid": str(snapshot["pid"])}
+                key = tuple(sorted(labels.items()))
+
+                if key not in merged:
+                    merged[key] = {**sample, "labels": labels}
+                    if "counts" in sample:
+                        merged[key]["counts"] = list(sample["counts"])
+                elif "counts" in sample:
+                    target = merged[key]
+                    target["counts"] = [a + b for a, b in zip(target["counts"], sample["counts"])]
+                    target["sum"] += sample["sum"]
+                else:
+                    merged[key]["value"] += sample["value"]
+
+    for name, metric in families.items():
+        metric["samples"] = list(samples[name].values())
+    return list(families.values())
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(families: Iterable[MetricFamily]) -> str:
+    """
+    Render metric families in the Prometheus text format (version 0.0.4).
+    """
+    lines = []
+    for metric in families:
+        name = metric["name"]
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        for sample in metric["samples"]:
+            labels = sample["labels"]
+            if metric["type"] != HISTOGRAM:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(sample['value'])}")
+                continue
+
+            cumulative = 0
+            bounds = [*map(str, sample["buckets"]), "+Inf"]
+            for bound, count in zip(bounds, sample["counts"]):
+                cumulative += count
+                lines.append(f"{name}_bucket{_format_labels({**labels, 'le': bound})} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(sample['sum'])}")
+            lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
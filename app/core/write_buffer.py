@@ -0,0 +1,153 @@
+import asyncio
+import contextvars
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindBuffer:
+    """
+    In-process buffer of rows written to the database in the background.
+    Requests only append to the buffer; a flusher task drains it once
+    flush_rows rows are waiting or flush_interval seconds have passed, handing
+    each batch to flush_fn (e.g. a multi-row insert). A full buffer refuses new
+    rows so callers can push back on producers instead of growing memory.
+
+    Rows still buffered when the process dies are lost, the buffer trades that
+    window (at most flush_interval seconds) for write throughput.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        flush_fn: Callable[[List[Any]], Awaitable[None]],
+        max_rows: int,
+        flush_rows: int,
+        flush_interval: float,
+    ):
+        """
+        Args:
+            name: Name used in logs and stats.
+            flush_fn: Coroutine function writing a batch of rows.
+            max_rows: Maximum number of rows waiting to be written.
+            flush_rows: Number of waiting rows that triggers a flush.
+            flush_interval: Maximum seconds a row waits before being flushed.
+        """
+        self.name = name
+        self.flush_fn = flush_fn
+        self.max_rows = max_rows
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.rows: List[Any] = []
+        self.flushed = 0
+        self.flushes = 0
+        self.rejected = 0
+        self.failed = 0
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _ensure_flusher(self) -> None:
+        """
+        Start the flusher lazily on the running loop, restarting it if the
+        loop it was started on is gone (e.g. test clients, reloads).
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._task is not None and not self._task.done():
+            return
+
+        self._loop = loop
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+        # A fresh context, not a copy of the request that happened to start it
+        # (its context variables, e.g. query stats, would cover every flush)
+        self._task = loop.create_task(
+            self._run(), name=f"{self.name}-flusher", context=contextvars.Context()
+        )
+
+    def offer(self, rows: List[Any]) -> bool:
+        """
+        Append rows for writing, all or none.
+
+        Returns:
+            False if the buffer has no room for the rows (nothing is appended).
+        """
+        if len(self.rows) + len(rows) > self.max_rows:
+            self.rejected += len(rows)
+            return False
+
+        self._ensure_flusher()
+        self.rows.extend(rows)
+        if len(self.rows) >= self.flush_rows:
+            self._wakeup.set()
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            deadline = time.monotonic() + self.flush_interval
+            while len(self.rows) < self.flush_rows:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                finally:
+                    self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        """
+        Write out everything buffered so far, in batches of flush_rows.
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            while self.rows:
+                batch = self.rows[: self.flush_rows]
+                del self.rows[: self.flush_rows]
+                try:
+                    await self.flush_fn(batch)
+                except asyncio.CancelledError:
+                    # Put the batch back so stop() still writes it
+                    self.rows[:0] = batch
+                    raise
+                except Exception:
+                    # A failing batch is dropped rather than retried forever
+                    self.failed += len(batch)
+                    logger.exception("%s: failed to write %d rows", self.name, len(batch))
+                    continue
+                self.flushed += len(batch)
+                self.flushes += 1
+
+    async def stop(self) -> None:
+        """
+        Stop the flusher and write out the remaining rows.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, RuntimeError):
+                pass
+            self._task = None
+        self._lock = None
+        await self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return the buffer counters.
+        """
+        return {
+            "pending": len(self.rows),
+            "max_rows": self.max_rows,
+            "flushed": self.flushed,
+            "flushes": self.flushes,
+            "rejected": self.rejected,
+            "failed": self.failed,
+        }
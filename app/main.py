@@ -1,12 +1,66 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
 
 from api.v1.router import api_router
+from api.v1.utils.call_logs import call_log_buffer, phonenumber_id_cache
+from api.v1.utils.call_log_export import export_slots
+from api.v1.utils.jwt import token_cache
+from api.v1.utils.password import password_executor
+from api.v1.utils.revocation import refresh_revocation_filter, revocation_filter
+from api.v1.utils.user_cache import user_cache
+from core.database import async_session, pool_stats, replica_engine, replica_healthy
+from core.log_writer import log_writers, shutdown_log_writers
+from core.prometheus import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from core.phone_validation import cache_stats as phonenumber_cache_stats, validation_executor
 from middlewares.api_log import APILogMiddleware
+from middlewares.load_shed import LoadShedMiddleware, load_shed_stats
+from middlewares.metrics import (
+    MetricsMiddleware,
+    collect_metrics,
+    loop_lag,
+    metrics_store,
+    metrics_text,
+    write_metrics_snapshots,
+)
+from middlewares.read_your_writes import ReadYourWritesMiddleware
+from middlewares.server_timing import ServerTimingMiddleware, sql_stats
+
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Measure event loop lag and share this worker's metrics with the others
+    loop_lag.start()
+    snapshot_writer = (
+        asyncio.create_task(write_metrics_snapshots()) if metrics_store is not None else None
+    )
+    # Keep the token revocation filter fresh off the request path
+    revocation_refresher = asyncio.create_task(refresh_revocation_filter(async_session))
+    yield
+    await loop_lag.stop()
+    revocation_refresher.cancel()
+    if snapshot_writer is not None:
+        snapshot_writer.cancel()
+        # Keep the counts since the last snapshot
+        metrics_store.write(collect_metrics())
+    # Write out buffered call logs, release worker pools and flush queued log
+    # records on shutdown
+    await call_log_buffer.stop()
+    password_executor.shutdown()
+    validation_executor.shutdown()
+    shutdown_log_writers()
 
-app = FastAPI()
 
+app = FastAPI(lifespan=lifespan)
+
+app.add_middleware(ServerTimingMiddleware)
+app.add_middleware(ReadYourWritesMiddleware)
 app.add_middleware(APILogMiddleware)
+app.add_middleware(MetricsMiddleware)
+# Outermost, so shed requests cost as little as possible
+app.add_middleware(LoadShedMiddleware)
 
 app.include_router(api_router)
 
@@ -17,6 +71,45 @@ async def health_check():
     return {"status": "OK", "message": "FastAPI App is running."}
 
 
+# Internal counters of this worker process (cache effectiveness etc.), only
+# reachable on the compose network: nginx denies it and the app port is not published
+@app.get("/stats")
+async def stats():
+    return {
+        "database_pool": pool_stats(),
+        "sql": sql_stats(),
+        "replica_pool": (
+            {**pool_stats(replica_engine), "healthy": replica_healthy()}
+            if replica_engine is not None
+            else None
+        ),
+        "caches": {
+            "users": user_cache.stats(),
+            "tokens": token_cache.stats(),
+            "phonenumbers": phonenumber_cache_stats(),
+            "phonenumber_ids": phonenumber_id_cache.stats(),
+        },
+        "executors": {
+            "password": password_executor.stats(),
+            "phonenumber_validation": validation_executor.stats(),
+        },
+        "write_buffers": {"call_logs": call_log_buffer.stats()},
+        "limits": {
+            "requests": load_shed_stats(),
+            "call_log_exports": export_slots.stats(),
+        },
+        "token_revocation": revocation_filter.stats(),
+        "log_writers": {name: writer.stats() for name, writer in log_writers.items()},
+    }
+
+
+# Prometheus metrics of all worker processes, scraped on the compose network
+# (denied by nginx like /stats)
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(metrics_text(), media_type=METRICS_CONTENT_TYPE)
+
+
 # Example Root endpoint (optional)
 @app.get("/")
 async def read_root():
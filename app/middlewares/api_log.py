@@ -1,12 +1,12 @@
 import logging
 import os
-import re
-from logging.handlers import RotatingFileHandler
-from starlette.middleware.base import BaseHTTPMiddleware, _StreamingResponse
-from starlette.requests import Request
-from starlette.responses import Response
-from typing import Callable
+import random
+from starlette.datastructures import URL, Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Dict, Optional
 from core.config import settings
+from core.log_writer import create_queue_handler
+from middlewares.redaction import Redactor
 
 
 def ensure_log_directory_exists():
@@ -20,18 +20,16 @@ def ensure_log_directory_exists():
 
 def configure_logger(log_file_path: str, log_level: int) -> logging.Logger:
     """
-    Set up a logger with rotating file handler.
+    Set up a logger writing to a rotating file through a background writer thread,
+    so disk latency and rotation stay off the request path.
     Args:
         log_file_path: Path to the log file.
         log_level: Logging level (INFO, ERROR, etc.)
     Returns:
         Configured logger instance.
     """
-    handler = RotatingFileHandler(
-        log_file_path, maxBytes=5 * 1024 * 1024, backupCount=3, encoding="utf-8"
-    )
-    handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
-    
+    handler = create_queue_handler(log_file_path)
+
     logger = logging.getLogger(os.path.basename(log_file_path))
     logger.setLevel(log_level)
     logger.addHandler(handler)
@@ -39,22 +37,24 @@ def configure_logger(log_file_path: str, log_level: int) -> logging.Logger:
     return logger
 
 
-def redact_sensitive_info(data: str) -> str:
+# Redaction patterns are compiled once at startup
+redactor = Redactor(
+    keys=settings.LOG_REDACT_KEYS.split(","),
+    headers=settings.LOG_REDACT_HEADERS.split(","),
+    max_scan_bytes=settings.LOG_REDACT_MAX_SCAN_BYTES,
+)
+
+
+def redact_sensitive_info(data: str, content_type: str = "") -> str:
     """
     Redact sensitive information like passwords or tokens.
     Args:
         data: Input string to process.
+        content_type: Content-Type of the data, if known.
     Returns:
         Redacted string.
     """
-    patterns = [
-        r'"password":\s*".+?"',
-        r'"access_token":\s*".+?"',
-    ]
-    for pattern in patterns:
-        data = re.sub(pattern, '"password":"[REDACTED]"', data)
-        data = re.sub(pattern, '"access_token":"[REDACTED]"', data)
-    return data
+    return redactor.redact_body(data, content_type)
 
 
 # Ensure logs directory is created
@@ -71,64 +71,160 @@ error_logger = configure_logger(
 )
 
 
-class APILogMiddleware(BaseHTTPMiddleware):
+class BodyTee:
     """
-    Middleware for logging requests and responses securely.
-    Logs general requests and responses into one file and errors into another.
+    Keeps the first max_bytes of a body streaming through, and counts the rest.
     """
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        """
-        Process the request and response, and log securely.
-        Args:
-            request: HTTP Request
-            call_next: Callable function for processing the request
-        Returns:
-            Response object
-        """
-        # Log request safely
-        try:
-            request_body = await request.body()
-            safe_request_body = redact_sensitive_info(request_body.decode("utf-8"))
-            general_logger.info(
-                f"Incoming request: Method={request.method}, URL={request.url}, Headers={dict(request.headers)}, Body={safe_request_body}"
-            )
-
-            response = await call_next(request)
 
-            # Handle streaming response
-            if isinstance(response, _StreamingResponse):
-                response_body = b""
-                original_body_iterator = response.body_iterator
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.captured = bytearray()
+        self.size = 0
 
-                # Collect the streaming content
-                async def logging_body_iterator():
-                    nonlocal response_body
-                    async for chunk in original_body_iterator:
-                        response_body += chunk
-                        yield chunk
+    def feed(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        remaining = self.max_bytes - len(self.captured)
+        if remaining > 0:
+            self.captured += chunk[:remaining]
 
-                response.body_iterator = logging_body_iterator()
+    def text(self) -> str:
+        body = self.captured.decode("utf-8", errors="replace")
+        if self.size > len(self.captured):
+            body += f"...[truncated, {self.size} bytes total]"
+        return body
 
-                safe_response_body = redact_sensitive_info(
-                    response_body.decode("utf-8")
-                )
 
-            else:
-                # Handle standard responses
-                response_body = response.body or b""
-                safe_response_body = redact_sensitive_info(
-                    response_body.decode("utf-8")
-                )
+class APILogMiddleware:
+    """
+    Middleware for logging requests and responses securely.
+    Logs general requests and responses into one file and errors into another.
 
+    Pure ASGI: request and response bodies are teed as they stream through (capped
+    at max_body_bytes) instead of being buffered, and the response is logged once
+    its last body chunk has been sent.
+    """
 
-            general_logger.info(
-                f"Response: Status Code={response.status_code}, Headers={dict(response.headers)}, Body={safe_response_body}"
-            )
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_body_bytes: Optional[int] = None,
+        sample_rate: Optional[float] = None,
+        route_sample_rates: Optional[Dict[str, float]] = None,
+        errors_only: Optional[bool] = None,
+    ):
+        """
+        Args:
+            app: The wrapped ASGI application.
+            max_body_bytes: Maximum number of body bytes logged per message.
+            sample_rate: Fraction of requests logged by default (0.0 - 1.0).
+            route_sample_rates: Sample rates by path prefix, longest prefix wins.
+            errors_only: Only log responses with an error status (>= 400).
+        """
+        self.app = app
+        self.max_body_bytes = (
+            settings.LOG_MAX_BODY_BYTES if max_body_bytes is None else max_body_bytes
+        )
+        self.sample_rate = settings.LOG_SAMPLE_RATE if sample_rate is None else sample_rate
+        if route_sample_rates is None:
+            route_sample_rates = settings.LOG_ROUTE_SAMPLE_RATES
+        self.route_sample_rates = sorted(
+            route_sample_rates.items(), key=lambda item: len(item[0]), reverse=True
+        )
+        self.errors_only = settings.LOG_ERRORS_ONLY if errors_only is None else errors_only
+
+    def sample_rate_for(self, path: str) -> float:
+        """
+        Return the sample rate of the most specific matching route prefix.
+        """
+        for prefix, rate in self.route_sample_rates:
+            if path.startswith(prefix):
+                return rate
+        return self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Requests that are not sampled skip body capture entirely
+        rate = self.sample_rate_for(scope["path"])
+        if rate <= 0 or (rate < 1 and random.random() >= rate):
+            try:
+                await self.app(scope, receive, send)
+            except Exception as e:
+                self.log_exception(scope, e)
+                raise
+            return
+
+        request_body = BodyTee(self.max_body_bytes)
+        response_body = BodyTee(self.max_body_bytes)
+        response_start = {}
+
+        async def receive_wrapper() -> Message:
+            message = await receive()
+            if message["type"] == "http.request":
+                request_body.feed(message.get("body", b""))
+            return message
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response_start.update(message)
+            elif message["type"] == "http.response.body":
+                response_body.feed(message.get("body", b""))
+
+            await send(message)
+
+            # Log once the whole (possibly streamed) response has been sent
+            if message["type"] == "http.response.body" and not message.get(
+                "more_body", False
+            ):
+                self.log_exchange(scope, request_body, response_start, response_body)
 
-            return response
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
         except Exception as e:
-            # Log the exception safely
-            error_logger.error(
-                f"Exception occurred: {str(e)}, URL: {request.url}, Method: {request.method}"
-            )
+            self.log_exception(scope, e)
             raise
+
+    def log_exchange(
+        self,
+        scope: Scope,
+        request_body: BodyTee,
+        response_start: Message,
+        response_body: BodyTee,
+    ) -> None:
+        """
+        Log a completed request/response pair.
+        """
+        status_code = response_start.get("status", 0)
+        if self.errors_only and status_code < 400:
+            return
+
+        request_headers = Headers(scope=scope)
+        response_headers = Headers(raw=response_start.get("headers", []))
+
+        safe_url = redactor.redact_url(str(URL(scope=scope)))
+        safe_request_headers = redactor.redact_headers(request_headers.items())
+        safe_request_body = redact_sensitive_info(
+            request_body.text(), request_headers.get("content-type", "")
+        )
+        safe_response_headers = redactor.redact_headers(response_headers.items())
+        safe_response_body = redact_sensitive_info(
+            response_body.text(), response_headers.get("content-type", "")
+        )
+
+        # Log request safely
+        general_logger.info(
+            f"Incoming request: Method={scope['method']}, URL={safe_url}, Headers={safe_request_headers}, Body={safe_request_body}"
+        )
+        general_logger.info(
+            f"Response: Status Code={status_code}, Headers={safe_response_headers}, Body={safe_response_body}"
+        )
+
+    def log_exception(self, scope: Scope, exc: Exception) -> None:
+        """
+        Log the exception safely.
+        """
+        error_logger.error(
+            f"Exception occurred: {str(exc)}, URL: {redactor.redact_url(str(URL(scope=scope)))}, Method: {scope['method']}"
+        )
@@ -0,0 +1,151 @@
+import json
+from typing import Callable, Optional, Tuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from core.config import settings
+from core.database import pool_wait_totals
+from core.limits import AdaptiveConcurrencyLimit
+
+# Request priorities, shed from the lowest (bulk) up
+PRIORITY_CRITICAL = "critical"
+PRIORITY_NORMAL = "normal"
+PRIORITY_BULK = "bulk"
+
+# Share of the limit the requests of a priority may fill; critical requests
+# (health checks, keeping sessions alive) are never shed
+PRIORITY_SHARES = {
+    PRIORITY_NORMAL: 1.0,
+    PRIORITY_BULK: 0.7,
+}
+
+CRITICAL_PATHS = {
+    "/health",
+    "/stats",
+    "/metrics",
+    "/api/v1/auth/refresh",
+    "/api/v1/auth/logout",
+}
+
+# Listings, summaries and exports
+BULK_GET_PREFIXES = ("/api/v1/phonenumbers", "/api/v1/calllogs")
+
+
+def request_priority(method: str, path: str) -> str:
+    """
+    Classify a request for load shedding.
+    """
+    if path in CRITICAL_PATHS:
+        return PRIORITY_CRITICAL
+    if method == "GET" and path.startswith(BULK_GET_PREFIXES):
+        return PRIORITY_BULK
+    return PRIORITY_NORMAL
+
+
+class PoolQueueDelay:
+    """
+    Mean time database checkouts waited since the previous call: the queue
+    requests pile up in when the worker takes more than the database serves.
+    """
+
+    def __init__(self, totals: Callable[[], Tuple[int, float]] = pool_wait_totals):
+        self.totals = totals
+        self.last = totals()
+
+    def __call__(self) -> float:
+        checkouts, waited = self.totals()
+        last_checkouts, last_waited = self.last
+        self.last = (checkouts, waited)
+        if checkouts <= last_checkouts:
+            return 0.0
+        return (waited - last_waited) / (checkouts - last_checkouts)
+
+
+# Per worker process
+request_limit = AdaptiveConcurrencyLimit(
+    "requests",
+    initial=settings.LOAD_SHED_INITIAL_LIMIT,
+    min_limit=settings.LOAD_SHED_MIN_LIMIT,
+    max_limit=settings.LOAD_SHED_MAX_LIMIT,
+    target_delay=settings.LOAD_SHED_TARGET_QUEUE_DELAY_MS / 1000,
+    interval=settings.LOAD_SHED_ADJUST_INTERVAL_SECONDS,
+)
+
+# Requests rejected per priority
+shed_counts = {PRIORITY_NORMAL: 0, PRIORITY_BULK: 0}
+
+
+def load_shed_stats() -> dict:
+    """
+    Return the worker's request limit counters and shed requests.
+    """
+    return {**request_limit.stats(), "shed": dict(shed_counts)}
+
+
+class LoadShedMiddleware:
+    """
+    Rejects requests over the worker's adaptive concurrency limit with a 503
+    and Retry-After before any work is done, instead of letting them queue
+    on the database pool until the proxy times out. Bulk reads are rejected
+    first (from 70% of the limit), critical requests never.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiter: AdaptiveConcurrencyLimit = request_limit,
+        queue_delay: Optional[Callable[[], float]] = None,
+        retry_after: Optional[int] = None,
+        enabled: Optional[bool] = None,
+    ):
+        """
+        Args:
+            app: The wrapped ASGI application.
+            limiter: The concurrency limit shared by the worker's requests.
+            queue_delay: Returns the queueing delay since its previous call.
+            retry_after: Seconds clients are told to wait when shed.
+            enabled: Defaults to LOAD_SHED_MAX_LIMIT > 0.
+        """
+        self.app = app
+        self.limiter = limiter
+        self.queue_delay = queue_delay or PoolQueueDelay()
+        self.retry_after = (
+            settings.LOAD_SHED_RETRY_AFTER_SECONDS if retry_after is None else retry_after
+        )
+        self.enabled = settings.LOAD_SHED_MAX_LIMIT > 0 if enabled is None else enabled
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        if self.limiter.due():
+            self.limiter.adjust(self.queue_delay())
+
+        priority = request_priority(scope["method"], scope["path"])
+        if priority == PRIORITY_CRITICAL:
+            self.limiter.acquire()
+        elif not self.limiter.try_acquire(PRIORITY_SHARES[priority]):
+            shed_counts[priority] += 1
+            await self._reject(send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.limiter.release()
+
+    async def _reject(self, send: Send) -> None:
+        body = json.dumps({"detail": "Server is overloaded, retry later."}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(self.retry_after).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import time
+from typing import Dict, List, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.v1.utils.call_logs import call_log_buffer
+from core.config import settings
+from core.database import InstrumentedQueuePool, engine, replica_engine
+from core.metrics import EventLoopLagMonitor, Histogram
+from core.prometheus import (
+    COUNTER,
+    GAUGE,
+    HISTOGRAM,
+    MetricFamily,
+    MultiprocessStore,
+    add_sample,
+    family,
+    render,
+)
+from middlewares.load_shed import request_limit, shed_counts
+
+logger = logging.getLogger(__name__)
+
+# Route label of requests no route matched (keeps label values bounded)
+UNMATCHED_ROUTE = "unmatched"
+
+# (method, route template, status) -> latency histogram, of this worker
+request_durations: Dict[Tuple[str, str, str], Histogram] = {}
+
+loop_lag = EventLoopLagMonitor(settings.EVENT_LOOP_LAG_INTERVAL_SECONDS)
+
+# Snapshots of all workers, None to report this worker only
+metrics_store = (
+    MultiprocessStore(settings.METRICS_DIR, stale_after=3 * settings.METRICS_SNAPSHOT_SECONDS)
+    if settings.METRICS_DIR
+    else None
+)
+
+
+class MetricsMiddleware:
+    """
+    Records the latency and status of every request, labelled by the route
+    template (e.g. /api/v1/phonenumbers/) rather than the raw path.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500  # Unless a response is started
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router stores the matched route in the (shared) scope
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            key = (scope["method"], route, str(status_code))
+            histogram = request_durations.get(key)
+            if histogram is None:
+                histogram = request_durations[key] = Histogram()
+            histogram.observe(time.perf_counter() - start)
+
+
+def _pool_metrics() -> List[MetricFamily]:
+    connections = family(
+        "db_pool_connections", GAUGE, "Pooled database connections by state."
+    )
+    wait = family(
+        "db_pool_wait_seconds", HISTOGRAM, "Time spent waiting for a database connection."
+    )
+    timeouts = family(
+        "db_pool_timeouts_total", COUNTER, "Connection checkouts that timed out."
+    )
+    for name, async_engine in (("primary", engine), ("replica", replica_engine)):
+        pool = async_engine.pool if async_engine is not None else None
+        if not isinstance(pool, InstrumentedQueuePool):
+            continue
+        add_sample(connections, {"pool": name, "state": "checked_out"}, pool.checkedout())
+        add_sample(connections, {"pool": name, "state": "checked_in"}, pool.checkedin())
+        add_sample(connections, {"pool": name, "state": "overflow"}, max(pool.overflow(), 0))
+        add_sample(wait, {"pool": name}, pool.wait_seconds)
+        add_sample(timeouts, {"pool": name}, pool.timeouts)
+    return [connections, wait, timeouts]
+
+
+def collect_metrics() -> List[MetricFamily]:
+    """
+    Return the metrics of this worker process.
+    """
+    requests = family("http_requests_total", COUNTER, "HTTP requests handled.")
+    durations = family(
+        "http_request_duration_seconds", HISTOGRAM, "HTTP request latency, until the body is sent."
+    )
+    for (method, route, status_code), histogram in list(request_durations.items()):
+        labels = {"method": method, "route": route, "status": status_code}
+        add_sample(requests, labels, histogram.count)
+        add_sample(durations, labels, histogram)
+
+    shed = family("http_requests_shed_total", COUNTER, "HTTP requests rejected by load shedding.")
+    for priority, count in shed_counts.items():
+        add_sample(shed, {"priority": priority}, count)
+
+    in_flight = family("http_requests_in_flight", GAUGE, "HTTP requests being handled.")
+    add_sample(in_flight, {}, request_limit.active)
+    limit = family("http_concurrency_limit", GAUGE, "Adaptive limit of in-flight HTTP requests.")
+    add_sample(limit, {}, int(request_limit.limit))
+
+    lag = family("event_loop_lag_seconds", HISTOGRAM, "Delay of event loop wake-ups.")
+    add_sample(lag, {}, loop_lag.lag_seconds)
+
+    # Rows accepted with a 202 but rejected by the database
+    buffer_failed = family(
+        "write_buffer_rows_failed_total", COUNTER, "Buffered rows dropped by failed flushes."
+    )
+    add_sample(buffer_failed, {"buffer": call_log_buffer.name}, call_log_buffer.failed)
+
+    return [requests, durations, shed, in_flight, limit, *_pool_metrics(), lag, buffer_failed]
+
+
+def metrics_text() -> str:
+    """
+    Return the metrics in the Prometheus text format, merged over all
+    workers when METRICS_DIR is set.
+    """
+    if metrics_store is None:
+        return render(collect_metrics())
+
+    # Refresh this worker's snapshot, the others are at most a period old
+    metrics_store.write(collect_metrics())
+    return render(metrics_store.merged())
+
+
+async def write_metrics_snapshots() -> None:
+    """
+    Write this worker's snapshot every METRICS_SNAPSHOT_SECONDS, until cancelled.
+    """
+    while True:
+        try:
+            metrics_store.write(collect_metrics())
+        except OSError:
+            logger.exception("Failed to write the metrics snapshot")
+        await asyncio.sleep(settings.METRICS_SNAPSHOT_SECONDS)
@@ -0,0 +1,169 @@
+import hashlib
+import hmac
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from uuid import UUID
+
+from fastapi import HTTPException, Request
+from fastapi.security.utils import get_authorization_scheme_param
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.config import settings
+from models.user import User
+from api.v1.utils.cache import TTLCache
+from api.v1.utils.jwt import verify_token
+
+# Signed (epoch) time until which the user's reads go to the primary, sent to
+# clients as a cookie and a response header; clients without cookies echo the
+# header back on their requests
+PRIMARY_COOKIE = "db_primary_until"
+PRIMARY_HEADER = "X-DB-Primary-Until"
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Users that wrote recently through this worker, keyed by user id
+recent_writers = TTLCache(
+    maxsize=settings.READ_YOUR_WRITES_CACHE_SIZE, ttl=settings.READ_YOUR_WRITES_SECONDS
+)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _signature(user_id: UUID, primary_until: str, valid_until: str) -> str:
+    message = f"primary_until:{user_id}:{primary_until}:{valid_until}".encode()
+    return hmac.new(settings.JWT_SECRET.encode(), message, hashlib.sha256).hexdigest()[:32]
+
+
+def sign_primary_until(user_id: UUID, primary_until: float, valid_until: float) -> str:
+    """
+    The value of PRIMARY_COOKIE/PRIMARY_HEADER stating that the user's reads
+    go to the primary until primary_until, trusted until valid_until.
+    """
+    primary_until, valid_until = f"{primary_until:.3f}", f"{valid_until:.3f}"
+    return f"{primary_until}:{valid_until}:{_signature(user_id, primary_until, valid_until)}"
+
+
+def verify_primary_until(value: Optional[str], user_id: UUID) -> Optional[float]:
+    """
+    The primary_until of a value signed for user_id, None if the value is
+    missing, forged, issued to another user or no longer valid.
+    """
+    try:
+        primary_until, valid_until, signature = value.split(":")
+        if float(valid_until) <= time.time():
+            return None
+    except (AttributeError, ValueError):
+        return None
+    if not hmac.compare_digest(signature, _signature(user_id, primary_until, valid_until)):
+        return None
+    return float(primary_until)
+
+
+async def token_user_id(authorization: Optional[str]) -> Optional[UUID]:
+    """
+    The user id of a bearer Authorization header, None without a valid token
+    (the request is then rejected by get_current_user, if it needs a user).
+    """
+    scheme, token = get_authorization_scheme_param(authorization)
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        # Served from the token cache, get_current_user verifies it again
+        payload = await verify_token(token)
+        return UUID(payload["uid"])
+    except (HTTPException, KeyError, ValueError):
+        return None
+
+
+def primary_window_end() -> datetime:
+    """
+    Value of users.primary_until for a write committed now: the user's reads
+    stay on the primary for READ_YOUR_WRITES_SECONDS.
+    """
+    return _utcnow() + timedelta(seconds=settings.READ_YOUR_WRITES_SECONDS)
+
+
+async def reads_need_primary(request: Request, db_session: AsyncSession) -> bool:
+    """
+    True if the request's user made a write within READ_YOUR_WRITES_SECONDS,
+    so its reads must see it and cannot go to a (possibly lagging) replica.
+
+    Writes through this worker and the signed value the client sends back
+    answer without a query. Only without either is users.primary_until read,
+    on the primary (db_session), and the answer is signed into the response
+    so the client's next reads skip the lookup.
+    """
+    user_id = await token_user_id(request.headers.get("authorization"))
+    if user_id is None:
+        return False
+    if recent_writers.get(user_id):
+        return True
+
+    now = time.time()
+    for value in (request.headers.get(PRIMARY_HEADER), request.cookies.get(PRIMARY_COOKIE)):
+        primary_until = verify_primary_until(value, user_id)
+        if primary_until is not None:
+            return primary_until > now
+
+    row = await db_session.scalar(select(User.primary_until).where(User.user_id == user_id))
+    primary_until = row.replace(tzinfo=timezone.utc).timestamp() if row else 0.0
+    request.state.primary_until = sign_primary_until(
+        user_id, primary_until, now + settings.READ_YOUR_WRITES_SECONDS
+    )
+    return primary_until > now
+
+
+class ReadYourWritesMiddleware:
+    """
+    Marks users whose write requests succeeded: in this worker, and with a
+    signed cookie and response header that every worker honours. Writes that
+    replica reads would miss also set users.primary_until (see
+    primary_window_end), which reads of clients sending neither look up.
+    """
+
+    def __init__(self, app: ASGIApp, window: Optional[float] = None):
+        """
+        Args:
+            app: The wrapped ASGI application.
+            window: Seconds reads stay on the primary after a write.
+        """
+        self.app = app
+        self.window = settings.READ_YOUR_WRITES_SECONDS if window is None else window
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or self.window <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        is_write = scope["method"] not in SAFE_METHODS
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                value = None
+                if is_write and message["status"] < 400:
+                    user_id = await token_user_id(Headers(scope=scope).get("authorization"))
+                    if user_id is not None:
+                        recent_writers.set(user_id, True)
+                        deadline = time.time() + self.window
+                        value = sign_primary_until(user_id, deadline, deadline)
+                elif not is_write:
+                    # Set by reads_need_primary after a lookup
+                    value = scope.get("state", {}).get("primary_until")
+
+                if value:
+                    headers = MutableHeaders(scope=message)
+                    headers.append(PRIMARY_HEADER, value)
+                    headers.append(
+                        "set-cookie",
+                        f"{PRIMARY_COOKIE}={value}; Max-Age={int(self.window) + 1}; "
+                        "Path=/; HttpOnly; SameSite=Lax",
+                    )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,146 @@
+import re
+from typing import Dict, Iterable, Tuple
+
+REDACTED = "[REDACTED]"
+
+# Tokens delimiting a JSON object or array: whole strings (also one cut off by
+# the end of the text, so brackets inside it are never counted) and brackets
+_STRUCTURE_TOKENS = re.compile(r'"[^"\\]*+(?:\\.[^"\\]*+)*+(?:"|\\?\Z)|[\[{\]}]', re.DOTALL)
+
+
+class Redactor:
+    """
+    Redacts sensitive values from logged bodies, URLs and headers.
+    All patterns are compiled once, when the redactor is built. Bodies without
+    any of the quoted keys are returned after a substring check; the others
+    are redacted in a single regex pass regardless of how many keys are
+    configured. Objects and arrays under a sensitive key are replaced whole,
+    up to their matching bracket or the end of the (possibly cut off) text.
+    """
+
+    def __init__(
+        self, keys: Iterable[str], headers: Iterable[str], max_scan_bytes: int
+    ):
+        """
+        Args:
+            keys: Body/query keys whose values are redacted (matched exactly).
+            headers: Header names whose values are redacted (case insensitive).
+            max_scan_bytes: Hard limit of characters scanned per body, anything
+                beyond it is cut off rather than logged unscanned.
+        """
+        self.keys = tuple(key.strip() for key in keys if key.strip())
+        self._quoted_keys = tuple('"%s"' % key for key in self.keys)
+        key_alternatives = "|".join(re.escape(key) for key in self.keys)
+
+        # JSON members: "key": followed by a string with \"escapes\", a bare
+        # scalar, or the opening bracket of an object or array (group 2), which
+        # _structure_end delimits. The string branch is unrolled ([^"\\]* runs,
+        # possessive escape loop) so a long token costs one scan instead of
+        # per-character backtracking.
+        self._json_pattern = re.compile(
+            r'("(?:%s)"\s*:\s*)(?:([\[{])|"[^"\\]*(?:\\.[^"\\]*)*+"?|[^,{}\[\]\s]+)'
+            % key_alternatives
+        )
+        # Without a backslash in the body no string holds an escape, and a
+        # plain [^"]* run (a much faster loop in re) finds the closing quote
+        self._json_plain_pattern = re.compile(
+            r'("(?:%s)"\s*:\s*)(?:([\[{])|"[^"]*"?|[^,{}\[\]\s]+)' % key_alternatives
+        )
+        self._json_replacement = '"%s"' % REDACTED
+
+        # Form encoded bodies and query strings: key=value
+        self._form_pattern = re.compile(r"((?:^|[&;?])(?:%s)=)[^&;#]*" % key_alternatives)
+        self._form_replacement = r"\1%s" % REDACTED
+
+        self.headers = frozenset(
+            header.strip().lower() for header in headers if header.strip()
+        )
+        self.max_scan_bytes = max_scan_bytes
+
+    def redact_body(self, body: str, content_type: str = "") -> str:
+        """
+        Redact sensitive values from a request or response body.
+        Args:
+            body: Decoded body text.
+            content_type: Content-Type of the body, selects the pattern used.
+
+        Returns:
+            Redacted body.
+        """
+        if not body:
+            return body
+
+        truncated = len(body) > self.max_scan_bytes
+        if truncated:
+            body = body[: self.max_scan_bytes]
+
+        if "application/x-www-form-urlencoded" in content_type:
+            body = self._form_pattern.sub(self._form_replacement, body)
+        else:
+            # JSON, cut off JSON or text embedding it: members are found the
+            # same way whatever the content type says
+            body = self._redact_members(body)
+
+        if truncated:
+            body += "...[truncated]"
+        return body
+
+    def _redact_members(self, body: str) -> str:
+        """
+        Redact sensitive JSON members in one pass with the cheapest pattern
+        that is exact for body.
+        """
+        if not any(key in body for key in self._quoted_keys):
+            return body
+
+        pattern = self._json_pattern if "\\" in body else self._json_plain_pattern
+        parts = []
+        position = 0
+        match = pattern.search(body)
+        while match is not None:
+            parts.append(body[position : match.end(1)])
+            parts.append(self._json_replacement)
+            if match.group(2):
+                position = self._structure_end(body, match.start(2))
+            else:
+                position = match.end()
+            match = pattern.search(body, position)
+
+        if not parts:
+            return body
+        parts.append(body[position:])
+        return "".join(parts)
+
+    @staticmethod
+    def _structure_end(body: str, start: int) -> int:
+        """
+        Index after the bracket closing the object or array opened at start,
+        the end of body if it is not closed in it.
+        """
+        depth = 0
+        for token in _STRUCTURE_TOKENS.finditer(body, start):
+            bracket = token.group()[0]
+            if bracket in "[{":
+                depth += 1
+            elif bracket in "]}":
+                depth -= 1
+                if not depth:
+                    return token.end()
+        return len(body)
+
+    def redact_url(self, url: str) -> str:
+        """
+        Redact sensitive query string parameters of a URL.
+        """
+        if "?" not in url or not any(key in url for key in self.keys):
+            return url
+        return self._form_pattern.sub(self._form_replacement, url)
+
+    def redact_headers(self, headers: Iterable[Tuple[str, str]]) -> Dict[str, str]:
+        """
+        Return the headers as a dict with sensitive values redacted.
+        """
+        return {
+            name: REDACTED if name.lower() in self.headers else value
+            for name, value in headers
+        }
@@ -0,0 +1,87 @@
+import logging
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+import core.database
+from core.config import settings
+from core.database import QueryStats, current_query_stats
+
+logger = logging.getLogger(__name__)
+
+# Requests in which a statement ran N_PLUS_ONE_THRESHOLD times or more
+repeated_statement_requests = 0
+
+
+def sql_stats() -> dict:
+    """
+    Return the slow query and N+1 counters of this worker.
+    """
+    return {
+        "slow_queries": core.database.slow_query_count,
+        "repeated_statement_requests": repeated_statement_requests,
+    }
+
+
+class ServerTimingMiddleware:
+    """
+    Attributes the SQL statements run while handling a request to it (see
+    core.database.current_query_stats), reports their count and time in a
+    Server-Timing header and logs statements repeated N+1 style.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        enabled: bool = settings.SERVER_TIMING_ENABLED,
+        repeat_threshold: int = settings.N_PLUS_ONE_THRESHOLD,
+    ):
+        """
+        Args:
+            app: The wrapped ASGI application.
+            enabled: Send the Server-Timing header (statements are counted anyway).
+            repeat_threshold: Runs of one statement in a request that are flagged.
+        """
+        self.app = app
+        self.enabled = enabled
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+
+        async def send_wrapper(message: Message) -> None:
+            # Statements of a streamed body run after this and are not included
+            if message["type"] == "http.response.start" and self.enabled:
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={stats.seconds * 1000:.2f};desc="{stats.count} queries"',
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_query_stats.reset(token)
+            self._flag_repeated(scope, stats)
+
+    def _flag_repeated(self, scope: Scope, stats: QueryStats) -> None:
+        global repeated_statement_requests
+        repeated = stats.repeated(self.repeat_threshold) if self.repeat_threshold else []
+        if not repeated:
+            return
+
+        repeated_statement_requests += 1
+        for statement, count in repeated:
+            logger.warning(
+                "Possible N+1: statement ran %d times in %s %s: %s",
+                count,
+                scope["method"],
+                scope["path"],
+                statement,
+            )
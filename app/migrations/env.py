@@ -13,6 +13,8 @@ from core.database import Base
 from models.user import User
 from models.phonenumber import PhoneNumber
 from models.call_log import CallLog
+from models.call_log_rollup import CallLogHourlyRollup
+from models.revoked_token import RevokedToken
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,40 @@
+"""align call_logs enum types with the model
+
+Revision ID: c3d8e1f07a64
+Revises: 9a4f2c6e8b17
+Create Date: 2026-10-18 14:21:40.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d8e1f07a64'
+down_revision: Union[str, None] = '9a4f2c6e8b17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The call_logs migration created the enum types as calltype/callstatus with
+# upper case labels, while the model binds call_type/call_status with the
+# (lower case) member names, so no call log could be inserted.
+ENUM_TYPES = {
+    ('calltype', 'call_type'): ['incoming', 'outgoing', 'missed', 'rejected'],
+    ('callstatus', 'call_status'): ['completed', 'failed', 'no_answer', 'busy'],
+}
+
+
+def upgrade() -> None:
+    for (old_name, new_name), labels in ENUM_TYPES.items():
+        op.execute(f"ALTER TYPE {old_name} RENAME TO {new_name}")
+        for label in labels:
+            op.execute(f"ALTER TYPE {new_name} RENAME VALUE '{label.upper()}' TO '{label}'")
+
+
+def downgrade() -> None:
+    for (old_name, new_name), labels in ENUM_TYPES.items():
+        for label in labels:
+            op.execute(f"ALTER TYPE {new_name} RENAME VALUE '{label}' TO '{label.upper()}'")
+        op.execute(f"ALTER TYPE {new_name} RENAME TO {old_name}")
@@ -0,0 +1,29 @@
+"""add recorded_by_caller and recorded_by_receiver to call_logs
+
+Revision ID: d6c4a1f8e93b
+Revises: b2e8f4a6c3d1
+Create Date: 2026-10-18 19:02:11.417305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd6c4a1f8e93b'
+down_revision: Union[str, None] = 'b2e8f4a6c3d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing call logs stay visible on both sides
+    op.add_column('call_logs', sa.Column('recorded_by_caller', sa.Boolean(), server_default=sa.true(), nullable=False))
+    op.add_column('call_logs', sa.Column('recorded_by_receiver', sa.Boolean(), server_default=sa.true(), nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('call_logs', 'recorded_by_receiver')
+    op.drop_column('call_logs', 'recorded_by_caller')
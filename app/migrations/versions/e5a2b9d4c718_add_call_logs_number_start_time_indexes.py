@@ -0,0 +1,31 @@
+"""add call_logs number + call_start_time indexes
+
+Revision ID: e5a2b9d4c718
+Revises: c3d8e1f07a64
+Create Date: 2026-10-18 15:02:11.774091
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a2b9d4c718'
+down_revision: Union[str, None] = 'c3d8e1f07a64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # call_logs is large and written continuously, build without blocking writes
+    with op.get_context().autocommit_block():
+        op.create_index('ix_call_logs_caller_start_time', 'call_logs', ['caller_phonenumber', 'call_start_time', 'call_log_id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_call_logs_receiver_start_time', 'call_logs', ['receiver_phonenumber', 'call_start_time', 'call_log_id'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_call_logs_receiver_start_time', table_name='call_logs', postgresql_concurrently=True)
+        op.drop_index('ix_call_logs_caller_start_time', table_name='call_logs', postgresql_concurrently=True)
@@ -1,8 +1,8 @@
 from uuid import uuid4
-from sqlalchemy import Column, String, DateTime, ForeignKey, Enum, Float
+from sqlalchemy import Boolean, Column, String, DateTime, ForeignKey, Enum, Float, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, true
 from core.database import Base
 import enum
 
@@ -72,6 +72,28 @@ class CallLog(Base):
         nullable=True,
     )
 
+    # Whether the owner of each number uploaded the call: a call uploaded by one
+    # party only shows up (listing, export, rollups) on that party's side
+    recorded_by_caller = Column(Boolean, nullable=False, default=True, server_default=true())
+    recorded_by_receiver = Column(Boolean, nullable=False, default=True, server_default=true())
+
     # Timestamps for creation and updates
     created_at = Column(DateTime, default=func.now())  # Record creation timestamp
     updated_at = Column(DateTime, onupdate=func.now())  # Record last updated timestamp
+
+    __table_args__ = (
+        # Serve per-number history ordered by start time (keyset pagination on
+        # call_start_time, call_log_id) from either side of the call
+        Index(
+            "ix_call_logs_caller_start_time",
+            "caller_phonenumber",
+            "call_start_time",
+            "call_log_id",
+        ),
+        Index(
+            "ix_call_logs_receiver_start_time",
+            "receiver_phonenumber",
+            "call_start_time",
+            "call_log_id",
+        ),
+    )
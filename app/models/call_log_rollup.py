@@ -0,0 +1,28 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, Float
+from sqlalchemy.dialects.postgresql import UUID
+
+from core.database import Base
+
+
+class CallLogHourlyRollup(Base):
+    """
+    SQLAlchemy model of per-number, per-hour call counters.
+    One row per phone number, hour, direction, call type and call status,
+    incremented in the same transaction that inserts the call logs
+    (see api.v1.utils.call_log_rollups), so summaries never scan call_logs.
+    """
+
+    __tablename__ = "call_log_hourly_rollups"
+
+    # Composite primary key: the rollup dimensions
+    phonenumber_id = Column(
+        UUID(as_uuid=True), ForeignKey("phonenumbers.phonenumber_id"), primary_key=True
+    )
+    bucket_start = Column(DateTime, primary_key=True)  # Start of the hour (UTC)
+    direction = Column(String(8), primary_key=True)  # outgoing (caller) or incoming (receiver)
+    call_type = Column(String(16), primary_key=True)
+    call_status = Column(String(16), primary_key=True)  # "" when the call had no status
+
+    # Counters
+    call_count = Column(Integer, nullable=False, default=0)
+    total_duration = Column(Float, nullable=False, default=0)  # Seconds
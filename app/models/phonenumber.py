@@ -1,6 +1,6 @@
 from uuid import uuid4
 
-from sqlalchemy import Column, String, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, String, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
@@ -23,3 +23,13 @@ class PhoneNumber(Base):
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.user_id"), nullable=False)
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, onupdate=func.now())
+
+    __table_args__ = (
+        # Serves the per-user listing ordered by creation time (keyset pagination)
+        Index(
+            "ix_phonenumbers_user_id_created_at",
+            "user_id",
+            "created_at",
+            "phonenumber_id",
+        ),
+    )
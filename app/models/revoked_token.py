@@ -0,0 +1,27 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+
+from core.database import Base
+
+
+class RevokedToken(Base):
+    """
+    SQLAlchemy model of revoked JWTs, identified by their jti claim.
+    Checked through an in-memory Bloom filter (see api.v1.utils.revocation),
+    so only probable matches ever query this table.
+    """
+
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String(32), primary_key=True)  # Token id (uuid4 hex)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.user_id"), nullable=True)
+    token_type = Column(String(16), nullable=False)  # access or refresh
+    # Expiry of the token itself, revocations of expired tokens no longer matter
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, default=func.now())
+
+    __table_args__ = (
+        # Filter rebuilds load only revocations of tokens that are still valid
+        Index("ix_revoked_tokens_expires_at", "expires_at"),
+    )
@@ -1,6 +1,6 @@
 from uuid import uuid4
 from email_validator import validate_email as validate_email_address, EmailSyntaxError
-from sqlalchemy import Column, String, DateTime
+from sqlalchemy import Column, String, DateTime, Integer
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 
@@ -20,6 +20,16 @@ class User(Base):
     # User email, must be unique and indexed for faster lookup
     email = Column(String, unique=True, index=True)
     password = Column(String)
+
+    # Denormalized number of phone numbers owned by the user, maintained in the same
+    # transaction as phone number writes (see api.v1.utils.counters)
+    phonenumber_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Bumped with every change to the user's phone numbers, the ETag version of
+    # the phone number listing
+    phonenumbers_version = Column(Integer, nullable=False, default=0, server_default="0")
+    # Reads of the user stay on the primary until then (UTC), set by writes a
+    # lagging read replica may not have yet (see middlewares.read_your_writes)
+    primary_until = Column(DateTime, nullable=True)
     
     # Timestamps for record creation and update
     created_at = Column(DateTime, default=func.now())  # Automatically set on creation
@@ -0,0 +1,105 @@
+from datetime import datetime, timezone
+from typing import List, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field, field_validator
+
+from models.call_log import CallStatus, CallType
+
+
+def to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """
+    Convert an aware datetime to naive UTC, the storage format of call logs.
+    """
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class CallLogIngest(BaseModel):
+    """
+    Pydantic model for a single call record (CDR) of an ingestion stream.
+    Caller and receiver reference registered phone numbers either by number
+    (any format phonenumbers understands, with country code) or by phonenumber_id.
+    """
+
+    caller: str
+    receiver: str
+    call_start_time: datetime
+    call_end_time: Optional[datetime] = None
+    call_duration: Optional[float] = Field(None, ge=0)  # Seconds
+    call_type: CallType = CallType.outgoing
+    call_status: Optional[CallStatus] = None
+
+    @field_validator("call_start_time", "call_end_time")
+    def validate_times(cls, v):
+        """
+        Store timestamps as naive UTC, like the rest of the schema.
+        """
+        return to_naive_utc(v)
+
+
+class CallLogIngestError(BaseModel):
+    """
+    A rejected line of an ingestion stream.
+    """
+
+    row: int  # 1-based line number of the record
+    detail: str
+
+
+class CallLogIngestReport(BaseModel):
+    """
+    Pydantic model to represent the outcome of a call log ingestion request.
+    """
+
+    accepted: int  # Records queued for writing
+    rejected: int  # Malformed records or unknown phone numbers
+    errors: List[CallLogIngestError]  # First rejected records, capped
+
+
+class CallLogRead(BaseModel):
+    """
+    Pydantic model to represent a read response for call logs.
+    """
+
+    call_log_id: UUID
+    caller_phonenumber: UUID  # phonenumber_id of the caller
+    receiver_phonenumber: UUID  # phonenumber_id of the receiver
+    call_start_time: datetime
+    call_end_time: Optional[datetime]
+    call_duration: Optional[float]
+    call_type: CallType
+    call_status: Optional[CallStatus]
+
+    class Config:
+        """
+        Allows SQLAlchemy models to convert attributes into Pydantic responses.
+        """
+
+        from_attributes = True
+
+
+class CallLogSummaryRow(BaseModel):
+    """
+    Call totals of one time bucket, direction, call type and call status.
+    """
+
+    bucket_start: datetime  # Start of the hour / day (UTC)
+    direction: str  # outgoing or incoming, relative to the owned number
+    call_type: CallType
+    call_status: Optional[CallStatus]
+    phonenumber_id: Optional[UUID] = None  # Set when broken down per number
+    call_count: int
+    total_duration: float  # Seconds
+
+
+class CallLogSummary(BaseModel):
+    """
+    Pydantic model to represent a call log summary served from the rollups.
+    """
+
+    granularity: str  # hour or day
+    start_time: datetime  # Hour aligned range actually summarized
+    end_time: datetime
+    rows: List[CallLogSummaryRow]
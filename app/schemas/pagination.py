@@ -5,11 +5,16 @@ from typing import Generic, TypeVar, List, Optional
 T = TypeVar("T")
 
 class PaginationBase(BaseModel):
-    total: int
+    # total is optional in cursor mode, where counting is opt-in
+    total: Optional[int] = None
     limit: int
-    offset: int
-    next_offset: Optional[int]
-    prev_offset: Optional[int]
+    # Offset mode fields
+    offset: Optional[int] = None
+    next_offset: Optional[int] = None
+    prev_offset: Optional[int] = None
+    # Cursor mode fields
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
 class PaginatedResponse(BaseModel, Generic[T]):
     data: List[T]
@@ -2,8 +2,11 @@ from fastapi import HTTPException, status
 from pydantic import BaseModel, field_validator
 from uuid import UUID
 from datetime import datetime
+from typing import List, Optional
 import phonenumbers
 
+from core.phone_validation import normalize_phone_number
+
 
 class PhoneNumberCreate(BaseModel):
     """
@@ -20,18 +23,15 @@ class PhoneNumberCreate(BaseModel):
         This ensures the phone number is properly formatted and valid according to global standards.
         Handles country codes automatically.
         """
+        # Normalized results are memoized by raw input, repeated numbers skip parsing
+        normalized_number = normalize_phone_number(v)
+        if normalized_number is not None:
+            # Return the validated and properly formatted phone number (E.164 standard)
+            return normalized_number
+
         try:
-            # Parse the phone number. 'None' allows automatic country code detection.
-            parsed_number = phonenumbers.parse(v, None)
-
-            # Check if the number is valid
-            if not phonenumbers.is_valid_number(parsed_number):
-                # Raise an exception if the number fails validation
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Invalid phone number. Include the country code (e.g., +1234567890) and "
-                    "ensure it follows the correct format.",
-                )
+            # Parse again only to tell malformed input from invalid numbers
+            phonenumbers.parse(v, None)
         except phonenumbers.NumberParseException:
             # Handle parsing exceptions gracefully
             raise HTTPException(
@@ -39,9 +39,11 @@ class PhoneNumberCreate(BaseModel):
                 detail="Invalid phone number.",
             )
 
-        # Return the validated and properly formatted phone number (E.164 standard)
-        return phonenumbers.format_number(
-            parsed_number, phonenumbers.PhoneNumberFormat.E164
+        # Raise an exception if the number fails validation
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid phone number. Include the country code (e.g., +1234567890) and "
+            "ensure it follows the correct format.",
         )
 
 
@@ -64,3 +66,26 @@ class PhoneNumberRead(BaseModel):
         from_attributes = (
             True  # Maps SQLAlchemy model attributes directly to Pydantic responses
         )
+
+
+class BulkPhoneNumberResult(BaseModel):
+    """
+    Outcome of a single row of a bulk phone number upload.
+    """
+
+    row: int  # 1-based position of the row in the upload (header excluded)
+    number: Optional[str]  # Normalized number, or the raw input when invalid
+    status: str  # created, duplicate or invalid
+    phonenumber_id: Optional[UUID] = None  # Set for created rows
+    detail: Optional[str] = None  # Reason for duplicate and invalid rows
+
+
+class BulkPhoneNumberReport(BaseModel):
+    """
+    Pydantic model to represent the report of a bulk phone number upload.
+    """
+
+    created: int
+    duplicate: int
+    invalid: int
+    results: List[BulkPhoneNumberResult]
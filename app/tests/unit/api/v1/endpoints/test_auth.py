@@ -90,6 +90,20 @@ class TestAuthAPI(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn("Email already registered!", response.json().get("detail"))
 
+    async def test_register_user_existing_email_is_not_hashed(self):
+        """Test the /register endpoint rejects a known email before hashing the password."""
+        payload = {
+            "email": "testuser@example.com",
+            "password": "securepassword",
+        }
+        self.client.post(f"{self.base_url}/register", json=payload)
+
+        with patch("api.v1.endpoints.auth.hash_password_async") as mock_hash_password:
+            response = self.client.post(f"{self.base_url}/register", json=payload)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        mock_hash_password.assert_not_called()
+
     async def test_create_token_success(self):
         """Test the /token endpoint for successful login."""
         payload = {
@@ -99,7 +113,7 @@ class TestAuthAPI(unittest.IsolatedAsyncioTestCase):
 
         with patch(
             "api.v1.utils.password.hash_password",
-            return_value="mock_hash_password",
+            side_effect=hash_password,
         ):
             # register same user twice
             self.client.post(f"{self.base_url}/register", json=payload)
@@ -171,6 +185,27 @@ class TestAuthAPI(unittest.IsolatedAsyncioTestCase):
             "Invalid or expired token", response.json().get("detail")
         )
 
+    async def test_logout_revokes_tokens(self):
+        """Test the /logout endpoint: both tokens are rejected afterwards."""
+        payload = {"email": "testuser@example.com", "password": "password"}
+        self.client.post(f"{self.base_url}/register", json=payload)
+        tokens = self.client.post(f"{self.base_url}/token", json=payload).json()
+        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+        refresh_req_data = {"refresh_token": tokens["refresh_token"]}
+
+        response = self.client.post(
+            f"{self.base_url}/logout", json=refresh_req_data, headers=headers
+        )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        response = self.client.post(f"{self.base_url}/refresh", json=refresh_req_data)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = self.client.post(
+            f"{self.base_url}/logout", json=refresh_req_data, headers=headers
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
     async def teardown_database(self):
         # Drop all tables to flush the database
         async with self.engine.begin() as conn:
@@ -0,0 +1,487 @@
+import unittest
+import asyncio
+import csv
+import json
+from datetime import datetime
+from uuid import UUID, uuid4
+from fastapi.testclient import TestClient
+from fastapi import status
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from core.database import Base, get_db, get_session_factory
+from main import app
+from models.call_log import CallLog, CallType
+from models.phonenumber import PhoneNumber
+from api.v1.dependencies import get_call_log_buffer
+from api.v1.utils.call_logs import build_call_log_buffer, phonenumber_id_cache
+from api.v1.utils.call_log_export import export_slots
+
+
+DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+
+
+class TestCallLogAPI(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+        self.base_url = "/api/v1"
+
+        # Create an in-memory SQLite database
+        self.engine = create_async_engine(DATABASE_URL, echo=False)
+        self.SessionLocal = sessionmaker(
+            autocommit=False, autoflush=False, bind=self.engine, class_=AsyncSession
+        )
+
+        # Override get_db dependency
+        async def override_get_db():
+            async with self.SessionLocal() as session:
+                yield session
+
+        # Buffer writing to the test database, flushed explicitly by the tests
+        self.buffer = build_call_log_buffer(self.SessionLocal)
+        self.buffer.flush_interval = 3600
+        phonenumber_id_cache.clear()
+
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_call_log_buffer] = lambda: self.buffer
+        app.dependency_overrides[get_session_factory] = lambda: self.SessionLocal
+
+        # Initialize the database schema
+        asyncio.run(self.setup_database())
+
+    async def setup_database(self):
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    def register_with_numbers(self, numbers, email="testuser@example.com"):
+        payload = {
+            "email": email,
+            "password": "securepassword",
+        }
+        self.client.post(f"{self.base_url}/auth/register", json=payload)
+        token_response = self.client.post(f"{self.base_url}/auth/token", json=payload)
+        headers = {"Authorization": f"Bearer {token_response.json()["access_token"]}"}
+
+        ids = [
+            self.client.post(
+                f"{self.base_url}/phonenumbers", headers=headers, json={"number": number}
+            ).json()["phonenumber_id"]
+            for number in numbers
+        ]
+        return headers, ids
+
+    async def test_ingest_call_logs_success(self):
+        """Test the /calllogs/ingest endpoint queues valid records and reports the rest."""
+
+        headers, ids = self.register_with_numbers(["+9779841234567", "+9779841234568"])
+        records = [
+            {
+                "caller": "+977 984-1234567",
+                "receiver": ids[1],
+                "call_start_time": "2024-12-11T12:00:00+05:45",
+                "call_end_time": "2024-12-11T12:01:30+05:45",
+                "call_type": "outgoing",
+                "call_status": "completed",
+            },
+            {"caller": ids[1], "receiver": ids[0], "call_start_time": "2024-12-11T13:00:00Z", "call_type": "missed"},
+            {"caller": "+9779841234599", "receiver": ids[0], "call_start_time": "2024-12-11T13:00:00Z"},
+            {"caller": ids[0], "receiver": ids[1], "call_start_time": "2024-12-11T13:00:00Z", "call_type": "unknown"},
+        ]
+        body = "\n".join([json.dumps(record) for record in records] + ["{oops"])
+
+        response = self.client.post(
+            f"{self.base_url}/calllogs/ingest",
+            headers={**headers, "Content-Type": "application/x-ndjson"},
+            content=body,
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        report = response.json()
+        self.assertEqual((report["accepted"], report["rejected"]), (2, 3))
+        self.assertEqual([error["row"] for error in report["errors"]], [3, 4, 5])
+
+        await self.buffer.flush()
+        async with self.SessionLocal() as session:
+            call_logs = (
+                await session.scalars(select(CallLog).order_by(CallLog.call_start_time))
+            ).all()
+
+        self.assertEqual(len(call_logs), 2)
+        self.assertEqual(str(call_logs[0].caller_phonenumber), ids[0])
+        self.assertEqual(call_logs[0].call_start_time.hour, 6)  # stored as UTC
+        self.assertEqual(call_logs[0].call_duration, 90)
+        self.assertEqual(call_logs[1].call_type, CallType.missed)
+
+    async def test_ingest_call_logs_requires_an_owned_number(self):
+        """Test the /calllogs/ingest endpoint rejects calls between other users' numbers."""
+
+        _, victim_ids = self.register_with_numbers(["+9779841234567", "+9779841234568"])
+        headers, own_ids = self.register_with_numbers(
+            ["+9779841234569"], email="otheruser@example.com"
+        )
+        records = [
+            {"caller": victim_ids[0], "receiver": victim_ids[1], "call_start_time": "2024-12-11T13:00:00Z"},
+            {"caller": "+9779841234568", "receiver": own_ids[0], "call_start_time": "2024-12-11T13:00:00Z"},
+        ]
+
+        response = self.client.post(
+            f"{self.base_url}/calllogs/ingest",
+            headers={**headers, "Content-Type": "application/x-ndjson"},
+            content="\n".join(json.dumps(record) for record in records),
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        report = response.json()
+        self.assertEqual((report["accepted"], report["rejected"]), (1, 1))
+        self.assertEqual(report["errors"][0]["row"], 1)
+
+        await self.buffer.flush()
+        async with self.SessionLocal() as session:
+            call_logs = (await session.scalars(select(CallLog))).all()
+        self.assertEqual([str(call_log.receiver_phonenumber) for call_log in call_logs], own_ids)
+
+    async def test_ingest_call_logs_not_shown_to_the_other_party(self):
+        """Test calls uploaded with another user's number stay out of that user's call logs."""
+
+        victim_headers, victim_ids = self.register_with_numbers(["+9779841234567"])
+        headers, own_ids = self.register_with_numbers(
+            ["+9779841234569"], email="otheruser@example.com"
+        )
+        records = [
+            {
+                "caller": own_ids[0],
+                "receiver": victim_ids[0],
+                "call_start_time": "2024-12-11T10:00:00Z",
+                "call_duration": 60,
+                "call_type": "outgoing",
+                "call_status": "completed",
+            },
+            {
+                "caller": victim_ids[0],
+                "receiver": own_ids[0],
+                "call_start_time": "2024-12-11T11:00:00Z",
+                "call_type": "missed",
+            },
+        ]
+        response = self.client.post(
+            f"{self.base_url}/calllogs/ingest",
+            headers={**headers, "Content-Type": "application/x-ndjson"},
+            content="\n".join(json.dumps(record) for record in records),
+        )
+        self.assertEqual(response.json()["accepted"], 2)
+        await self.buffer.flush()
+
+        summary_params = {
+            "start_time": "2024-12-11T00:00:00Z",
+            "end_time": "2024-12-12T00:00:00Z",
+        }
+
+        # The uploader sees both calls
+        response = self.client.get(f"{self.base_url}/calllogs", headers=headers)
+        self.assertEqual(len(response.json()["data"]), 2)
+        response = self.client.get(
+            f"{self.base_url}/calllogs/summary", headers=headers, params=summary_params
+        )
+        self.assertEqual(
+            sorted((row["direction"], row["call_count"]) for row in response.json()["rows"]),
+            [("incoming", 1), ("outgoing", 1)],
+        )
+
+        # The owner of the other number sees neither
+        response = self.client.get(f"{self.base_url}/calllogs", headers=victim_headers)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(
+            f"{self.base_url}/calllogs/summary", headers=victim_headers, params=summary_params
+        )
+        self.assertEqual(response.json()["rows"], [])
+        response = self.client.get(f"{self.base_url}/calllogs/export", headers=victim_headers)
+        self.assertEqual(list(csv.DictReader(response.text.splitlines())), [])
+
+    async def test_ingest_call_logs_buffer_full(self):
+        """Test the /calllogs/ingest endpoint pushes back when the buffer is full."""
+
+        headers, ids = self.register_with_numbers(["+9779841234567", "+9779841234568"])
+        self.buffer.max_rows = 1
+        record = json.dumps(
+            {"caller": ids[0], "receiver": ids[1], "call_start_time": "2024-12-11T13:00:00"}
+        )
+
+        response = self.client.post(
+            f"{self.base_url}/calllogs/ingest",
+            headers={**headers, "Content-Type": "application/x-ndjson"},
+            content=f"{record}\n{record}\n",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", response.headers)
+        self.assertEqual(response.json()["accepted"], 0)
+        self.assertEqual(response.json()["resume_from_row"], 1)
+
+    async def add_call_logs(self, calls):
+        async with self.SessionLocal() as session:
+            session.add_all(
+                CallLog(
+                    caller_phonenumber=UUID(caller),
+                    receiver_phonenumber=UUID(receiver),
+                    call_start_time=datetime(2024, 12, 11, hour),
+                    call_type=call_type,
+                )
+                for caller, receiver, hour, call_type in calls
+            )
+            await session.commit()
+
+    async def test_get_call_logs_keyset_pages(self):
+        """Test walking the /calllogs listing newest first, across both call sides."""
+
+        headers, ids = self.register_with_numbers(["+9779841234567", "+9779841234568"])
+        _, others = self.register_with_numbers(["+9779841234569"], email="otheruser@example.com")
+        mine, second, other = ids[0], ids[1], others[0]
+
+        await self.add_call_logs(
+            [
+                (mine, other, 1, CallType.outgoing),
+                (other, mine, 2, CallType.incoming),
+                (mine, second, 3, CallType.outgoing),  # both sides owned
+                (other, second, 4, CallType.missed),
+                (other, other, 5, CallType.outgoing),  # not ours
+            ]
+        )
+
+        hours = []
+        params = {"limit": 2}
+        while True:
+            response = self.client.get(f"{self.base_url}/calllogs", headers=headers, params=params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            hours.extend(
+                datetime.fromisoformat(item["call_start_time"]).hour
+                for item in response.json()["data"]
+            )
+            next_cursor = response.json()["pagination"]["next_cursor"]
+            if not next_cursor:
+                break
+            params = {"limit": 2, "cursor": next_cursor}
+
+        self.assertEqual(hours, [4, 3, 2, 1])
+
+        # incoming calls of a single number within a time range
+        response = self.client.get(
+            f"{self.base_url}/calllogs",
+            headers=headers,
+            params={
+                "number": "+9779841234568",
+                "direction": "incoming",
+                "start_time": "2024-12-11T03:00:00",
+                "end_time": "2024-12-11T04:00:00",
+            },
+        )
+        self.assertEqual(len(response.json()["data"]), 1)
+        self.assertEqual(response.json()["data"][0]["caller_phonenumber"], mine)
+
+        response = self.client.get(
+            f"{self.base_url}/calllogs", headers=headers, params={"call_type": "missed"}
+        )
+        self.assertEqual(
+            [item["receiver_phonenumber"] for item in response.json()["data"]], [second]
+        )
+
+        # numbers of other users are not visible
+        response = self.client.get(
+            f"{self.base_url}/calllogs", headers=headers, params={"number": other}
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_get_call_log_summary(self):
+        """Test /calllogs/summary counts ingested calls per hour and per day from the rollups."""
+
+        headers, ids = self.register_with_numbers(["+9779841234567", "+9779841234568"])
+        records = [
+            {
+                "caller": ids[0],
+                "receiver": ids[1],
+                "call_start_time": f"2024-12-11T{hour:02d}:{minute:02d}:00Z",
+                "call_end_time": f"2024-12-11T{hour:02d}:{minute + 1:02d}:00Z",
+                "call_type": "outgoing",
+                "call_status": "completed",
+            }
+            for hour, minute in [(10, 5), (10, 40), (11, 0)]
+        ]
+        self.client.post(
+            f"{self.base_url}/calllogs/ingest",
+            headers={**headers, "Content-Type": "application/x-ndjson"},
+            content="\n".join(json.dumps(record) for record in records),
+        )
+        await self.buffer.flush()
+
+        params = {
+            "start_time": "2024-12-11T10:30:00Z",  # widened to 10:00
+            "end_time": "2024-12-11T12:00:00Z",
+            "number": ids[0],
+        }
+        response = self.client.get(
+            f"{self.base_url}/calllogs/summary", headers=headers, params=params
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [
+                (datetime.fromisoformat(row["bucket_start"]).hour, row["direction"], row["call_count"])
+                for row in response.json()["rows"]
+            ],
+            [(10, "outgoing", 2), (11, "outgoing", 1)],
+        )
+
+        # Both numbers, both directions, a single day bucket
+        response = self.client.get(
+            f"{self.base_url}/calllogs/summary",
+            headers=headers,
+            params={
+                "start_time": params["start_time"],
+                "end_time": params["end_time"],
+                "granularity": "day",
+                "direction": "incoming",
+            },
+        )
+        rows = response.json()["rows"]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual((rows[0]["direction"], rows[0]["call_count"]), ("incoming", 3))
+        self.assertEqual(rows[0]["total_duration"], 180)
+
+        response = self.client.get(
+            f"{self.base_url}/calllogs/summary",
+            headers=headers,
+            params={"start_time": "2024-12-11T12:00:00Z", "end_time": "2024-12-11T10:00:00Z"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def test_export_call_logs(self):
+        """Test /calllogs/export streams every call of the user, oldest first, as CSV or NDJSON."""
+
+        headers, ids = self.register_with_numbers(["+9779841234567", "+9779841234568"])
+        _, others = self.register_with_numbers(["+9779841234569"], email="otheruser@example.com")
+        mine, second, other = ids[0], ids[1], others[0]
+
+        await self.add_call_logs(
+            [
+                (other, mine, 3, CallType.incoming),
+                (mine, second, 1, CallType.outgoing),
+                (other, other, 2, CallType.outgoing),  # not ours
+                (second, other, 4, CallType.missed),
+            ]
+        )
+
+        response = self.client.get(f"{self.base_url}/calllogs/export", headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.headers["content-type"].startswith("text/csv"))
+        self.assertIn("call_logs.csv", response.headers["content-disposition"])
+
+        rows = list(csv.DictReader(response.text.splitlines()))
+        self.assertEqual(
+            [(row["caller_phonenumber"], row["call_type"]) for row in rows],
+            [(mine, "outgoing"), (other, "incoming"), (second, "missed")],
+        )
+        self.assertEqual(rows[0]["call_start_time"], "2024-12-11T01:00:00")
+        self.assertEqual(rows[0]["call_status"], "")
+        self.assertEqual(export_slots.active, 0)  # released after streaming
+
+        response = self.client.get(
+            f"{self.base_url}/calllogs/export",
+            headers=headers,
+            params={"format": "ndjson", "direction": "incoming"},
+        )
+        records = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual(
+            [(record["receiver_phonenumber"], record["call_status"]) for record in records],
+            [(second, None), (mine, None)],
+        )
+
+        # Exports beyond the per-worker cap are pushed back
+        max_active = export_slots.max_active
+        export_slots.max_active = 0
+        try:
+            response = self.client.get(f"{self.base_url}/calllogs/export", headers=headers)
+        finally:
+            export_slots.max_active = max_active
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", response.headers)
+
+    async def register_with_many_numbers(self, count):
+        """
+        Register a user with count + 1 numbers (most added straight to the
+        database) and another user with one number, calling each other.
+        """
+        headers, ids = self.register_with_numbers(["+9779841234567"])
+        _, others = self.register_with_numbers(["+9779841234569"], email="otheruser@example.com")
+        other = others[0]
+        async with self.SessionLocal() as session:
+            owner = await session.get(PhoneNumber, UUID(ids[0]))
+            numbers = [
+                PhoneNumber(
+                    phonenumber_id=uuid4(), number=f"+97798{index:08d}", user_id=owner.user_id
+                )
+                for index in range(count)
+            ]
+            ids += [str(number.phonenumber_id) for number in numbers]
+            session.add_all(numbers)
+            await session.commit()
+
+        await self.add_call_logs(
+            [
+                (ids[0], other, 1, CallType.outgoing),
+                (other, ids[-2], 2, CallType.incoming),
+                (ids[150], ids[250], 3, CallType.outgoing),  # both sides owned
+                (other, other, 4, CallType.outgoing),  # not ours
+                (other, ids[-1], 5, CallType.missed),
+            ]
+        )
+        return headers, ids
+
+    async def test_get_call_logs_of_many_numbers(self):
+        """Test the /calllogs listing of a user with hundreds of numbers."""
+
+        headers, _ = await self.register_with_many_numbers(400)
+
+        hours = []
+        params = {"limit": 2}
+        while True:
+            response = self.client.get(f"{self.base_url}/calllogs", headers=headers, params=params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            hours.extend(
+                datetime.fromisoformat(item["call_start_time"]).hour
+                for item in response.json()["data"]
+            )
+            next_cursor = response.json()["pagination"]["next_cursor"]
+            if not next_cursor:
+                break
+            params = {"limit": 2, "cursor": next_cursor}
+
+        self.assertEqual(hours, [5, 3, 2, 1])
+
+    async def test_export_call_logs_of_many_numbers(self):
+        """Test /calllogs/export streams the calls of a user with hundreds of numbers."""
+
+        headers, ids = await self.register_with_many_numbers(400)
+
+        response = self.client.get(f"{self.base_url}/calllogs/export", headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = list(csv.DictReader(response.text.splitlines()))
+        self.assertEqual(
+            [datetime.fromisoformat(row["call_start_time"]).hour for row in rows], [1, 2, 3, 5]
+        )
+        self.assertEqual(
+            (rows[2]["caller_phonenumber"], rows[2]["receiver_phonenumber"]), (ids[150], ids[250])
+        )
+        self.assertEqual(export_slots.active, 0)
+
+    async def teardown_database(self):
+        # Drop all tables to flush the database
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+
+    def tearDown(self):
+        app.dependency_overrides = {}
+        self.teardown_database()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,15 +1,21 @@
 import unittest
 import asyncio
+import time
 from unittest.mock import patch
 from fastapi.testclient import TestClient
 from fastapi import status
 
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 
-from core.database import Base
+import core.database
+from core.database import Base, get_replica_session_factory, replica_healthy
 from main import app
+from models.user import User
+from middlewares.read_your_writes import PRIMARY_HEADER, primary_window_end, recent_writers
 from api.v1.utils.password import hash_password
+from api.v1.utils.user_cache import user_cache
 
 
 from core.database import get_db
@@ -75,6 +81,30 @@ class TestPonenumberAPI(unittest.IsolatedAsyncioTestCase):
         self.assertIn("number", response.json())
         self.assertIn("phonenumber_id", response.json())
 
+    async def test_create_phonenumber_already_registered(self):
+        """Test the /phonenumbers endpoint rejects an already registered number."""
+
+        payload = {
+            "email": "testuser@example.com",
+            "password": "securepassword",
+        }
+        self.client.post(f"{self.base_url}/auth/register", json=payload)
+        token_response = self.client.post(f"{self.base_url}/auth/token", json=payload)
+        headers = {"Authorization": f"Bearer {token_response.json()["access_token"]}"}
+        req_data = {"number": "+9779841234567"}
+
+        self.client.post(f"{self.base_url}/phonenumbers", headers=headers, json=req_data)
+        response = self.client.post(
+            f"{self.base_url}/phonenumbers", headers=headers, json=req_data
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()["detail"], "Number already registered!")
+
+        # the rejected insert must not bump the counter
+        response = self.client.get(f"{self.base_url}/phonenumbers", headers=headers)
+        self.assertEqual(response.json()["pagination"]["total"], 1)
+
     @patch("api.v1.utils.password.hash_password", side_effect=hash_password)
     async def test_retrieve_phonenumber_success(self, mock_hash_password):
         """Test the /phonenumbers endpoint for successful registration."""
@@ -103,6 +133,318 @@ class TestPonenumberAPI(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIsInstance(response.json()["data"], list)
         self.assertIn("pagination", response.json().keys())
+        self.assertEqual(response.json()["pagination"]["total"], 1)
+
+    async def test_retrieve_phonenumber_user_served_from_cache(self):
+        """Repeated authenticated requests resolve the user from the cache."""
+
+        payload = {
+            "email": "testuser@example.com",
+            "password": "securepassword",
+        }
+        self.client.post(f"{self.base_url}/auth/register", json=payload)
+        token_response = self.client.post(f"{self.base_url}/auth/token", json=payload)
+        headers = {"Authorization": f"Bearer {token_response.json()["access_token"]}"}
+
+        self.client.post(
+            f"{self.base_url}/phonenumbers", headers=headers, json={"number": "+9779841234567"}
+        )
+        hits = user_cache.stats()["hits"]
+
+        response = self.client.get(f"{self.base_url}/phonenumbers", headers=headers)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(user_cache.stats()["hits"], hits + 1)
+
+        # Password hashes are never kept in the cache
+        for _, snapshot in user_cache._data.values():
+            self.assertNotIn("password", snapshot)
+
+    async def test_retrieve_phonenumber_read_replica_routing(self):
+        """Listings read from the replica, except right after a write or while it is down."""
+
+        # An empty replica, i.e. one lagging behind everything below
+        replica_engine = create_async_engine(DATABASE_URL, echo=False)
+        async with replica_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        replica_session = sessionmaker(bind=replica_engine, class_=AsyncSession)
+        app.dependency_overrides[get_replica_session_factory] = lambda: replica_session
+
+        payload = {
+            "email": "testuser@example.com",
+            "password": "securepassword",
+        }
+        self.client.post(f"{self.base_url}/auth/register", json=payload)
+        token_response = self.client.post(f"{self.base_url}/auth/token", json=payload)
+        headers = {"Authorization": f"Bearer {token_response.json()["access_token"]}"}
+        response = self.client.post(
+            f"{self.base_url}/phonenumbers", headers=headers, json={"number": "+9779841234567"}
+        )
+        signed = response.headers[PRIMARY_HEADER]
+
+        # Read-your-writes: the new number is visible right away
+        response = self.client.get(f"{self.base_url}/phonenumbers", headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()["data"]), 1)
+
+        # Through another worker the signed cookie, or the header echoed by
+        # clients without cookies, answers without a lookup: clearing the
+        # window on the user row changes nothing
+        async with self.SessionLocal() as session:
+            await session.execute(update(User).values(primary_until=None))
+            await session.commit()
+        recent_writers.clear()
+        user_cache.clear()
+        response = self.client.get(f"{self.base_url}/phonenumbers", headers=headers)
+        self.assertEqual(len(response.json()["data"]), 1)
+        self.client.cookies.clear()
+        response = self.client.get(
+            f"{self.base_url}/phonenumbers", headers={**headers, PRIMARY_HEADER: signed}
+        )
+        self.assertEqual(len(response.json()["data"]), 1)
+
+        # Forged values are ignored, clients carrying nothing valid are looked
+        # up on the primary: the window is over, reads go to the replica (the
+        # user, missing there, is still resolved on the primary)
+        forged = f"{time.time() + 60:.3f}:{time.time() + 60:.3f}:{'0' * 32}"
+        response = self.client.get(
+            f"{self.base_url}/phonenumbers", headers={**headers, PRIMARY_HEADER: forged}
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        # The looked up answer is signed into the response, the next reads skip
+        # the lookup
+        self.assertIn(PRIMARY_HEADER, response.headers)
+        async with self.SessionLocal() as session:
+            await session.execute(update(User).values(primary_until=primary_window_end()))
+            await session.commit()
+        response = self.client.get(f"{self.base_url}/phonenumbers", headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertNotIn(PRIMARY_HEADER, response.headers)
+
+        # Without the cookie, the (new) window on the user row is found
+        self.client.cookies.clear()
+        response = self.client.get(f"{self.base_url}/phonenumbers", headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        async with self.SessionLocal() as session:
+            await session.execute(update(User).values(primary_until=None))
+            await session.commit()
+        self.client.cookies.clear()
+
+        # An unreachable replica is skipped in favour of the primary
+        broken_engine = create_async_engine("sqlite+aiosqlite:////nonexistent/replica.db")
+        app.dependency_overrides[get_replica_session_factory] = lambda: sessionmaker(
+            bind=broken_engine, class_=AsyncSession
+        )
+        try:
+            response = self.client.get(f"{self.base_url}/phonenumbers", headers=headers)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertFalse(replica_healthy())
+        finally:
+            core.database._replica_retry_at = 0.0
+
+    async def test_retrieve_phonenumber_conditional_get(self):
+        """Listings carry an ETag, unchanged listings are answered with 304."""
+
+        payload = {
+            "email": "testuser@example.com",
+            "password": "securepassword",
+        }
+        self.client.post(f"{self.base_url}/auth/register", json=payload)
+        token_response = self.client.post(f"{self.base_url}/auth/token", json=payload)
+        headers = {"Authorization": f"Bearer {token_response.json()["access_token"]}"}
+        self.client.post(
+            f"{self.base_url}/phonenumbers", headers=headers, json={"number": "+9779841234567"}
+        )
+
+        response = self.client.get(f"{self.base_url}/phonenumbers", headers=headers)
+        etag = response.headers["etag"]
+        self.assertEqual(response.headers["cache-control"], "private, no-cache")
+        self.assertEqual(response.headers["vary"], "Authorization")
+
+        # The listing query does not run for a current ETag
+        with patch("api.v1.endpoints.phonenumber.paginate_query") as paginate:
+            response = self.client.get(
+                f"{self.base_url}/phonenumbers", headers={**headers, "If-None-Match": etag}
+            )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.headers["etag"], etag)
+        paginate.assert_not_called()
+
+        # Other pages and new numbers change the ETag
+        response = self.client.get(
+            f"{self.base_url}/phonenumbers",
+            headers={**headers, "If-None-Match": etag},
+            params={"limit": 5},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.client.post(
+            f"{self.base_url}/phonenumbers", headers=headers, json={"number": "+9779841234568"}
+        )
+        response = self.client.get(
+            f"{self.base_url}/phonenumbers", headers={**headers, "If-None-Match": f"W/{etag}"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()["data"]), 2)
+        self.assertNotEqual(response.headers["etag"], etag)
+
+    async def test_retrieve_phonenumber_cursor_pagination(self):
+        """Test walking the /phonenumbers listing with keyset cursors."""
+
+        payload = {
+            "email": "testuser@example.com",
+            "password": "securepassword",
+        }
+
+        # register
+        self.client.post(f"{self.base_url}/auth/register", json=payload)
+
+        # get token
+        token_response = self.client.post(f"{self.base_url}/auth/token", json=payload)
+
+        headers = {"Authorization": f"Bearer {token_response.json()["access_token"]}"}
+
+        # post numbers
+        numbers = [f"+97798412345{i:02d}" for i in range(5)]
+        for number in numbers:
+            self.client.post(
+                f"{self.base_url}/phonenumbers", headers=headers, json={"number": number}
+            )
+
+        # walk forward two at a time
+        seen = []
+        pages = []
+        params = {"mode": "cursor", "limit": 2, "include_total": True}
+        while True:
+            response = self.client.get(
+                f"{self.base_url}/phonenumbers", headers=headers, params=params
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append(response.json())
+            seen.extend(item["number"] for item in response.json()["data"])
+
+            next_cursor = response.json()["pagination"]["next_cursor"]
+            if not next_cursor:
+                break
+            params = {"cursor": next_cursor, "limit": 2}
+
+        self.assertEqual(sorted(seen), sorted(numbers))
+        self.assertEqual(len(pages), 3)
+        self.assertEqual(pages[0]["pagination"]["total"], 5)
+        self.assertIsNone(pages[0]["pagination"]["prev_cursor"])
+
+        # step back from the last page
+        response = self.client.get(
+            f"{self.base_url}/phonenumbers",
+            headers=headers,
+            params={"cursor": pages[-1]["pagination"]["prev_cursor"], "limit": 2},
+        )
+        self.assertEqual(response.json()["data"], pages[1]["data"])
+
+    async def test_retrieve_phonenumber_invalid_cursor(self):
+        """Test the /phonenumbers endpoint rejects malformed cursors."""
+
+        payload = {
+            "email": "testuser@example.com",
+            "password": "securepassword",
+        }
+        self.client.post(f"{self.base_url}/auth/register", json=payload)
+        token_response = self.client.post(f"{self.base_url}/auth/token", json=payload)
+        headers = {"Authorization": f"Bearer {token_response.json()["access_token"]}"}
+
+        response = self.client.get(
+            f"{self.base_url}/phonenumbers",
+            headers=headers,
+            params={"cursor": "not-a-cursor"},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def test_bulk_create_phonenumber_json(self):
+        """Test the /phonenumbers/bulk endpoint reports every row of a JSON upload."""
+
+        payload = {
+            "email": "testuser@example.com",
+            "password": "securepassword",
+        }
+        self.client.post(f"{self.base_url}/auth/register", json=payload)
+        token_response = self.client.post(f"{self.base_url}/auth/token", json=payload)
+        headers = {"Authorization": f"Bearer {token_response.json()["access_token"]}"}
+
+        # already registered before the upload
+        self.client.post(
+            f"{self.base_url}/phonenumbers", headers=headers, json={"number": "+9779841234567"}
+        )
+
+        upload = [
+            "+9779841234500",
+            {"number": "+9779841234501"},
+            "not-a-number",
+            "+9779841234567",
+            "+977 984-1234500",
+            42,
+        ]
+        response = self.client.post(
+            f"{self.base_url}/phonenumbers/bulk", headers=headers, json=upload
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        report = response.json()
+        self.assertEqual(
+            (report["created"], report["duplicate"], report["invalid"]), (2, 2, 2)
+        )
+        self.assertEqual(
+            [result["status"] for result in report["results"]],
+            ["created", "created", "invalid", "duplicate", "duplicate", "invalid"],
+        )
+        self.assertIsNotNone(report["results"][0]["phonenumber_id"])
+
+        response = self.client.get(f"{self.base_url}/phonenumbers", headers=headers)
+        self.assertEqual(response.json()["pagination"]["total"], 3)
+
+    async def test_bulk_create_phonenumber_streamed_csv_and_ndjson(self):
+        """Test the /phonenumbers/bulk endpoint with CSV and NDJSON uploads."""
+
+        payload = {
+            "email": "testuser@example.com",
+            "password": "securepassword",
+        }
+        self.client.post(f"{self.base_url}/auth/register", json=payload)
+        token_response = self.client.post(f"{self.base_url}/auth/token", json=payload)
+        headers = {"Authorization": f"Bearer {token_response.json()["access_token"]}"}
+
+        csv_upload = "label,number\r\nhome,+9779841234500\r\nwork,+9779841234501\r\n"
+        response = self.client.post(
+            f"{self.base_url}/phonenumbers/bulk",
+            headers={**headers, "Content-Type": "text/csv"},
+            content=(line.encode() for line in csv_upload.splitlines(keepends=True)),
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["created"], 2)
+
+        ndjson_upload = '"+9779841234501"\n{"number": "+9779841234502"}\n{oops\n'
+        response = self.client.post(
+            f"{self.base_url}/phonenumbers/bulk",
+            headers={**headers, "Content-Type": "application/x-ndjson"},
+            params={"report": "errors"},
+            content=ndjson_upload,
+        )
+        report = response.json()
+        self.assertEqual(
+            (report["created"], report["duplicate"], report["invalid"]), (1, 1, 1)
+        )
+        self.assertEqual(
+            [(result["row"], result["status"]) for result in report["results"]],
+            [(1, "duplicate"), (3, "invalid")],
+        )
+
+        response = self.client.post(
+            f"{self.base_url}/phonenumbers/bulk",
+            headers={**headers, "Content-Type": "text/plain"},
+            content="+9779841234503",
+        )
+        self.assertEqual(response.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
 
     async def teardown_database(self):
         # Drop all tables to flush the database
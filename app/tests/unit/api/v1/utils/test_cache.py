@@ -0,0 +1,56 @@
+import unittest
+from unittest.mock import patch
+
+from api.v1.utils.cache import TTLCache
+
+
+class TestTTLCache(unittest.TestCase):
+    def test_get_counts_hits_and_misses(self):
+        """Lookups are counted as hits or misses."""
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("key", "value")
+
+        self.assertEqual(cache.get("key"), "value")
+        self.assertIsNone(cache.get("missing"))
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_expired_entries_are_not_served(self):
+        """Entries are dropped once their TTL has passed."""
+        cache = TTLCache(maxsize=10, ttl=60)
+
+        with patch("api.v1.utils.cache.time.monotonic", return_value=100.0):
+            cache.set("key", "value")
+            cache.set("short", "value", ttl=5)
+
+        with patch("api.v1.utils.cache.time.monotonic", return_value=110.0):
+            self.assertEqual(cache.get("key"), "value")
+            self.assertIsNone(cache.get("short"))
+
+        with patch("api.v1.utils.cache.time.monotonic", return_value=160.0):
+            self.assertIsNone(cache.get("key"))
+
+        self.assertEqual(cache.stats()["size"], 0)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """The cache never grows beyond maxsize."""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_zero_maxsize_disables_cache(self):
+        """A maxsize of 0 never stores anything."""
+        cache = TTLCache(maxsize=0, ttl=60)
+        cache.set("key", "value")
+
+        self.assertIsNone(cache.get("key"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import asyncio
+import unittest
+
+from core.limits import ConcurrencyLimit
+from api.v1.utils.call_log_export import ExportResponse
+
+
+class TestExportResponse(unittest.IsolatedAsyncioTestCase):
+    async def send_to(self, response, receive, send_delay=0):
+        sent = []
+
+        async def send(message):
+            await asyncio.sleep(send_delay)
+            sent.append(message)
+
+        scope = {"type": "http", "asgi": {"version": "3.0", "spec_version": "2.3"}}
+        await response(scope, receive, send)
+        return sent
+
+    async def test_slot_released_when_client_disconnects_first(self):
+        """The slot is released even if the body iterator never starts."""
+        slots = ConcurrencyLimit("export", 1)
+        self.assertTrue(slots.try_acquire())
+        started = False
+
+        async def body():
+            nonlocal started
+            started = True
+            yield b"never sent"
+
+        async def receive():
+            return {"type": "http.disconnect"}
+
+        # The disconnect is seen while the response headers are being sent
+        response = ExportResponse(body(), on_close=slots.release)
+        await self.send_to(response, receive, send_delay=0.1)
+
+        self.assertFalse(started)
+        self.assertEqual(slots.active, 0)
+
+    async def test_slot_released_after_streaming(self):
+        slots = ConcurrencyLimit("export", 1)
+        self.assertTrue(slots.try_acquire())
+
+        async def body():
+            yield b"a,b\n"
+
+        async def receive():
+            # The client stays connected
+            await asyncio.sleep(3600)
+
+        response = ExportResponse(body(), on_close=slots.release)
+        sent = await self.send_to(response, receive)
+
+        self.assertEqual(sent[1]["body"], b"a,b\n")
+        self.assertEqual(slots.active, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import hashlib
+import time
+import unittest
+from unittest.mock import patch
+
+from fastapi import HTTPException
+from jose import jwt
+
+from api.v1.utils.jwt import create_token, token_cache, verify_token
+
+
+class TestVerifyTokenCache(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        token_cache.clear()
+
+    async def test_verified_tokens_are_cached(self):
+        """A token's signature is verified once, later calls hit the cache."""
+        token = await create_token({"sub": "testuser@example.com"}, "access")
+        hits = token_cache.stats()["hits"]
+
+        with patch("api.v1.utils.jwt.jwt.decode", wraps=jwt.decode) as decode:
+            first = await verify_token(token)
+            first["sub"] = "changed"
+            second = await verify_token(token)
+
+        self.assertEqual(decode.call_count, 1)
+        self.assertEqual(second["sub"], "testuser@example.com")
+        self.assertEqual(token_cache.stats()["hits"], hits + 1)
+
+    async def test_token_type_is_checked_on_cache_hits(self):
+        """A cached refresh token is still rejected as an access token."""
+        token = await create_token({"sub": "testuser@example.com"}, "refresh")
+        await verify_token(token, "refresh")
+
+        with self.assertRaises(HTTPException):
+            await verify_token(token, "access")
+
+    async def test_expired_entries_are_not_served(self):
+        """Cached payloads past their exp are verified again (and rejected)."""
+        token = "not-a-valid-token"
+        token_cache.set(
+            hashlib.sha256(token.encode()).digest(),
+            {"sub": "testuser@example.com", "type": "access", "exp": time.time() - 1},
+        )
+
+        with self.assertRaises(HTTPException):
+            await verify_token(token)
+
+    async def test_invalid_tokens_are_not_cached(self):
+        """Tokens failing verification never enter the cache."""
+        token = await create_token({"sub": "testuser@example.com"}, "access")
+
+        with self.assertRaises(HTTPException):
+            await verify_token(token[:-2] + "xx")
+        self.assertEqual(token_cache.stats()["size"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
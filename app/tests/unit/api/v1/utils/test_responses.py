@@ -0,0 +1,41 @@
+import unittest
+from datetime import datetime
+from uuid import uuid4
+
+from models.call_log import CallLog, CallType
+from schemas.call_log import CallLogRead
+from schemas.pagination import PaginatedResponse, PaginationBase
+from api.v1.utils.responses import fast_page_response
+
+
+class TestFastPageResponse(unittest.TestCase):
+    def test_matches_response_model_serialization(self):
+        """The orjson rendering is byte for byte what response_model would send."""
+        items = [
+            CallLog(
+                call_log_id=uuid4(),
+                caller_phonenumber=uuid4(),
+                receiver_phonenumber=uuid4(),
+                call_start_time=datetime(2024, 12, 11, 12, 0, second),
+                call_end_time=None,
+                call_duration=12.5 if second else None,
+                call_type=CallType.missed,
+                call_status=None,
+            )
+            for second in range(3)
+        ]
+        page = PaginatedResponse(
+            data=items, pagination=PaginationBase(limit=3, next_cursor="abc")
+        )
+
+        expected = PaginatedResponse[CallLogRead].model_validate(
+            {"data": items, "pagination": page.pagination}, from_attributes=True
+        )
+        response = fast_page_response(page, CallLogRead, headers={"ETag": '"v1"'})
+
+        self.assertEqual(response.body, expected.model_dump_json().encode())
+        self.assertEqual(response.headers["etag"], '"v1"')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import time
+import unittest
+import uuid
+from unittest.mock import patch
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from core.database import Base
+from api.v1.utils.bloom import BloomFilter
+from models.revoked_token import RevokedToken
+from api.v1.utils.revocation import RevocationFilter, revoke_token
+
+DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+
+
+class TestBloomFilter(unittest.TestCase):
+    def test_no_false_negatives_and_bounded_false_positives(self):
+        """Added items are always found, others rarely (about error_rate)."""
+        bloom = BloomFilter(10000, 0.01)
+        added = [uuid.uuid4().hex for _ in range(10000)]
+        for item in added:
+            bloom.add(item)
+
+        self.assertTrue(all(item in bloom for item in added))
+        false_positives = sum(uuid.uuid4().hex in bloom for _ in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+class TestRevocationFilter(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.engine = create_async_engine(DATABASE_URL, echo=False)
+        self.SessionLocal = sessionmaker(bind=self.engine, class_=AsyncSession)
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+
+    async def test_only_probable_hits_query_the_database(self):
+        """Unrevoked tokens are answered by the filter, revoked ones are confirmed."""
+        payload = {"jti": uuid.uuid4().hex, "type": "refresh", "exp": time.time() + 60}
+        async with self.SessionLocal() as session:
+            await revoke_token(session, payload)
+            await session.commit()
+
+        # A filter of another worker picks the revocation up on its rebuild
+        other_worker = RevocationFilter(1000, 0.001, refresh_seconds=60)
+        async with self.SessionLocal() as session:
+            await other_worker.rebuild(session)
+            self.assertTrue(await other_worker.is_revoked(session, payload["jti"]))
+            for _ in range(100):
+                self.assertFalse(await other_worker.is_revoked(session, uuid.uuid4().hex))
+
+        stats = other_worker.stats()
+        self.assertEqual(stats["rebuilds"], 1)
+        self.assertEqual(stats["confirmed"], 1)
+        self.assertLess(stats["db_lookups"], 5)
+
+    async def test_stale_filters_are_not_rebuilt_by_checks(self):
+        """Without a fresh filter checks are looked up, requests never rebuild it."""
+        jti = uuid.uuid4().hex
+        worker = RevocationFilter(1000, 0.001, refresh_seconds=60)
+        async with self.SessionLocal() as session:
+            await worker.rebuild(session)
+            await revoke_token(session, {"jti": jti, "type": "access", "exp": time.time() + 60})
+            await session.commit()
+
+            # Revoked through another worker after the rebuild, the filter is stale
+            worker.filter = BloomFilter(1000, 0.001)
+            worker.built_at -= 60
+            self.assertTrue(await worker.is_revoked(session, jti))
+            self.assertFalse(await worker.is_revoked(session, uuid.uuid4().hex))
+
+        stats = worker.stats()
+        self.assertEqual(stats["rebuilds"], 1)
+        self.assertEqual(stats["db_lookups"], 2)
+
+    async def test_rebuild_deletes_expired_revocations(self):
+        """Revocations of expired tokens are deleted, the others are kept."""
+        expired, valid = uuid.uuid4().hex, uuid.uuid4().hex
+        worker = RevocationFilter(1000, 0.001, refresh_seconds=60)
+        async with self.SessionLocal() as session:
+            await revoke_token(session, {"jti": expired, "type": "access", "exp": time.time() - 1})
+            await revoke_token(session, {"jti": valid, "type": "access", "exp": time.time() + 60})
+            await session.commit()
+
+            await worker.rebuild(session)
+
+            self.assertEqual(await session.scalar(select(func.count(RevokedToken.jti))), 1)
+            self.assertTrue(await worker.is_revoked(session, valid))
+        self.assertEqual(worker.stats()["purged"], 1)
+
+    async def test_tokens_without_jti_are_not_revoked(self):
+        """Tokens issued before jtis were embedded cannot be revoked."""
+        async with self.SessionLocal() as session:
+            self.assertFalse(await revoke_token(session, {"type": "access", "exp": time.time()}))
+
+    async def test_local_revocations_survive_a_rebuild(self):
+        """A revocation made while a rebuild loads is kept in the new filter."""
+        jti = uuid.uuid4().hex
+        worker = RevocationFilter(1000, 0.001, refresh_seconds=60)
+        async with self.SessionLocal() as session:
+            load_revocations = session.scalars
+
+            # The token is revoked (and not committed yet) while the rebuild loads
+            async def scalars(query):
+                worker.add(jti)
+                return await load_revocations(query)
+
+            with patch.object(session, "scalars", scalars):
+                await worker.rebuild(session)
+
+        self.assertIn(jti, worker.filter)
@@ -0,0 +1,107 @@
+import unittest
+from datetime import datetime
+from uuid import uuid4
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from core.database import Base
+from models.user import User
+from models.phonenumber import PhoneNumber
+from models.call_log import CallLog, CallType
+from models.call_log_rollup import CallLogHourlyRollup
+from commands.backfill_call_log_rollups import backfill_call_log_rollups
+from api.v1.utils.call_log_rollups import rollup_lock_keys
+
+
+DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+
+
+class TestBackfillCallLogRollups(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        # Create an in-memory SQLite database
+        self.engine = create_async_engine(DATABASE_URL, echo=False)
+        self.SessionLocal = sessionmaker(
+            bind=self.engine, class_=AsyncSession, expire_on_commit=False
+        )
+
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    async def test_backfill_is_idempotent(self):
+        """Rollups are rebuilt from call_logs, re-running does not double count."""
+        user = User(user_id=uuid4(), email="testuser@example.com")
+        first = PhoneNumber(phonenumber_id=uuid4(), user_id=user.user_id, number="+9779841234567")
+        second = PhoneNumber(phonenumber_id=uuid4(), user_id=user.user_id, number="+9779841234568")
+
+        async with self.SessionLocal() as session:
+            session.add(user)
+            await session.flush()
+            session.add_all([first, second])
+            await session.flush()
+            session.add_all(
+                CallLog(
+                    caller_phonenumber=first.phonenumber_id,
+                    receiver_phonenumber=second.phonenumber_id,
+                    call_start_time=datetime(2024, 12, 11, 10, minute),
+                    call_duration=30,
+                    call_type=CallType.outgoing,
+                )
+                for minute in (5, 40)
+            )
+            # A stale rollup the backfill must replace
+            session.add(
+                CallLogHourlyRollup(
+                    phonenumber_id=first.phonenumber_id,
+                    bucket_start=datetime(2024, 12, 11, 10),
+                    direction="outgoing",
+                    call_type="outgoing",
+                    call_status="",
+                    call_count=99,
+                    total_duration=0,
+                )
+            )
+            await session.commit()
+
+        for _ in range(2):
+            result = await backfill_call_log_rollups(
+                self.SessionLocal, start=datetime(2024, 12, 11), batch_size=1
+            )
+            self.assertEqual(result, {"numbers": 2, "scanned": 4, "written": 2})
+
+        async with self.SessionLocal() as session:
+            rollups = (
+                await session.execute(
+                    select(
+                        CallLogHourlyRollup.phonenumber_id,
+                        CallLogHourlyRollup.direction,
+                        CallLogHourlyRollup.call_count,
+                        CallLogHourlyRollup.total_duration,
+                    )
+                )
+            ).all()
+        self.assertCountEqual(
+            rollups,
+            [
+                (first.phonenumber_id, "outgoing", 2, 60.0),
+                (second.phonenumber_id, "incoming", 2, 60.0),
+            ],
+        )
+
+    def test_rollup_lock_keys_are_ordered_per_number(self):
+        """Flushes and rebuilds lock the same per-number keys, in one order."""
+        phonenumber_ids = [uuid4() for _ in range(50)]
+
+        keys = rollup_lock_keys(phonenumber_ids + phonenumber_ids[:10])
+
+        self.assertEqual(keys, sorted(set(keys)))
+        self.assertEqual(keys, rollup_lock_keys(reversed(phonenumber_ids)))
+        self.assertTrue(all(-(2**31) <= key < 2**31 for key in keys))
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+from unittest.mock import patch
+from uuid import uuid4
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from core.database import Base
+from models.user import User
+from models.phonenumber import PhoneNumber
+from api.v1.utils.counters import increment_phonenumber_count
+from commands.reconcile_phonenumber_counts import reconcile_phonenumber_counts
+
+
+DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+
+
+class TestReconcilePhonenumberCounts(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        # Create an in-memory SQLite database
+        self.engine = create_async_engine(DATABASE_URL, echo=False)
+        self.SessionLocal = sessionmaker(
+            bind=self.engine, class_=AsyncSession, expire_on_commit=False
+        )
+
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    async def test_reconcile_repairs_drifted_counters(self):
+        """Counters that drifted are recomputed, correct ones are left alone."""
+        drifted = User(user_id=uuid4(), email="drifted@example.com", phonenumber_count=7)
+        correct = User(user_id=uuid4(), email="correct@example.com", phonenumber_count=1)
+
+        async with self.SessionLocal() as session:
+            session.add_all([drifted, correct])
+            await session.flush()
+            session.add_all(
+                [
+                    PhoneNumber(user_id=drifted.user_id, number="+9779841234567"),
+                    PhoneNumber(user_id=drifted.user_id, number="+9779841234568"),
+                    PhoneNumber(user_id=correct.user_id, number="+9779841234569"),
+                ]
+            )
+            await session.commit()
+
+        result = await reconcile_phonenumber_counts(self.SessionLocal, batch_size=1)
+
+        self.assertEqual(result, {"scanned": 2, "repaired": 1})
+
+        async with self.SessionLocal() as session:
+            counts = dict(
+                (await session.execute(select(User.email, User.phonenumber_count))).all()
+            )
+        self.assertEqual(
+            counts, {"drifted@example.com": 2, "correct@example.com": 1}
+        )
+
+    async def test_reconcile_counts_phonenumbers_created_during_a_batch(self):
+        """A phone number created while its user's batch is locked is not lost."""
+        user = User(user_id=uuid4(), email="busy@example.com", phonenumber_count=5)
+
+        async with self.SessionLocal() as session:
+            session.add(user)
+            await session.flush()
+            session.add(PhoneNumber(user_id=user.user_id, number="+9779841234567"))
+            await session.commit()
+
+        async def create_phonenumber():
+            async with self.SessionLocal() as session:
+                session.add(PhoneNumber(user_id=user.user_id, number="+9779841234568"))
+                await increment_phonenumber_count(session, user.user_id)
+                await session.commit()
+
+        # The create commits right after the reconcile locked the batch
+        execute = AsyncSession.execute
+        created = []
+
+        async def execute_then_create(session, statement, *args, **kwargs):
+            result = await execute(session, statement, *args, **kwargs)
+            if getattr(statement, "_for_update_arg", None) is not None and not created:
+                created.append(statement)
+                await create_phonenumber()
+            return result
+
+        with patch.object(AsyncSession, "execute", execute_then_create):
+            result = await reconcile_phonenumber_counts(self.SessionLocal)
+
+        self.assertEqual(len(created), 1)
+        self.assertEqual(result, {"scanned": 1, "repaired": 1})
+        async with self.SessionLocal() as session:
+            count = await session.scalar(
+                select(User.phonenumber_count).where(User.user_id == user.user_id)
+            )
+        self.assertEqual(count, 2)
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+
+
+if __name__ == "__main__":
+    unittest.main()
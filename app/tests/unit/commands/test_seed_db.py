@@ -0,0 +1,101 @@
+import unittest
+from datetime import datetime
+
+import phonenumbers
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from core.database import Base
+from models.user import User
+from models.phonenumber import PhoneNumber
+from models.call_log import CallLog
+from models.call_log_rollup import CallLogHourlyRollup
+from commands.seed_db import generate_call_logs, seed_db, seeded_number
+
+
+DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+
+END = datetime(2024, 12, 1)
+
+
+class TestSeedDb(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        # Create an in-memory SQLite database
+        self.engine = create_async_engine(DATABASE_URL, echo=False)
+        self.SessionLocal = sessionmaker(
+            bind=self.engine, class_=AsyncSession, expire_on_commit=False
+        )
+
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+
+    async def test_seeded_rows_are_referentially_valid(self):
+        """Counters and rollups match the generated calls."""
+        created = await seed_db(
+            self.SessionLocal,
+            users=5,
+            phonenumbers=40,
+            call_logs=300,
+            seed=7,
+            end=END,
+            chunk_size=64,
+            workers=2,
+            processes=0,
+        )
+        self.assertEqual(created, {"users": 5, "phonenumbers": 40, "call_logs": 300})
+
+        async with self.SessionLocal() as session:
+            orphans = await session.scalar(
+                select(func.count())
+                .select_from(CallLog)
+                .outerjoin(PhoneNumber, PhoneNumber.phonenumber_id == CallLog.receiver_phonenumber)
+                .where(PhoneNumber.phonenumber_id.is_(None))
+            )
+            self.assertEqual(orphans, 0)
+            self.assertEqual(
+                await session.scalar(
+                    select(func.count()).select_from(User).where(User.created_at.is_(None))
+                ),
+                0,
+            )
+            self.assertEqual(await session.scalar(select(func.sum(User.phonenumber_count))), 40)
+            # Every call counts once per side
+            self.assertEqual(
+                await session.scalar(select(func.sum(CallLogHourlyRollup.call_count))), 600
+            )
+
+    def test_generation_is_deterministic_and_skewed(self):
+        """Chunks are reproducible from the seed and favour hot numbers."""
+        first = generate_call_logs(7, 0, 2000, 1000, 3.0, END, 30)
+        self.assertEqual(first, generate_call_logs(7, 0, 2000, 1000, 3.0, END, 30))
+        self.assertNotEqual(first, generate_call_logs(8, 0, 2000, 1000, 3.0, END, 30))
+
+        callers = [row[1] for row in first]
+        hottest = max(set(callers), key=callers.count)
+        self.assertGreater(callers.count(hottest), 20)  # 2 expected if uniform
+
+    def test_generation_does_not_depend_on_the_chunk_size(self):
+        """Rows are the same however the range is split into chunks."""
+        whole = generate_call_logs(7, 0, 2500, 1000, 3.0, END, 30)
+        split = [
+            row
+            for start, stop in ((0, 700), (700, 1000), (1000, 2345), (2345, 2500))
+            for row in generate_call_logs(7, start, stop, 1000, 3.0, END, 30)
+        ]
+        self.assertEqual(split, whole)
+
+    def test_numbers_are_valid_and_distinct(self):
+        numbers = [seeded_number(7, index) for index in range(2000)]
+
+        self.assertEqual(len(set(numbers)), len(numbers))
+        for number in numbers[:200]:
+            self.assertTrue(phonenumbers.is_valid_number(phonenumbers.parse(number)))
+            self.assertLessEqual(len(number), 15)
+
+
+if __name__ == "__main__":
+    unittest.main()
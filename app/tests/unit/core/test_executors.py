@@ -0,0 +1,68 @@
+import asyncio
+import operator
+import threading
+import unittest
+
+from core.executors import BoundedExecutor, ExecutorSaturatedError
+
+
+class TestBoundedExecutor(unittest.IsolatedAsyncioTestCase):
+    async def test_run_returns_result_from_thread_pool(self):
+        """Jobs run on the pool and their result is awaited."""
+        executor = BoundedExecutor(name="test", kind="thread", max_workers=2)
+
+        self.assertEqual(await executor.run(operator.add, 2, 3), 5)
+        executor.shutdown()
+
+    async def test_run_returns_result_from_process_pool(self):
+        """Process pools run picklable module level functions."""
+        executor = BoundedExecutor(name="test", kind="process", max_workers=1)
+
+        self.assertEqual(await executor.run(operator.mul, 6, 7), 42)
+        executor.shutdown()
+
+    async def test_run_rejects_when_saturated(self):
+        """Jobs beyond max_pending fail fast instead of queueing."""
+        executor = BoundedExecutor(name="test", kind="thread", max_workers=1, max_pending=1)
+        release = threading.Event()
+
+        blocked = asyncio.create_task(executor.run(release.wait, 5))
+        await asyncio.sleep(0.01)
+
+        with self.assertRaises(ExecutorSaturatedError):
+            await executor.run(operator.add, 1, 1)
+
+        release.set()
+        await blocked
+        self.assertEqual(executor.stats()["rejected"], 1)
+        self.assertEqual(executor.stats()["pending"], 0)
+        executor.shutdown()
+
+    async def test_cancelled_callers_count_until_their_job_ends(self):
+        """A job keeps its slot while it runs, even once its caller is cancelled."""
+        executor = BoundedExecutor(name="test", kind="thread", max_workers=1, max_pending=1)
+        release = threading.Event()
+
+        blocked = asyncio.create_task(executor.run(release.wait, 5))
+        await asyncio.sleep(0.01)
+        blocked.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await blocked
+
+        # The job still runs on the pool, so the executor is still full
+        self.assertEqual(executor.stats()["pending"], 1)
+        with self.assertRaises(ExecutorSaturatedError):
+            await executor.run(operator.add, 1, 1)
+
+        release.set()
+        for _ in range(100):
+            if not executor.stats()["pending"]:
+                break
+            await asyncio.sleep(0.01)
+        self.assertEqual(await executor.run(operator.add, 1, 1), 2)
+        self.assertEqual(executor.stats()["pending"], 0)
+        executor.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
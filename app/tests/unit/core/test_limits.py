@@ -0,0 +1,45 @@
+import unittest
+
+from core.limits import AdaptiveConcurrencyLimit
+
+
+class TestAdaptiveConcurrencyLimit(unittest.TestCase):
+    def create_limit(self, **options) -> AdaptiveConcurrencyLimit:
+        options = {"initial": 20, "min_limit": 5, "max_limit": 40, "target_delay": 0.05, **options}
+        return AdaptiveConcurrencyLimit("test", **options)
+
+    def test_queueing_shrinks_the_limit_down_to_the_minimum(self):
+        """A delay over target cuts the limit multiplicatively, never below min."""
+        limit = self.create_limit()
+
+        limit.adjust(0.2)
+        self.assertEqual(limit.stats()["limit"], 18)
+
+        for _ in range(50):
+            limit.adjust(0.2)
+        self.assertEqual(limit.stats()["limit"], 5)
+
+    def test_only_a_reached_limit_grows(self):
+        """Without queueing the limit grows, but only when it was in use."""
+        limit = self.create_limit()
+        limit.adjust(0.0)
+        self.assertEqual(limit.stats()["limit"], 20)
+
+        for _ in range(20):
+            self.assertTrue(limit.try_acquire())
+        limit.adjust(0.0)
+        self.assertEqual(limit.stats()["limit"], 24)
+
+    def test_lower_shares_are_rejected_first(self):
+        """A request with a share of 0.5 is rejected once half the limit is used."""
+        limit = self.create_limit(initial=10)
+        for _ in range(5):
+            limit.acquire()
+
+        self.assertFalse(limit.try_acquire(0.5))
+        self.assertTrue(limit.try_acquire(1.0))
+        self.assertEqual(limit.stats()["rejected"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+import asyncio
+import gzip
+import logging
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from core.log_writer import (
+    BLOCK,
+    DROP,
+    BatchingRotatingFileHandler,
+    LogWriter,
+    LogWriterQueueHandler,
+)
+
+
+class TestLogWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.log_path = os.path.join(self.tmp_dir.name, "test.log")
+
+    def make_logger(self, writer: LogWriter) -> logging.Logger:
+        logger = logging.getLogger(f"test-log-writer-{id(writer)}")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        logger.addHandler(LogWriterQueueHandler(writer))
+        return logger
+
+    def test_records_are_written_by_background_thread(self):
+        """Queued records end up in the log file once the writer stops."""
+        handler = BatchingRotatingFileHandler(
+            self.log_path, max_bytes=0, backup_count=0, compress=False
+        )
+        writer = LogWriter(handler, queue_size=100, batch_size=10)
+        writer.start()
+        logger = self.make_logger(writer)
+
+        for i in range(25):
+            logger.info("message %d", i)
+        writer.stop()
+
+        with open(self.log_path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines, [f"message {i}" for i in range(25)])
+        self.assertEqual(writer.stats()["written"], 25)
+        self.assertEqual(writer.stats()["dropped"], 0)
+
+    def test_records_are_dropped_when_queue_is_full(self):
+        """The drop policy discards and counts records instead of blocking."""
+        handler = BatchingRotatingFileHandler(
+            self.log_path, max_bytes=0, backup_count=0, compress=False
+        )
+        # Writer not started, so nothing drains the queue
+        for policy in (DROP, BLOCK):
+            writer = LogWriter(
+                handler, queue_size=2, batch_size=10, policy=policy, block_timeout=0.01
+            )
+            logger = self.make_logger(writer)
+
+            for i in range(5):
+                logger.info("message %d", i)
+
+            self.assertEqual(writer.stats()["queued"], 2)
+            self.assertEqual(writer.stats()["dropped"], 3)
+        handler.close()
+
+    def test_block_policy_never_waits_on_the_event_loop(self):
+        """Records logged from a coroutine are dropped rather than stalling the loop."""
+        handler = BatchingRotatingFileHandler(
+            self.log_path, max_bytes=0, backup_count=0, compress=False
+        )
+        writer = LogWriter(handler, queue_size=1, batch_size=10, policy=BLOCK, block_timeout=5)
+        logger = self.make_logger(writer)
+
+        async def log_from_coroutine():
+            start = time.monotonic()
+            logger.info("queued")
+            logger.info("over the limit")
+            return time.monotonic() - start
+
+        self.assertLess(asyncio.run(log_from_coroutine()), 1)
+        self.assertEqual(writer.stats()["dropped"], 1)
+        handler.close()
+
+    def test_records_after_stop_are_written_synchronously(self):
+        """Handlers left attached after shutdown still write their records."""
+        handler = BatchingRotatingFileHandler(
+            self.log_path, max_bytes=0, backup_count=0, compress=False
+        )
+        writer = LogWriter(handler, queue_size=100, batch_size=10)
+        writer.start()
+        logger = self.make_logger(writer)
+
+        logger.info("before stop")
+        writer.stop()
+        logger.info("after stop")
+
+        # The closed handler does not keep a file open for these records
+        self.assertIsNone(handler.stream)
+
+        with open(self.log_path, encoding="utf-8") as f:
+            self.assertEqual(f.read().splitlines(), ["before stop", "after stop"])
+
+    def test_records_logged_while_stopping_are_not_lost(self):
+        """A record being queued when stop is called is still written."""
+        handler = BatchingRotatingFileHandler(
+            self.log_path, max_bytes=0, backup_count=0, compress=False
+        )
+        writer = LogWriter(handler, queue_size=100, batch_size=10)
+        writer.start()
+        logger = self.make_logger(writer)
+        put_nowait = writer.queue.put_nowait
+        stopping = []
+
+        # stop runs between the put's check of the writer state and the queueing
+        def stop_then_put(record):
+            if not stopping:
+                stopping.append(threading.Thread(target=writer.stop))
+                stopping[0].start()
+                stopping[0].join(0.2)
+            put_nowait(record)
+
+        writer.queue.put_nowait = stop_then_put
+        logger.info("while stopping")
+        stopping[0].join()
+        logger.info("after stop")
+
+        with open(self.log_path, encoding="utf-8") as f:
+            self.assertEqual(f.read().splitlines(), ["while stopping", "after stop"])
+
+    def test_rotated_files_are_compressed(self):
+        """Rotated files are gzipped by the writer thread."""
+        handler = BatchingRotatingFileHandler(
+            self.log_path, max_bytes=64, backup_count=2, compress=True
+        )
+        writer = LogWriter(handler, queue_size=100, batch_size=10)
+        writer.start()
+        logger = self.make_logger(writer)
+
+        for i in range(10):
+            logger.info("a fairly long log message number %d", i)
+        writer.stop()
+
+        rotated = self.log_path + ".1.gz"
+        self.assertTrue(os.path.exists(rotated))
+        with gzip.open(rotated, "rt", encoding="utf-8") as f:
+            self.assertIn("a fairly long log message", f.read())
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,20 @@
+import unittest
+
+from core.metrics import Histogram
+
+
+class TestHistogram(unittest.TestCase):
+    def test_observations_are_counted_cumulatively(self):
+        """Bucket counts include every observation up to their bound."""
+        histogram = Histogram(buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+
+        stats = histogram.stats()
+        self.assertEqual(stats["buckets"], {"0.1": 2, "1.0": 3, "+Inf": 4})
+        self.assertEqual(stats["count"], 4)
+        self.assertAlmostEqual(stats["sum"], 3.65)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+from unittest.mock import patch
+
+from core import phone_validation
+from core.phone_validation import (
+    normalize_phone_number,
+    normalize_phone_numbers_async,
+)
+from core.executors import BoundedExecutor
+
+
+class TestPhoneValidation(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        normalize_phone_number.cache_clear()
+
+    def test_normalize_is_memoized(self):
+        """Repeated raw inputs are served from the cache."""
+        self.assertEqual(normalize_phone_number("+977 984-1234567"), "+9779841234567")
+        self.assertEqual(normalize_phone_number("+977 984-1234567"), "+9779841234567")
+        self.assertIsNone(normalize_phone_number("not-a-number"))
+
+        info = normalize_phone_number.cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 2))
+
+    async def test_batch_runs_on_the_process_pool(self):
+        """Large batches are split across the pool and keep their order."""
+        values = ["+9779841234567", "junk", "+12025550123", "+447912345678"] * 4
+        executor = BoundedExecutor(name="test-validation", kind="process", max_workers=2)
+
+        with patch.object(phone_validation, "validation_executor", executor), patch.object(
+            phone_validation.settings, "PHONENUMBER_POOL_MIN_BATCH", 4
+        ):
+            try:
+                normalized = await normalize_phone_numbers_async(values)
+            finally:
+                executor.shutdown()
+
+        self.assertEqual(
+            normalized,
+            ["+9779841234567", None, "+12025550123", "+447912345678"] * 4,
+        )
+        # Nothing was validated in this process
+        self.assertEqual(normalize_phone_number.cache_info().misses, 0)
+
+    async def test_saturated_pool_falls_back_inline(self):
+        """Slices the pool refuses are validated in the calling process."""
+        values = ["+9779841234567"] * 8
+        executor = BoundedExecutor(name="test-validation", max_workers=2, max_pending=0)
+
+        with patch.object(phone_validation, "validation_executor", executor), patch.object(
+            phone_validation.settings, "PHONENUMBER_POOL_MIN_BATCH", 4
+        ):
+            normalized = await normalize_phone_numbers_async(values)
+
+        self.assertEqual(normalized, ["+9779841234567"] * 8)
+        self.assertEqual(executor.stats()["rejected"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+from core.metrics import Histogram
+from core.prometheus import (
+    COUNTER,
+    GAUGE,
+    HISTOGRAM,
+    MultiprocessStore,
+    add_sample,
+    family,
+    merge_snapshots,
+    render,
+)
+
+
+def worker_metrics(requests: int, latency: float, in_flight: int) -> list:
+    counter = family("http_requests_total", COUNTER, "HTTP requests handled.")
+    add_sample(counter, {"route": "/health"}, requests)
+    histogram = Histogram(buckets=(0.1, 1.0))
+    histogram.observe(latency)
+    durations = family("http_request_duration_seconds", HISTOGRAM, "HTTP request latency.")
+    add_sample(durations, {"route": "/health"}, histogram)
+    gauge = family("http_requests_in_flight", GAUGE, "HTTP requests being handled.")
+    add_sample(gauge, {}, in_flight)
+    return [counter, durations, gauge]
+
+
+class TestMergeSnapshots(unittest.TestCase):
+    def test_counters_and_histograms_are_summed_gauges_kept_per_worker(self):
+        now = time.time()
+        snapshots = [
+            {"pid": 1, "written_at": now, "metrics": worker_metrics(3, 0.05, 2)},
+            {"pid": 2, "written_at": now, "metrics": worker_metrics(4, 0.5, 1)},
+            # An exited worker: counts are kept, its gauge is stale
+            {"pid": 3, "written_at": now - 60, "metrics": worker_metrics(5, 5.0, 7)},
+        ]
+
+        text = render(merge_snapshots(snapshots, stale_after=15))
+
+        self.assertIn('http_requests_total{route="/health"} 12\n', text)
+        self.assertIn('http_request_duration_seconds_bucket{route="/health",le="0.1"} 1\n', text)
+        self.assertIn('http_request_duration_seconds_bucket{route="/health",le="1.0"} 2\n', text)
+        self.assertIn('http_request_duration_seconds_bucket{route="/health",le="+Inf"} 3\n', text)
+        self.assertIn('http_request_duration_seconds_count{route="/health"} 3\n', text)
+        self.assertIn('http_requests_in_flight{pid="1"} 2\n', text)
+        self.assertIn('http_requests_in_flight{pid="2"} 1\n', text)
+        self.assertNotIn('pid="3"', text)
+        self.assertIn("# TYPE http_request_duration_seconds histogram\n", text)
+
+
+class TestMultiprocessStore(unittest.TestCase):
+    def test_snapshots_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = MultiprocessStore(directory, stale_after=15)
+            store.write(worker_metrics(3, 0.05, 2))
+            store.write(worker_metrics(4, 0.05, 2))  # Replaces this worker's snapshot
+
+            text = render(store.merged())
+
+        self.assertIn('http_requests_total{route="/health"} 4\n', text)
+
+    def test_snapshots_of_exited_workers_are_archived(self):
+        """Exited workers leave their counts in one archive, not their own snapshot."""
+        exited = subprocess.Popen([sys.executable, "-c", "pass"])
+        exited.wait()
+
+        with tempfile.TemporaryDirectory() as directory:
+            store = MultiprocessStore(directory, stale_after=15)
+            with open(os.path.join(directory, f"{exited.pid}.json"), "w") as snapshot_file:
+                snapshot = {"pid": exited.pid, "written_at": time.time()}
+                json.dump({**snapshot, "metrics": worker_metrics(5, 5.0, 7)}, snapshot_file)
+            store.write(worker_metrics(3, 0.05, 2))
+
+            first = render(store.merged())
+            second = render(store.merged())
+            files = sorted(os.listdir(directory))
+
+        for text in (first, second):
+            self.assertIn('http_requests_total{route="/health"} 8\n', text)
+            self.assertIn('http_request_duration_seconds_count{route="/health"} 2\n', text)
+            self.assertNotIn(f'pid="{exited.pid}"', text)
+        self.assertEqual(files, sorted(["archive.lock", "archived.json", f"{os.getpid()}.json"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import asyncio
+import unittest
+
+from core.write_buffer import WriteBehindBuffer
+
+
+class TestWriteBehindBuffer(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.batches = []
+
+        async def flush_fn(rows):
+            self.batches.append(list(rows))
+
+        self.flush_fn = flush_fn
+
+    async def test_flushes_when_flush_rows_are_waiting(self):
+        """Reaching flush_rows wakes the flusher before the interval elapses."""
+        buffer = WriteBehindBuffer("test", self.flush_fn, max_rows=10, flush_rows=3, flush_interval=60)
+
+        self.assertTrue(buffer.offer([1, 2]))
+        await asyncio.sleep(0.01)
+        self.assertEqual(self.batches, [])
+
+        self.assertTrue(buffer.offer([3]))
+        await asyncio.sleep(0.01)
+        self.assertEqual(self.batches, [[1, 2, 3]])
+        await buffer.stop()
+
+    async def test_flushes_after_interval(self):
+        """Rows never wait longer than flush_interval."""
+        buffer = WriteBehindBuffer("test", self.flush_fn, max_rows=10, flush_rows=100, flush_interval=0.05)
+
+        buffer.offer([1])
+        await asyncio.sleep(0.2)
+
+        self.assertEqual(self.batches, [[1]])
+        await buffer.stop()
+
+    async def test_full_buffer_refuses_rows(self):
+        """Offers that do not fit are refused whole and counted."""
+        buffer = WriteBehindBuffer("test", self.flush_fn, max_rows=3, flush_rows=100, flush_interval=60)
+
+        self.assertTrue(buffer.offer([1, 2]))
+        self.assertFalse(buffer.offer([3, 4]))
+        self.assertEqual(buffer.stats()["pending"], 2)
+        self.assertEqual(buffer.stats()["rejected"], 2)
+
+        await buffer.stop()
+        self.assertEqual(self.batches, [[1, 2]])
+
+    async def test_failed_batches_are_counted(self):
+        """A batch the flush function rejects is dropped and counted."""
+
+        async def failing_flush_fn(rows):
+            raise RuntimeError("database down")
+
+        buffer = WriteBehindBuffer("test", failing_flush_fn, max_rows=10, flush_rows=2, flush_interval=60)
+        buffer.offer([1, 2, 3])
+
+        with self.assertLogs("core.write_buffer", level="ERROR"):
+            await buffer.stop()
+
+        self.assertEqual(buffer.stats()["failed"], 3)
+        self.assertEqual(buffer.stats()["pending"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+from unittest.mock import patch
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from middlewares.api_log import APILogMiddleware
+
+
+def create_app(**middleware_options) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(APILogMiddleware, **middleware_options)
+
+    @app.post("/echo")
+    async def echo(payload: dict):
+        return payload
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for i in range(3):
+                yield f"chunk{i};".encode()
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    @app.get("/missing")
+    async def missing():
+        raise HTTPException(status_code=404, detail="Not here")
+
+    return app
+
+
+class TestAPILogMiddleware(unittest.TestCase):
+    def setUp(self):
+        patcher = patch("middlewares.api_log.general_logger")
+        self.logger = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def logged(self) -> str:
+        return "\n".join(call.args[0] for call in self.logger.info.call_args_list)
+
+    def test_streaming_response_is_logged_after_stream_finishes(self):
+        """The full streamed body is logged, not an empty one."""
+        client = TestClient(create_app(sample_rate=1.0, route_sample_rates={}))
+
+        response = client.get("/stream")
+
+        self.assertEqual(response.text, "chunk0;chunk1;chunk2;")
+        self.assertIn("Body=chunk0;chunk1;chunk2;", self.logged())
+
+    def test_logged_bodies_are_capped(self):
+        """Only the first max_body_bytes of a body are logged."""
+        client = TestClient(
+            create_app(max_body_bytes=16, sample_rate=1.0, route_sample_rates={})
+        )
+        payload = {"data": "x" * 100}
+
+        response = client.post("/echo", json=payload)
+
+        self.assertEqual(response.json(), payload)
+        self.assertIn('{"data":"xxxxxxx...[truncated, 111 bytes total]', self.logged())
+
+    def test_route_sample_rate_disables_logging(self):
+        """Routes sampled at 0 are passed through without logging."""
+        client = TestClient(
+            create_app(sample_rate=1.0, route_sample_rates={"/stream": 0.0})
+        )
+
+        client.get("/stream")
+        client.post("/echo", json={"a": 1})
+
+        self.assertNotIn("/stream", self.logged())
+        self.assertIn("/echo", self.logged())
+
+    def test_errors_only_mode_skips_successful_responses(self):
+        """Errors-only mode logs error responses only."""
+        client = TestClient(
+            create_app(errors_only=True, sample_rate=1.0, route_sample_rates={})
+        )
+
+        client.post("/echo", json={"a": 1})
+        client.get("/missing")
+
+        self.assertNotIn("/echo", self.logged())
+        self.assertIn("Status Code=404", self.logged())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import asyncio
+import unittest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core.limits import AdaptiveConcurrencyLimit
+from middlewares.load_shed import (
+    PRIORITY_BULK,
+    PRIORITY_CRITICAL,
+    PRIORITY_NORMAL,
+    LoadShedMiddleware,
+    PoolQueueDelay,
+    request_priority,
+)
+
+
+def create_app(limiter: AdaptiveConcurrencyLimit) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(
+        LoadShedMiddleware, limiter=limiter, queue_delay=lambda: 0.0, enabled=True
+    )
+
+    @app.get("/health")
+    async def health():
+        return {"status": "OK"}
+
+    @app.get("/api/v1/phonenumbers/")
+    async def listing():
+        return []
+
+    @app.post("/api/v1/phonenumbers/")
+    async def create():
+        await asyncio.sleep(0)
+        return {}
+
+    return app
+
+
+class TestLoadShedMiddleware(unittest.TestCase):
+    def setUp(self):
+        self.limiter = AdaptiveConcurrencyLimit(
+            "test", initial=10, min_limit=1, max_limit=10, target_delay=0.05, interval=3600
+        )
+        self.client = TestClient(create_app(self.limiter))
+
+    def test_requests_are_shed_by_priority(self):
+        """Bulk listings are shed first, health checks never."""
+        # 8 requests in flight: over the bulk share (7), under the limit (10)
+        for _ in range(8):
+            self.limiter.acquire()
+
+        response = self.client.get("/api/v1/phonenumbers/")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers["retry-after"], "1")
+
+        self.assertEqual(self.client.post("/api/v1/phonenumbers/").status_code, 200)
+
+        for _ in range(2):
+            self.limiter.acquire()
+        self.assertEqual(self.client.post("/api/v1/phonenumbers/").status_code, 503)
+        self.assertEqual(self.client.get("/health").status_code, 200)
+
+        # Slots of finished (and shed) requests are given back
+        self.assertEqual(self.limiter.active, 10)
+
+    def test_request_priority(self):
+        self.assertEqual(request_priority("POST", "/api/v1/auth/refresh"), PRIORITY_CRITICAL)
+        self.assertEqual(request_priority("GET", "/api/v1/calllogs/export"), PRIORITY_BULK)
+        self.assertEqual(request_priority("POST", "/api/v1/calllogs/"), PRIORITY_NORMAL)
+
+
+class TestPoolQueueDelay(unittest.TestCase):
+    def test_mean_wait_since_previous_call(self):
+        """The delay is the mean checkout wait of the last interval only."""
+        totals = [(10, 5.0)]
+        queue_delay = PoolQueueDelay(lambda: totals[-1])
+
+        totals.append((14, 5.4))
+        self.assertAlmostEqual(queue_delay(), 0.1)
+        self.assertEqual(queue_delay(), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from middlewares.metrics import MetricsMiddleware, metrics_text, request_durations
+
+
+def create_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        return {"item_id": item_id}
+
+    return app
+
+
+class TestMetricsMiddleware(unittest.TestCase):
+    def setUp(self):
+        request_durations.clear()
+        self.client = TestClient(create_app())
+
+    def test_requests_are_labelled_by_route_template(self):
+        """Paths of one route share a series, unmatched paths one more."""
+        self.client.get("/items/1")
+        self.client.get("/items/2")
+        self.client.get("/items/x")
+        self.client.get("/missing")
+
+        text = metrics_text()
+
+        self.assertIn(
+            'http_requests_total{method="GET",route="/items/{item_id}",status="200"} 2\n', text
+        )
+        self.assertIn(
+            'http_requests_total{method="GET",route="/items/{item_id}",status="422"} 1\n', text
+        )
+        self.assertIn('http_requests_total{method="GET",route="unmatched",status="404"} 1\n', text)
+        self.assertIn("# TYPE event_loop_lag_seconds histogram\n", text)
+
+
+if __name__ == "__main__":
+    unittest.main()
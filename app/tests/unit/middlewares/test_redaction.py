@@ -0,0 +1,118 @@
+import json
+import unittest
+
+from middlewares.redaction import Redactor
+
+
+class TestRedactor(unittest.TestCase):
+    def setUp(self):
+        self.redactor = Redactor(
+            keys=["password", "access_token", "refresh_token"],
+            headers=["authorization", "cookie"],
+            max_scan_bytes=200,
+        )
+
+    def test_json_values_are_redacted_under_their_own_key(self):
+        """Each sensitive key keeps its name, only the value is replaced."""
+        body = '{"email": "a@b.com", "password": "se\\"cret", "refresh_token":"abc"}'
+
+        redacted = self.redactor.redact_body(body, "application/json")
+
+        self.assertEqual(
+            redacted,
+            '{"email": "a@b.com", "password": "[REDACTED]", "refresh_token":"[REDACTED]"}',
+        )
+
+    def test_object_and_array_values_are_redacted_whole(self):
+        """A sensitive key holding an object or array is replaced entirely."""
+        body = '{"password": {"a": 1, "b": "x"}, "token_list": [1], "access_token": ["p", "q"]}'
+
+        redacted = self.redactor.redact_body(body, "application/json")
+
+        self.assertEqual(
+            json.loads(redacted),
+            {"password": "[REDACTED]", "token_list": [1], "access_token": "[REDACTED]"},
+        )
+        self.assertEqual(
+            self.redactor.redact_body('{"password": {"a": 1, "b": "x\\"y"}}', "application/json"),
+            '{"password": "[REDACTED]"}',
+        )
+
+    def test_non_string_and_nested_values_are_redacted(self):
+        """Keys are matched at any depth and for scalar values."""
+        body = '{"user": {"password": 1234}, "items": [{"access_token": null}]}'
+
+        redacted = self.redactor.redact_body(body, "application/json")
+
+        self.assertNotIn("1234", redacted)
+        self.assertEqual(redacted.count("[REDACTED]"), 2)
+
+    def test_form_bodies_and_query_strings_are_redacted(self):
+        """Form encoded values and URL query parameters are redacted."""
+        self.assertEqual(
+            self.redactor.redact_body(
+                "email=a%40b.com&password=secret",
+                "application/x-www-form-urlencoded",
+            ),
+            "email=a%40b.com&password=[REDACTED]",
+        )
+        self.assertEqual(
+            self.redactor.redact_url("http://test/api?access_token=abc&limit=10"),
+            "http://test/api?access_token=[REDACTED]&limit=10",
+        )
+
+    def test_headers_are_redacted(self):
+        """Authorization and cookie headers are never logged."""
+        headers = [("Authorization", "Bearer abc"), ("content-type", "application/json")]
+
+        self.assertEqual(
+            self.redactor.redact_headers(headers),
+            {"Authorization": "[REDACTED]", "content-type": "application/json"},
+        )
+
+    def test_scan_limit_truncates_instead_of_leaking(self):
+        """Text beyond the scan limit is cut off, a value cut mid-way is redacted."""
+        body = '{"data": "' + "x" * 180 + '", "password": "secret"}'
+
+        redacted = self.redactor.redact_body(body, "application/json")
+
+        self.assertNotIn("secret", redacted)
+        self.assertTrue(redacted.endswith("...[truncated]"))
+
+    def test_structured_values_of_truncated_bodies_are_redacted(self):
+        """An array or object cut off by a body cap is redacted to the end of the text."""
+        body = '{"data": [1, 2], "password": ["s1", {"a": "s]2"}, "s3' + "x" * 200
+
+        for content_type in ("application/json", ""):
+            redacted = self.redactor.redact_body(body, content_type)
+
+            self.assertEqual(redacted, '{"data": [1, 2], "password": "[REDACTED]"...[truncated]')
+
+        # A logged body: cut off by the capture cap, with its truncation marker
+        body = '{"access_token": {"value": "s1", "scopes": ["s2"]}, "password": ["s3"'
+        redacted = self.redactor.redact_body(
+            body + "...[truncated, 9000 bytes total]", "application/json"
+        )
+
+        self.assertEqual(redacted, '{"access_token": "[REDACTED]", "password": "[REDACTED]"')
+
+    def test_json_bodies_without_a_json_content_type_are_redacted(self):
+        """Bodies are recognized as JSON by their first character, not only by content type."""
+        body = '{"password": ["s1", "s2"], "user": {"refresh_token": {"a": "s3"}}}'
+
+        for content_type in ("", "text/plain"):
+            redacted = self.redactor.redact_body(body, content_type)
+
+            self.assertEqual(
+                json.loads(redacted),
+                {"password": "[REDACTED]", "user": {"refresh_token": "[REDACTED]"}},
+            )
+
+        # Not JSON at all: structured values are still delimited by their brackets
+        redacted = self.redactor.redact_body('note {"password": ["s1", "s2"], "n": 1}', "text/plain")
+
+        self.assertEqual(redacted, 'note {"password": "[REDACTED]", "n": 1}')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from core.database import instrument_engine
+from core.write_buffer import WriteBehindBuffer
+from middlewares.server_timing import ServerTimingMiddleware
+
+DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+
+
+def create_app(repeat_threshold: int = 10, buffer: WriteBehindBuffer = None) -> FastAPI:
+    engine = create_async_engine(DATABASE_URL)
+    instrument_engine(engine)
+    SessionLocal = sessionmaker(bind=engine, class_=AsyncSession)
+
+    async def get_db():
+        async with SessionLocal() as session:
+            yield session
+
+    app = FastAPI()
+    app.add_middleware(ServerTimingMiddleware, enabled=True, repeat_threshold=repeat_threshold)
+
+    @app.get("/queries/{count}")
+    async def queries(count: int, db: AsyncSession = Depends(get_db)):
+        for i in range(count):
+            await db.execute(text("SELECT :value"), {"value": i})
+        return {}
+
+    @app.post("/buffered/{count}")
+    async def buffered(count: int):
+        # Respond only once the background flusher wrote the rows
+        buffer.offer(list(range(count)))
+        while buffer.flushed < count:
+            await asyncio.sleep(0.01)
+        return {}
+
+    async def write_rows(rows):
+        async with SessionLocal() as session:
+            for row in rows:
+                await session.execute(text("SELECT :value"), {"value": row})
+
+    if buffer is not None:
+        buffer.flush_fn = write_rows
+
+    return app
+
+
+class TestServerTimingMiddleware(unittest.TestCase):
+    def test_statements_are_reported_per_request(self):
+        """The header counts the statements of its own request only."""
+        client = TestClient(create_app())
+
+        first = client.get("/queries/3")
+        second = client.get("/queries/1")
+
+        self.assertRegex(first.headers["server-timing"], r'^db;dur=[0-9.]+;desc="3 queries"$')
+        self.assertIn('desc="1 queries"', second.headers["server-timing"])
+
+    def test_background_flushes_are_not_attributed_to_requests(self):
+        """The buffer's flusher, started by a request, does not report into it or later ones."""
+        buffer = WriteBehindBuffer(
+            "test", flush_fn=None, max_rows=100, flush_rows=1, flush_interval=3600
+        )
+        with TestClient(create_app(buffer=buffer)) as client:
+            first = client.post("/buffered/3")
+            second = client.get("/queries/1")
+
+        self.assertIn('desc="0 queries"', first.headers["server-timing"])
+        self.assertIn('desc="1 queries"', second.headers["server-timing"])
+
+    def test_repeated_statements_are_flagged(self):
+        """A statement run repeat_threshold times in one request is logged."""
+        client = TestClient(create_app(repeat_threshold=5))
+
+        with patch("middlewares.server_timing.logger") as logger:
+            client.get("/queries/4")
+            logger.warning.assert_not_called()
+
+            client.get("/queries/5")
+            logger.warning.assert_called_once()
+            self.assertIn("Possible N+1", logger.warning.call_args.args[0])
+
+    def test_slow_statements_are_logged_without_parameters(self):
+        client = TestClient(create_app())
+
+        with patch("core.database.settings.SLOW_QUERY_MS", 0.000001), patch(
+            "core.database.logger"
+        ) as logger:
+            client.get("/queries/1")
+
+        message, _, statement, parameters = logger.warning.call_args.args
+        self.assertIn("Slow query", message)
+        self.assertEqual(statement, "SELECT ?")
+        self.assertEqual(parameters, ["int"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,366 @@
+"""
+Asyncio load generator for the API.
+
+Every virtual user registers and logs in with its own account, then runs
+scenarios picked at random by weight until the duration is over. Throughput
+and p50/p95/p99 latency are reported per endpoint.
+
+The target is either a live server (--url) or, by default, the app running
+in-process through httpx.ASGITransport, with a throwaway SQLite database
+standing in for PostgreSQL (no services needed, numbers are only relative).
+
+Usage:
+    python scripts/load_test.py --url http://localhost:8000 --concurrency 50 --duration 60
+    python scripts/load_test.py --mix register=1,login=1,create_number=2,list_pages=6,refresh=1
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app")
+
+API_PREFIX = "/api/v1"
+
+DEFAULT_MIX = "register=1,login=1,create_number=2,list_pages=6,refresh=1"
+
+# Pages walked by one list_pages scenario (cursor pagination)
+LIST_PAGES = 3
+PAGE_SIZE = 20
+
+# Numbers every virtual user starts with, so listings have pages to walk
+INITIAL_NUMBERS = 50
+
+
+class VirtualUser:
+    """
+    Account and tokens of one simulated client.
+    """
+
+    def __init__(self):
+        # Registration checks the domain is deliverable (example.com is not)
+        self.email = f"load-{uuid.uuid4().hex[:12]}@gmail.com"
+        self.password = uuid.uuid4().hex
+        self.access_token: Optional[str] = None
+        self.refresh_token: Optional[str] = None
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.access_token}"}
+
+
+class Recorder:
+    """
+    Latencies and status codes per endpoint.
+    """
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.statuses: Dict[str, Counter] = {}
+        self.recording = False
+
+    async def request(
+        self, client: httpx.AsyncClient, name: str, method: str, url: str, **kwargs
+    ) -> Optional[httpx.Response]:
+        """
+        Send a request and record it under name (once recording started).
+        Transport errors are recorded with status "error".
+        """
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            status = str(response.status_code)
+        except httpx.HTTPError:
+            response = None
+            status = "error"
+        elapsed = time.perf_counter() - start
+
+        if self.recording:
+            self.latencies.setdefault(name, []).append(elapsed)
+            self.statuses.setdefault(name, Counter())[status] += 1
+        return response
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """
+    Nearest-rank percentile of sorted values.
+    """
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def login(client: httpx.AsyncClient, recorder: Recorder, user: VirtualUser) -> None:
+    response = await recorder.request(
+        client,
+        "login",
+        "POST",
+        f"{API_PREFIX}/auth/token",
+        json={"email": user.email, "password": user.password},
+    )
+    if response is not None and response.status_code == 200:
+        tokens = response.json()
+        user.access_token = tokens["access_token"]
+        user.refresh_token = tokens["refresh_token"]
+
+
+async def register(client: httpx.AsyncClient, recorder: Recorder, user: VirtualUser) -> None:
+    # A new account each time, the virtual user keeps its own
+    await recorder.request(
+        client,
+        "register",
+        "POST",
+        f"{API_PREFIX}/auth/register",
+        json={"email": VirtualUser().email, "password": "load-test-password"},
+    )
+
+
+def random_number() -> str:
+    """
+    A valid (New York) number, random enough to rarely collide.
+    """
+    return f"+1212{random.randint(2000000, 9999999)}"
+
+
+async def create_number(
+    client: httpx.AsyncClient, recorder: Recorder, user: VirtualUser
+) -> None:
+    number = random_number()
+    await recorder.request(
+        client,
+        "create_number",
+        "POST",
+        f"{API_PREFIX}/phonenumbers/",
+        json={"number": number},
+        headers=user.headers,
+    )
+
+
+async def list_pages(client: httpx.AsyncClient, recorder: Recorder, user: VirtualUser) -> None:
+    params = {"mode": "cursor", "limit": PAGE_SIZE}
+    for _ in range(LIST_PAGES):
+        response = await recorder.request(
+            client,
+            "list_page",
+            "GET",
+            f"{API_PREFIX}/phonenumbers/",
+            params=params,
+            headers=user.headers,
+        )
+        if response is None or response.status_code != 200:
+            return
+        next_cursor = response.json()["pagination"]["next_cursor"]
+        if next_cursor is None:
+            return
+        params = {"cursor": next_cursor, "limit": PAGE_SIZE}
+
+
+async def refresh(client: httpx.AsyncClient, recorder: Recorder, user: VirtualUser) -> None:
+    response = await recorder.request(
+        client,
+        "refresh",
+        "POST",
+        f"{API_PREFIX}/auth/refresh",
+        json={"refresh_token": user.refresh_token},
+    )
+    if response is not None and response.status_code == 200:
+        user.access_token = response.json()["access_token"]
+
+
+Scenario = Callable[[httpx.AsyncClient, Recorder, VirtualUser], Awaitable[None]]
+
+SCENARIOS: Dict[str, Scenario] = {
+    "register": register,
+    "login": login,
+    "create_number": create_number,
+    "list_pages": list_pages,
+    "refresh": refresh,
+}
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """
+    Parse "name=weight,..." into scenario weights.
+    """
+    weights = {}
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(
+                f"Unknown scenario {name!r}, choose from {', '.join(SCENARIOS)}"
+            )
+        weights[name] = float(weight or 1)
+    return weights
+
+
+async def virtual_user(
+    client: httpx.AsyncClient,
+    recorder: Recorder,
+    weights: Dict[str, float],
+    ready: asyncio.Barrier,
+    deadline: List[float],
+) -> None:
+    """
+    Sign up and add the initial numbers, wait for the other users, then run
+    scenarios until the deadline.
+    """
+    user = VirtualUser()
+    await recorder.request(
+        client,
+        "register",
+        "POST",
+        f"{API_PREFIX}/auth/register",
+        json={"email": user.email, "password": user.password},
+    )
+    await login(client, recorder, user)
+    await recorder.request(
+        client,
+        "bulk_numbers",
+        "POST",
+        f"{API_PREFIX}/phonenumbers/bulk",
+        content="\n".join(random_number() for _ in range(INITIAL_NUMBERS)),
+        headers={**user.headers, "Content-Type": "text/csv"},
+    )
+    await ready.wait()
+
+    names = list(weights)
+    scenario_weights = list(weights.values())
+    while time.perf_counter() < deadline[0]:
+        if user.access_token is None:
+            await login(client, recorder, user)
+        name = random.choices(names, scenario_weights)[0]
+        await SCENARIOS[name](client, recorder, user)
+
+
+def report(recorder: Recorder, elapsed: float) -> str:
+    """
+    Format throughput, latency percentiles and status codes per endpoint.
+    """
+    lines = [
+        f"{'endpoint':<14}{'requests':>9}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}"
+        f"{'p99 ms':>9}{'max ms':>9}  statuses",
+    ]
+    total = 0
+    for name in sorted(recorder.latencies):
+        latencies = sorted(recorder.latencies[name])
+        total += len(latencies)
+        statuses = " ".join(
+            f"{status}:{count}" for status, count in sorted(recorder.statuses[name].items())
+        )
+        lines.append(
+            f"{name:<14}{len(latencies):>9}{len(latencies) / elapsed:>9.1f}"
+            f"{percentile(latencies, 0.50) * 1000:>9.1f}"
+            f"{percentile(latencies, 0.95) * 1000:>9.1f}"
+            f"{percentile(latencies, 0.99) * 1000:>9.1f}"
+            f"{latencies[-1] * 1000:>9.1f}  {statuses}"
+        )
+    lines.append(f"{'total':<14}{total:>9}{total / elapsed:>9.1f}")
+    return "\n".join(lines)
+
+
+async def in_process_transport(database_path: str) -> Tuple[httpx.ASGITransport, Callable]:
+    """
+    Build a transport to the app with its sessions on a SQLite database.
+
+    Returns:
+        The transport and a coroutine function disposing the database engine.
+    """
+    sys.path.insert(0, APP_DIR)
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+
+    import email_validator
+
+    from core.database import Base, get_db, get_session_factory
+    from main import app
+
+    # No DNS lookups per registration, so laptops can run it offline
+    email_validator.CHECK_DELIVERABILITY = False
+
+    # Writers queue on SQLite's lock instead of failing right away
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{database_path}", connect_args={"timeout": 30}
+    )
+    session_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.execute(text("PRAGMA journal_mode=WAL"))
+        await conn.run_sync(Base.metadata.create_all)
+
+    async def override_get_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: session_factory
+    return httpx.ASGITransport(app=app), engine.dispose
+
+
+async def run(
+    url: Optional[str], concurrency: int, duration: float, weights: Dict[str, float]
+) -> None:
+    dispose = None
+    with tempfile.TemporaryDirectory() as directory:
+        if url:
+            transport = None
+            base_url = url
+        else:
+            transport, dispose = await in_process_transport(os.path.join(directory, "load.db"))
+            base_url = "http://load-test"
+
+        recorder = Recorder()
+        deadline = [float("inf")]
+        ready = asyncio.Barrier(concurrency + 1)
+
+        async with httpx.AsyncClient(
+            base_url=base_url,
+            transport=transport,
+            timeout=60,
+            limits=httpx.Limits(max_connections=concurrency),
+        ) as client:
+            print(f"Signing up {concurrency} virtual users against {base_url} ...")
+            users = [
+                asyncio.create_task(virtual_user(client, recorder, weights, ready, deadline))
+                for _ in range(concurrency)
+            ]
+            await ready.wait()
+
+            print(f"Running for {duration:g}s ...")
+            recorder.recording = True
+            start = time.perf_counter()
+            deadline[0] = start + duration
+            await asyncio.gather(*users)
+            elapsed = time.perf_counter() - start
+
+        if dispose is not None:
+            await dispose()
+
+    print(report(recorder, elapsed))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--url", default=None, help="live server to target, e.g. http://localhost:8000 "
+        "(default: the app in-process on SQLite)"
+    )
+    parser.add_argument("--concurrency", type=int, default=20, help="virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to run")
+    parser.add_argument(
+        "--mix", type=parse_mix, default=DEFAULT_MIX, help=f"scenario weights (default {DEFAULT_MIX})"
+    )
+    args = parser.parse_args()
+
+    asyncio.run(run(args.url, args.concurrency, args.duration, args.mix))
+
+
+if __name__ == "__main__":
+    main()